@@ -0,0 +1,5 @@
+import os
+
+# Importing ub_core builds the client, which only needs these to exist.
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "test")
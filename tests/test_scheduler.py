@@ -0,0 +1,163 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from ub_core import Config
+from ub_core.scheduler import CatchUp, CronExpression, ScheduleMode
+
+
+async def noop():
+    pass
+
+
+def run_with_loop(test):
+    """Run test() inside a loop set on the TaskManager, cancelling whatever workers it leaves behind."""
+
+    async def main():
+        task_manager = Config.TASK_MANAGER
+        task_manager.loop = asyncio.get_running_loop()
+        try:
+            return await test(task_manager)
+        finally:
+            for worker in list(task_manager.scheduler.workers.values()):
+                worker.cancel()
+            await asyncio.sleep(0)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize(
+    "expression, after, expected",
+    [
+        ("*/15 * * * *", datetime(2026, 1, 1, 10, 7), datetime(2026, 1, 1, 10, 15)),
+        ("*/15 * * * *", datetime(2026, 1, 1, 10, 45), datetime(2026, 1, 1, 11, 0)),
+        ("0 9-17/4 * * *", datetime(2026, 1, 1, 13, 0), datetime(2026, 1, 1, 17, 0)),
+        ("5 0 * * *", datetime(2026, 12, 31, 23, 59), datetime(2027, 1, 1, 0, 5)),
+        ("@hourly", datetime(2026, 1, 1, 10, 0, 30), datetime(2026, 1, 1, 11, 0)),
+        ("@weekly", datetime(2026, 10, 19, 12, 0), datetime(2026, 10, 25, 0, 0)),
+    ],
+)
+def test_next_after_steps_ranges_and_aliases(expression, after, expected):
+    assert CronExpression(expression).next_after(after) == expected
+
+
+def test_next_after_names():
+    # 2026-10-19 is a Monday.
+    cron = CronExpression("30 8 * jan-mar,oct mon-wed")
+    assert cron.next_after(datetime(2026, 10, 19, 9, 0)) == datetime(2026, 10, 20, 8, 30)
+    assert cron.next_after(datetime(2026, 10, 28, 9, 0)) == datetime(2027, 1, 4, 8, 30)
+
+    assert CronExpression("0 0 * * SUN").next_after(datetime(2026, 10, 19)) == datetime(2026, 10, 25)
+    # 7 is Sunday as well.
+    assert CronExpression("0 0 * * 7").next_after(datetime(2026, 10, 19)) == datetime(2026, 10, 25)
+
+
+def test_next_after_day_fields_or_when_both_restricted():
+    # The 1st of the month or any Friday, whichever comes first.
+    cron = CronExpression("0 0 1 * fri")
+    assert cron.next_after(datetime(2026, 10, 19)) == datetime(2026, 10, 23)
+    assert cron.next_after(datetime(2026, 10, 31)) == datetime(2026, 11, 1)
+    assert cron.next_after(datetime(2026, 11, 1)) == datetime(2026, 11, 6)
+
+
+def test_next_after_day_fields_and_when_one_is_star():
+    # Only Fridays, the * day of month doesn't widen it.
+    assert CronExpression("0 0 * * fri").next_after(datetime(2026, 10, 19)) == datetime(2026, 10, 23)
+    # Only the 1st, the * weekday doesn't widen it.
+    assert CronExpression("0 0 1 * *").next_after(datetime(2026, 10, 19)) == datetime(2026, 11, 1)
+
+
+@pytest.mark.parametrize("expression", ["* * *", "60 * * * *", "* * 0 * *", "*/0 * * * *", "* * * foo *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_never_matching_cron_raises():
+    with pytest.raises(ValueError):
+        CronExpression("0 0 30 feb *").next_after(datetime(2026, 1, 1))
+
+
+@pytest.mark.parametrize(
+    "catch_up, runs_started, pending, skipped",
+    [(CatchUp.SKIP, 0, 0, 1), (CatchUp.ONCE, 1, 0, 0), (CatchUp.ALL, 1, 3, 0)],
+)
+def test_fixed_rate_catch_up(catch_up, runs_started, pending, skipped):
+    async def test(task_manager):
+        worker = task_manager.create_worker(
+            noop,
+            interval=10,
+            name=f"catch-up-{catch_up.value}",
+            mode=ScheduleMode.FIXED_RATE,
+            catch_up=catch_up,
+            run_at_start=False,
+        )
+        # The loop was blocked for 3.5 intervals past the worker's slot.
+        now = task_manager.loop.time()
+        slot = now - 35
+        worker.slot = worker.due = slot
+
+        worker.fire(now)
+
+        assert worker.missed == 3
+        assert len(worker.running) == runs_started
+        assert worker.pending == pending
+        assert worker.skipped == skipped
+        # Stays on the original grid: the next slot is the first one after now.
+        assert worker.slot == slot + 40
+
+    run_with_loop(test)
+
+
+def test_fixed_rate_on_time_run_is_not_missed():
+    async def test(task_manager):
+        worker = task_manager.create_worker(
+            noop, interval=10, name="on-time", mode=ScheduleMode.FIXED_RATE, catch_up=CatchUp.SKIP, run_at_start=False
+        )
+        now = task_manager.loop.time()
+        worker.slot = worker.due = now
+
+        worker.fire(now)
+
+        assert (worker.missed, worker.skipped, len(worker.running)) == (0, 0, 1)
+        assert worker.slot == now + 10
+
+    run_with_loop(test)
+
+
+def test_worker_that_cannot_be_rescheduled_is_finished():
+    async def test(task_manager):
+        worker = task_manager.create_worker(noop, cron="* * * * *", name="never-matches")
+        worker.cron = CronExpression("0 0 30 feb *")
+        worker.slot = datetime.now()
+        task_manager.scheduler.push(worker, task_manager.loop.time())
+
+        task_manager.scheduler.dispatch()
+
+        assert worker.done()
+        assert worker.stats["done"]
+        assert "never-matches" not in task_manager.scheduler.workers
+        assert worker not in task_manager._store["workers"]
+
+    run_with_loop(test)
+
+
+def test_default_is_fixed_delay():
+    async def test(task_manager):
+        runs = []
+
+        async def slow():
+            runs.append(task_manager.loop.time())
+            await asyncio.sleep(0.2)
+
+        worker = task_manager.create_worker(slow, interval=0.1, name="fixed-delay")
+        assert worker.mode is ScheduleMode.FIXED_DELAY
+
+        await asyncio.sleep(1)
+
+        # Each run starts interval after the previous one ended, not on a 0.1s grid.
+        assert len(runs) >= 2
+        assert all(later - earlier >= 0.3 for earlier, later in zip(runs, runs[1:]))
+
+    run_with_loop(test)
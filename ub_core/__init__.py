@@ -1,12 +1,22 @@
 import os
-import tracemalloc
+import time
+
+boot_start = time.perf_counter()
+
+from .diagnostics import BOOT_PROFILER, MEMORY_PROFILER
+
+# The profiler can't time its own import.
+BOOT_PROFILER.record_phase("diagnostics", boot_start)
 
 from dotenv import load_dotenv
 from pathlib import Path
 
-tracemalloc.start()
+with BOOT_PROFILER.phase("env"):
+    load_dotenv("config.env")
 
-load_dotenv("config.env")
+# Opt in, TRACEMALLOC=<number of frames to keep per allocation>
+if int(os.getenv("TRACEMALLOC", 0)):
+    MEMORY_PROFILER.start(frames=int(os.getenv("TRACEMALLOC")))
 
 
 try:
@@ -18,11 +28,36 @@ except (ImportError, ModuleNotFoundError):
 
 ub_core_dir = Path(__file__).parent.resolve()
 
-from .config import Cmd, Config
+with BOOT_PROFILER.phase("config"):
+    from .config import Cmd, Config
 from .version import __version__
-from .core import CustomCollection, CustomDatabase, Convo, CustomDB, Message
-from .core.client import BOT
 
-bot: BOT = BOT()
+with BOOT_PROFILER.phase("core"):
+    from .core import Convo, Message
+
+with BOOT_PROFILER.phase("client"):
+    from .core.client import BOT, create_extra_clients
+
+    # Process pool workers get no client, log handlers or tasks.
+    if Config.IS_POOL_WORKER:
+        bot = None
+    else:
+        bot: BOT = BOT()
+        create_extra_clients()
+
+if Config.IS_POOL_WORKER:
+    import logging
+
+    LOGGER = logging.getLogger(Config.BOT_NAME)
+else:
+    from .core.logging import LOGGER
+
+
+def __getattr__(name: str):
+    """CustomDB and the db classes are loaded on first use, see core.__getattr__"""
+    from . import core
+
+    if name in core.DB_ATTRS:
+        return getattr(core, name)
 
-from .core.logging import LOGGER
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
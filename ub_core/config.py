@@ -3,17 +3,42 @@ import importlib
 import json
 import logging
 import pathlib
+import sys
+import threading
 import time
-from os import getenv
-
-from git import InvalidGitRepositoryError, Repo
+from os import cpu_count, getenv
+from typing import TYPE_CHECKING
 
 from . import ub_core_dir
 from .task_manager import TaskManager
 
+if TYPE_CHECKING:
+    from git import Repo
+
+    from .core.client import BOT
+
 LOGGER = logging.getLogger("Config")
 
 
+def parse_pool_sizes(value: str) -> dict[str, int]:
+    """io=16,git=2 -> {"io": 16, "git": 2}"""
+    sizes = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, size = item.split("=", 1)
+            sizes[name.strip()] = int(size)
+    return sizes
+
+
+def get_shard_path(path: str) -> str:
+    """logs/app_logs.txt -> logs/app_logs.shard1.txt in shard 1, shards don't share files they rotate or truncate."""
+    if Config.SHARD_ID is None:
+        return path
+
+    file = pathlib.Path(path)
+    return str(file.with_name(f"{file.stem}.shard{Config.SHARD_ID}{file.suffix}"))
+
+
 def update_extra_config():
     """Update Config Attrs from the custom extra_config"""
     extra_config_path = Config.WORKING_DIR / "extra_config.py"
@@ -31,7 +56,14 @@ def update_extra_config():
 
 
 class Cmd:
-    def __init__(self, cmd: str, func: collections.abc.Callable, path: str, allow_sudo: bool):
+    def __init__(
+        self,
+        cmd: str,
+        func: collections.abc.Callable,
+        path: str,
+        allow_sudo: bool,
+        clients: str | collections.abc.Iterable[str] | None = None,
+    ):
         self.cmd: str = cmd
         self.path: pathlib.Path = pathlib.Path(path)
         self.dir_name: str = self.path.parent.name
@@ -40,16 +72,50 @@ class Cmd:
         self.is_from_core: bool = self.path.is_relative_to(ub_core_dir)
         self.loaded_for_sudo = False
         self.allow_sudo: bool = allow_sudo
+        self.clients: frozenset[str] = frozenset([clients] if isinstance(clients, str) else clients or ())
+
+    def runs_on(self, client) -> bool:
+        """True if clients is empty or has the client's name, "user" or "bot"."""
+        if not self.clients:
+            return True
+        return client.name in self.clients or ("bot" if client.is_bot else "user") in self.clients
 
     def __str__(self):
         return json.dumps(self.__dict__, indent=4, ensure_ascii=False, default=str)
 
 
+class LazyRepo:
+    """Import GitPython and open the Repo on first access to Config.REPO instead of at import."""
+
+    def __init__(self, path: str = "."):
+        self.path = path
+        self.repo: "Repo | None" = None
+        self.loaded: bool = False
+        self.lock = threading.Lock()
+
+    def __get__(self, instance, owner) -> "Repo | None":
+        with self.lock:
+            if not self.loaded:
+                from git import InvalidGitRepositoryError, Repo
+
+                try:
+                    self.repo = Repo(self.path)
+                    Config.TASK_MANAGER.add_exit(self.repo.close)
+                except InvalidGitRepositoryError:
+                    self.repo = None
+
+                self.loaded = True
+
+        return self.repo
+
+
 class Config:
     TASK_MANAGER: TaskManager = TaskManager()
 
     BOT_NAME = getenv("BOT_NAME", "BOT")
 
+    CLIENTS: list["BOT"] = []
+
     CMD_DICT: dict[str, Cmd] = {}
 
     CMD_TRIGGER: str = getenv("CMD_TRIGGER", ".")
@@ -64,23 +130,51 @@ class Config:
 
     DOWNLOAD_PATH.mkdir(exist_ok=True)
 
+    EAGER_LOAD: bool = "--eager" in sys.argv or bool(int(getenv("EAGER_LOAD", 0)))
+
+    # How often queued errors are sent to LOG_CHAT as a single batch.
+    ERROR_FLUSH_INTERVAL: int = int(getenv("ERROR_FLUSH_INTERVAL", 5))
+
+    # Identical errors within this many seconds are counted instead of sent.
+    ERROR_SUPPRESS_WINDOW: int = int(getenv("ERROR_SUPPRESS_WINDOW", 300))
+
+    HOT_RELOAD: bool = bool(int(getenv("HOT_RELOAD", DEV_MODE)))
+
     INLINE_QUERY_CACHE: dict[str | int, dict] = {}
 
+    # Set by core.process_pool for its workers, they import plugins for their functions and nothing else.
+    IS_POOL_WORKER: bool = bool(getenv("UB_PROCESS_POOL_WORKER"))
+
     INLINE_RESULT_CACHE: set[str] = set()
 
+    LIVE_SHELL_LIMIT: int = int(getenv("LIVE_SHELL_LIMIT", 2))
+
     LOG_CHAT: int = int(getenv("LOG_CHAT", 0))
 
     LOG_CHAT_THREAD_ID: int = int(getenv("LOG_CHAT_THREAD_ID", 0)) or None
 
     LOAD_HANDLERS: bool = True
 
+    LOOP_STALL_THRESHOLD: float = float(getenv("LOOP_STALL_THRESHOLD", 0.5))
+
+    MEMORY_ENDPOINT: bool = bool(int(getenv("MEMORY_ENDPOINT", 0)))
+
     OWNER_ID: int = int(getenv("OWNER_ID", 0))
 
-    try:
-        REPO: Repo = Repo(".")
-        TASK_MANAGER.add_exit(REPO.close)
-    except InvalidGitRepositoryError:
-        REPO = None
+    PERSIST_COMMAND_STATS: bool = bool(int(getenv("PERSIST_COMMAND_STATS", 0)))
+
+    PROCESS_POOL_SIZE: int = int(getenv("PROCESS_POOL_SIZE", 0)) or cpu_count() or 1
+
+    REPO: "Repo | None" = LazyRepo(".")
+
+    SHARDS: int = int(getenv("SHARDS", 0))
+
+    # Set by the front process for the shard processes it starts.
+    SHARD_ID: int | None = int(getenv("UB_SHARD_ID")) if getenv("UB_SHARD_ID") else None
+
+    SUBPROCESS_LIMIT: int = int(getenv("SUBPROCESS_LIMIT", 0)) or cpu_count() or 1
+
+    SUBPROCESS_QUEUE_TIMEOUT: float = float(getenv("SUBPROCESS_QUEUE_TIMEOUT", 300)) or None
 
     SUDO: bool = False
 
@@ -92,6 +186,8 @@ class Config:
 
     TEMP_DOWNLOAD_PATH = lambda: Config.DOWNLOAD_PATH / str(time.time())
 
+    THREAD_POOL_SIZES: dict[str, int] = parse_pool_sizes(getenv("THREAD_POOL_SIZES", ""))
+
     UPSTREAM_REPO: str = getenv("UPSTREAM_REPO", "")
 
     UPDATE_REPO: str = "https://github.com/thedragonsinn/ub-core"
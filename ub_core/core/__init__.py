@@ -1,8 +1,29 @@
+import threading
+
 from .conversation import Conversation as Convo
-from .db import CustomCollection, CustomDatabase, DATABASE_NAME, DB_URI
 from .types import Message
+from ..diagnostics import BOOT_PROFILER
+
+# pymongo and dnspython are only imported when something uses the db.
+DB_ATTRS = ("CustomCollection", "CustomDatabase", "DATABASE_NAME", "DB_URI", "CustomDB")
+DB_LOCK = threading.Lock()
+
+
+def __getattr__(name: str):
+    if name not in DB_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    with DB_LOCK:
+        if name in globals():
+            return globals()[name]
+
+        with BOOT_PROFILER.phase("db"):
+            from . import db
+
+        if name == "CustomDB":
+            value = db.CustomDatabase(db_uri=db.DB_URI, db_name=db.DATABASE_NAME) if db.DB_URI else None
+        else:
+            value = getattr(db, name)
 
-if DB_URI:
-    CustomDB = CustomDatabase(db_uri=DB_URI, db_name=DATABASE_NAME)
-else:
-    CustomDB = None
+        globals()[name] = value
+        return value
@@ -1,10 +1,14 @@
 import asyncio
 import importlib
+import inspect
 import logging
 import os
+import re
 import signal
 import sys
-from functools import cached_property
+from collections import OrderedDict
+from functools import cached_property, wraps
+from typing import TYPE_CHECKING
 
 import pyrogram
 from pyrogram import idle
@@ -13,11 +17,23 @@ from ub_core import ub_core_dir
 
 from .conversation import Conversation as Convo
 from .decorators import CustomDecorators
+from .executors import run_in_thread
 from .methods import Methods
+from .outbound import EditCoalescer, OutboundScheduler
+from .parser import Parser
+from .plugin_manifest import PLUGIN_MANIFEST
 from ..config import Config
+from ..diagnostics import BOOT_PROFILER, LOOP_WATCHDOG
+from ..diagnostics.metrics import UPDATES_DISPATCHED, CountingQueue
+
+if TYPE_CHECKING:
+    from .reloader import HotReloader
+    from .sharding import ShardWorker
 
 LOGGER = logging.getLogger(Config.BOT_NAME)
 
+BOT_TOKEN_REGEX = re.compile(r"^\d+:[\w-]+$")
+
 
 def import_modules(dir_name):
     """Import Plugins and add init_task to Task Manager"""
@@ -26,26 +42,72 @@ def import_modules(dir_name):
             continue
         relative_path = module.relative_to(dir_name.parent)
         py_name = ".".join(relative_path.with_suffix("").parts)
+        if not Config.EAGER_LOAD and PLUGIN_MANIFEST.defer(module, py_name):
+            continue
         try:
-            mod = importlib.import_module(py_name)
+            with BOOT_PROFILER.plugin_import(py_name):
+                mod = importlib.import_module(py_name)
             if hasattr(mod, "init_task"):
                 Config.TASK_MANAGER.add_init(mod.init_task())
         except Exception as ie:
             LOGGER.error(ie, exc_info=True)
 
 
+def create_extra_clients() -> list["BOT"]:
+    """Clients for the comma separated bot tokens and session strings in EXTRA_CLIENTS."""
+    credentials = [credential.strip() for credential in os.getenv("EXTRA_CLIENTS", "").split(",") if credential.strip()]
+    clients = []
+
+    if credentials and Config.SHARDS > 1:
+        LOGGER.warning("EXTRA_CLIENTS isn't supported with SHARDS, only the main client will run.")
+        return clients
+
+    for index, credential in enumerate(credentials, start=1):
+        is_token = bool(BOT_TOKEN_REGEX.match(credential))
+        clients.append(
+            BOT(
+                name=f"{Config.BOT_NAME}-{index}",
+                bot_token=credential if is_token else None,
+                session_string=None if is_token else credential,
+            )
+        )
+
+    return clients
+
+
 class BOT(CustomDecorators, Methods, pyrogram.Client):
-    def __init__(self):
-        bot_token = os.getenv("BOT_TOKEN")
-        name = Config.BOT_NAME + ("-bot" if bot_token else "")
+    """
+    The first BOT created is the primary client, configured from env and exported as ub_core.bot.
+    Clients created after it are extra accounts that share Config, the TaskManager, Aio, db and plugins,
+    every handler added to the primary is added to all of them. See Config.CLIENTS.
+    """
+
+    def __init__(self, name: str | None = None, bot_token: str | None = None, session_string: str | None = None):
+        if name is None:
+            bot_token = os.getenv("BOT_TOKEN")
+            session_string = os.getenv("SESSION_STRING")
+            name = Config.BOT_NAME + ("-bot" if bot_token else "")
+
+        # Shard processes log in with the front's session and get their updates from it, see sharding.py
+        is_shard = not Config.CLIENTS and Config.SHARD_ID is not None
+
+        if is_shard:
+            from .sharding import read_session
+
+            bot_token = None
+            session_string = read_session()
+
         super().__init__(
             name=name,
             api_id=int(os.getenv("API_ID")),
             api_hash=os.getenv("API_HASH"),
             bot_token=bot_token,
-            in_memory=False,
-            session_string=os.getenv("SESSION_STRING"),
-            sleep_threshold=30,
+            in_memory=is_shard,
+            no_updates=is_shard,
+            session_string=session_string,
+            # Longer FloodWaits raise instead of being slept through in invoke, so the OutboundScheduler sees them,
+            # slows the chat down and retries.
+            sleep_threshold=3,
             max_concurrent_transmissions=2,
         )
 
@@ -53,6 +115,75 @@ class BOT(CustomDecorators, Methods, pyrogram.Client):
         self.log = LOGGER
         self.Convo = Convo
         self.exit_code = 0
+        self.parser = Parser(self)
+        self.outbound = OutboundScheduler(self)
+        self.edit_coalescer = EditCoalescer(self)
+        # Set to a list by the HotReloader while it imports plugins.
+        self.staged_handlers: list | None = None
+        self.shard: "ShardWorker | None" = None
+        self.dispatcher.updates_queue = CountingQueue()
+
+        self.is_primary: bool = not Config.CLIENTS
+
+        if not self.is_primary:
+            # Pick up handlers that were added before this client existed.
+            primary = Config.CLIENTS[0]
+            self.dispatcher.groups = OrderedDict(
+                (group, list(handlers)) for group, handlers in primary.dispatcher.groups.items()
+            )
+
+        Config.CLIENTS.append(self)
+
+    @property
+    def extra_clients(self) -> list["BOT"]:
+        return Config.CLIENTS[1:] if self.is_primary else []
+
+    @cached_property
+    def reloader(self) -> "HotReloader":
+        from .reloader import HotReloader
+
+        return HotReloader(self)
+
+    @staticmethod
+    def count_dispatches(handler, group: int) -> None:
+        """Wrap the handler's callback to count updates handled per group, wraps keeps the plugin's module name."""
+        callback = handler.callback
+        counter = UPDATES_DISPATCHED.labels(group)
+
+        if inspect.iscoroutinefunction(callback):
+
+            @wraps(callback)
+            async def counted_callback(*args, **kwargs):
+                counter.value += 1
+                return await callback(*args, **kwargs)
+
+        else:
+
+            @wraps(callback)
+            def counted_callback(*args, **kwargs):
+                counter.value += 1
+                return callback(*args, **kwargs)
+
+        handler.callback = counted_callback
+
+    def add_handler(self, handler, group: int = 0):
+        """Handlers added during a hot reload are held back and swapped in with the reloaded plugins."""
+        self.count_dispatches(handler, group)
+
+        if self.staged_handlers is not None:
+            self.staged_handlers.append((handler, group))
+            return handler, group
+
+        for client in self.extra_clients:
+            pyrogram.Client.add_handler(client, handler, group)
+
+        return super().add_handler(handler, group)
+
+    def remove_handler(self, handler, group: int = 0):
+        for client in self.extra_clients:
+            pyrogram.Client.remove_handler(client, handler, group)
+
+        return super().remove_handler(handler, group)
 
     @cached_property
     def is_bot(self) -> bool:
@@ -67,24 +198,55 @@ class BOT(CustomDecorators, Methods, pyrogram.Client):
         """Import Inbuilt and external Modules"""
         import_modules(ub_core_dir)
         import_modules(Config.WORKING_DIR)
-        LOGGER.info("Plugins Imported.")
+        PLUGIN_MANIFEST.save()
+        LOGGER.info(f"Plugins Imported. [{len(PLUGIN_MANIFEST.lazy_modules)} deferred]")
 
     async def boot(self) -> None:
         Config.TASK_MANAGER.loop = self.loop
 
-        await super().start()
+        LOOP_WATCHDOG.start(self.loop, threshold=Config.LOOP_STALL_THRESHOLD)
+
+        if Config.SHARDS > 1 and Config.SHARD_ID is None:
+            from .sharding import ShardFront
+
+            await ShardFront(self).run()
+            LOOP_WATCHDOG.stop()
+            sys.exit(self.exit_code)
+
+        with BOOT_PROFILER.phase("connect"):
+            await super().start()
+            await asyncio.gather(*(client.start() for client in self.extra_clients))
+
+        LOGGER.info(f"Connected to TG. [{len(Config.CLIENTS)} clients]")
+
+        with BOOT_PROFILER.phase("plugins"):
+            await run_in_thread(self._import, pool="io")
 
-        LOGGER.info("Connected to TG.")
+        with BOOT_PROFILER.phase("init_tasks"):
+            await Config.TASK_MANAGER.run_init_tasks()
 
-        await asyncio.to_thread(self._import)
+        if Config.SHARD_ID is not None:
+            from .sharding import ShardWorker
 
-        await Config.TASK_MANAGER.run_init_tasks()
+            self.shard = ShardWorker(self)
+            await self.shard.start()
 
-        await self.log_text(text="<i>Started</i>")
+        # Shards share the log chat, one Started message is enough.
+        if not Config.SHARD_ID:
+            with BOOT_PROFILER.phase("started_log"):
+                await self.log_text(text="<i>Started</i>")
+
+        LOGGER.info(BOOT_PROFILER.report())
 
         LOGGER.info("Idling...")
         self.is_idling = True
 
+        if PLUGIN_MANIFEST.lazy_modules:
+            Config.TASK_MANAGER.create_bg_task(PLUGIN_MANIFEST.import_lazy_modules(), name="lazy-plugin-import")
+
+        if Config.HOT_RELOAD:
+            self.reloader.start()
+
         await idle()
 
         await self.shut_down()
@@ -102,6 +264,12 @@ class BOT(CustomDecorators, Methods, pyrogram.Client):
     async def shut_down(self) -> None:
         """Gracefully ShutDown all Processes"""
         LOGGER.info("Stopping all processes...")
+        LOOP_WATCHDOG.stop()
+
+        if self.shard is not None:
+            await self.shard.stop()
+
         await Config.TASK_MANAGER.close_and_run_exit_tasks()
+        await asyncio.gather(*(client.stop() for client in self.extra_clients if client.is_connected))
         await super().stop()
         LOGGER.info("Exiting...")
@@ -6,11 +6,20 @@ import typing
 import pyrogram
 
 from .types import Message
+from ..diagnostics import METRICS
 
 if typing.TYPE_CHECKING:
     from .client import BOT
 
 
+CONVERSATIONS = METRICS.gauge("ub_conversations", "Active conversations.")
+
+
+@METRICS.add_collector
+def collect_conversation_metrics() -> None:
+    CONVERSATIONS.set(sum(len(convos) for convos in Conversation.CONVO_DICT.values()))
+
+
 # Relies on ub_core/core/handlers/conversation
 class Conversation:
     """A Custom Class to get responses from chats"""
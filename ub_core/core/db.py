@@ -5,20 +5,44 @@ from collections.abc import Iterable
 from datetime import UTC, datetime
 
 from dns import asyncresolver, resolver
-from pymongo import AsyncMongoClient
+from pymongo import AsyncMongoClient, monitoring
 from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.results import DeleteResult, UpdateResult
 
 from ..config import Config
+from ..diagnostics import METRICS
 
 LOGGER = logging.getLogger(Config.BOT_NAME)
 
-resolver.default_resolver = resolver.Resolver(configure=False)
-resolver.default_resolver.nameservers = ["8.8.8.8"]
+DB_DURATION = METRICS.histogram(
+    "ub_db_command_duration_seconds", "Time taken by mongo commands.", labels=("command", "status")
+)
 
-asyncresolver.default_resolver = asyncresolver.Resolver(configure=False)
-asyncresolver.default_resolver.nameservers = ["8.8.8.8"]
+
+class CommandMetrics(monitoring.CommandListener):
+    """Records the duration pymongo reports for every command."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        DB_DURATION.labels(event.command_name, "ok").observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        DB_DURATION.labels(event.command_name, "error").observe(event.duration_micros / 1e6)
+
+
+def configure_dns() -> None:
+    """Point dnspython (used by pymongo for srv uris) at a public resolver, done when the first db client is made."""
+    if getattr(resolver.default_resolver, "nameservers", None) == ["8.8.8.8"]:
+        return
+
+    resolver.default_resolver = resolver.Resolver(configure=False)
+    resolver.default_resolver.nameservers = ["8.8.8.8"]
+
+    asyncresolver.default_resolver = asyncresolver.Resolver(configure=False)
+    asyncresolver.default_resolver.nameservers = ["8.8.8.8"]
 
 
 DB_URI: str = os.environ.get("DB_URL", "").strip()
@@ -112,7 +136,8 @@ class CustomCollection(AsyncCollection):
 
 class CustomDatabase:
     def __init__(self, db_uri: str, db_name: str):
-        self._client: AsyncMongoClient = AsyncMongoClient(db_uri)
+        configure_dns()
+        self._client: AsyncMongoClient = AsyncMongoClient(db_uri, event_listeners=[CommandMetrics()])
         self._db: AsyncDatabase = self._client[db_name]
 
         Config.TASK_MANAGER.add_exit(self._client.close)
@@ -1,21 +1,29 @@
-import inspect
-from collections.abc import Callable
+import sys
+from collections.abc import Callable, Iterable
 
 from ...config import Cmd, Config
 
 
 class AddCmd:
     @staticmethod
-    def add_cmd(cmd: str | list[str], allow_sudo: bool = True):
-        """A Custom Decorator to add commands to bot and alternative to pyro's on_message"""
+    def add_cmd(cmd: str | list[str], allow_sudo: bool = True, clients: str | Iterable[str] | None = None):
+        """
+        A Custom Decorator to add commands to bot and alternative to pyro's on_message
+        clients: client names or "user" / "bot" to only run the cmd on those clients, all clients by default.
+        """
 
         def the_decorator(func: Callable):
-            path = inspect.stack()[1][1]
-            if isinstance(cmd, list):
-                for _cmd in cmd:
-                    Config.CMD_DICT[_cmd] = Cmd(cmd=_cmd, func=func, path=path, allow_sudo=allow_sudo)
-            else:
-                Config.CMD_DICT[cmd] = Cmd(cmd=cmd, func=func, path=path, allow_sudo=allow_sudo)
+            # Caller's file, without building the whole stack like inspect.stack() does.
+            path = sys._getframe(1).f_code.co_filename
+
+            for _cmd in cmd if isinstance(cmd, list) else [cmd]:
+                cmd_object = Cmd(cmd=_cmd, func=func, path=path, allow_sudo=allow_sudo, clients=clients)
+
+                # Keep sudo state when a lazy stub or a reloaded module's cmd is replaced.
+                if old_cmd_object := Config.CMD_DICT.get(_cmd):
+                    cmd_object.loaded_for_sudo = old_cmd_object.loaded_for_sudo
+
+                Config.CMD_DICT[_cmd] = cmd_object
 
             return func
 
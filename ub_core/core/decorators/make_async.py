@@ -1,24 +1,60 @@
-from asyncio import iscoroutine, iscoroutinefunction, to_thread
+from asyncio import iscoroutine, iscoroutinefunction
 from collections.abc import Callable
 from functools import wraps
+from typing import Literal
+
+from ..executors import run_in_thread
 
 
 class MakeAsync:
     @staticmethod
-    def make_async(function: Callable):
+    def make_async(
+        function: Callable | None = None,
+        *,
+        executor: Literal["thread", "process"] = "thread",
+        pool: str = "user",
+        timeout: float | None = None,
+    ):
         """
-        Wraps a non-async function in asyncio.to_thread
+        Wraps a non-async function to run in a thread of the named pool (see core.executors)
         and returns an async function that must be awaited.
 
+        Works as @make_async, @make_async(pool="io") and @make_async(executor="process", timeout=60)
+        executor="process" runs CPU bound code in the process pool (see core.process_pool),
+        the function has to be defined at module level and its arguments and result must be picklable.
+        Workers import the function's module without a bot, keep it in a module without import side effects
+        (no @bot decorators, clients or tasks), not in the plugin that uses it.
+        timeout is only supported with the process executor, threads can't be stopped.
+
         @param function: Callable
         @return: Any
         """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+
+        if timeout is not None and executor != "process":
+            raise ValueError("timeout is only supported with executor='process'")
+
+        def decorator(func: Callable) -> Callable:
+            if iscoroutinefunction(func) or iscoroutine(func):
+                raise ValueError(f"Non-Async function expected, got async function/coroutine {func}")
+
+            if executor == "thread":
+
+                @wraps(func)
+                async def wrapper(*args, **kwargs):
+                    return await run_in_thread(func, *args, pool=pool, **kwargs)
+
+                return wrapper
+
+            from ..process_pool import PROCESS_POOL
 
-        if iscoroutinefunction(function) or iscoroutine(function):
-            raise ValueError(f"Non-Async function expected, got async function/coroutine {function}")
+            @wraps(func)
+            async def process_wrapper(*args, **kwargs):
+                return await PROCESS_POOL.run(func, *args, timeout=timeout, **kwargs)
 
-        @wraps(function)
-        async def wrapper(*args, **kwargs):
-            return await to_thread(function, *args, **kwargs)
+            # Pool workers import the module and find this wrapper, this points them at the real function.
+            process_wrapper.__process_target__ = func
+            return process_wrapper
 
-        return wrapper
+        return decorator(function) if function is not None else decorator
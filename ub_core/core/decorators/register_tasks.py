@@ -1,14 +1,35 @@
 import inspect
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
 from ...config import Config
 
 
 class RegisterTask:
     @staticmethod
-    def register_init(fn: Callable) -> Callable:
-        Config.TASK_MANAGER.add_init(fn())
-        return fn
+    def register_init(
+        fn: Callable | None = None,
+        *,
+        name: str | None = None,
+        depends_on: Iterable[str] = (),
+        timeout: float | None = None,
+        critical: bool = True,
+    ) -> Callable:
+        """
+        Works as @register_init and @register_init(name=..., depends_on=[...], timeout=..., critical=...)
+        See TaskManager.add_init for the options.
+        """
+
+        def inner(func: Callable) -> Callable:
+            Config.TASK_MANAGER.add_init(
+                func(),
+                name=name or f"{func.__module__}.{func.__qualname__}",
+                depends_on=depends_on,
+                timeout=timeout,
+                critical=critical,
+            )
+            return func
+
+        return inner(fn) if fn is not None else inner
 
     @staticmethod
     def register_exit(fn: Callable) -> Callable:
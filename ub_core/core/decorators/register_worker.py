@@ -1,16 +1,26 @@
 from collections.abc import Callable
 
 from ...config import Config
+from ...scheduler import CatchUp, OverlapPolicy, ScheduleMode
 
 
 class RegisterWorker:
     @staticmethod
     def register_worker(
-        interval: int,
+        interval: float | None = None,
         name: str = None,
         break_condition: Callable = None,
         ignore_if_exists: bool = True,
+        cron: str | None = None,
+        mode: ScheduleMode = ScheduleMode.FIXED_DELAY,
+        jitter: float = 0,
+        max_overlap: int = 1,
+        on_overlap: OverlapPolicy = OverlapPolicy.SKIP,
+        catch_up: CatchUp = CatchUp.ONCE,
+        run_at_start: bool = True,
     ):
+        """See TaskManager.create_worker for the schedule options."""
+
         def inner(function: Callable):
             _name = name or f"{function.__name__}-worker"
 
@@ -21,7 +31,17 @@ class RegisterWorker:
                     return function
 
             Config.TASK_MANAGER.create_worker(
-                function=function, interval=interval, name=_name, break_condition=break_condition
+                function=function,
+                interval=interval,
+                name=_name,
+                break_condition=break_condition,
+                cron=cron,
+                mode=mode,
+                jitter=jitter,
+                max_overlap=max_overlap,
+                on_overlap=on_overlap,
+                catch_up=catch_up,
+                run_at_start=run_at_start,
             )
             return function
 
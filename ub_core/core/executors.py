@@ -0,0 +1,135 @@
+import asyncio
+import contextvars
+import functools
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+
+from ..config import Config
+from ..diagnostics import METRICS
+
+POOL_QUEUE_DEPTH = METRICS.gauge(
+    "ub_thread_pool_queue_depth", "Calls submitted to a thread pool that no thread has picked up yet.", labels=("pool",)
+)
+
+POOL_ACTIVE = METRICS.gauge("ub_thread_pool_active_threads", "Threads busy running a call.", labels=("pool",))
+
+POOL_SIZE = METRICS.gauge("ub_thread_pool_size", "Max threads of a thread pool.", labels=("pool",))
+
+POOL_WAIT = METRICS.histogram(
+    "ub_thread_pool_wait_seconds",
+    "Time calls spent queued before a thread picked them up.",
+    labels=("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+DEFAULT_SIZES: dict[str, int] = {
+    # Files, db drivers, plugin imports.
+    "io": min(32, (cpu_count() or 1) + 4),
+    # Fetch/pull can hang on the network, keep them from taking threads anything else needs.
+    "git": 2,
+    # Short bits of parsing or hashing that shouldn't go through the process pool.
+    "cpu-light": cpu_count() or 1,
+    # make_async and run_unknown_callable from plugins.
+    "user": min(32, (cpu_count() or 1) + 4),
+}
+
+
+class ThreadPool:
+    """
+    A named ThreadPoolExecutor, started on first use.
+
+    run() works like asyncio.to_thread but on this pool, and records how long calls waited for a thread.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name: str = name
+        self.size: int = size
+        self.executor: ThreadPoolExecutor | None = None
+        self.in_flight: int = 0
+
+        self.wait_time = POOL_WAIT.labels(name)
+        POOL_SIZE.labels(name).set(size)
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix=f"pool-{self.name}")
+        return self.executor
+
+    @property
+    def queue_depth(self) -> int:
+        # The executor's own queue, safe to read from any thread.
+        return self.executor._work_queue.qsize() if self.executor else 0
+
+    @property
+    def active(self) -> int:
+        return max(0, self.in_flight - self.queue_depth)
+
+    async def run(self, function: Callable, *args, **kwargs):
+        """Run function(*args, **kwargs) in this pool and return its result."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, function, *args, **kwargs)
+        submitted = time.perf_counter()
+        started = None
+
+        def run_call():
+            nonlocal started
+            started = time.perf_counter()
+            return call()
+
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self.get_executor(), run_call)
+        finally:
+            self.in_flight -= 1
+            # Observed here on the loop thread, metrics aren't thread safe.
+            if started is not None:
+                self.wait_time.observe(started - submitted)
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+class ThreadPools:
+    """
+    Named thread pools so slow work of one kind can't starve the rest, unlike the loop's shared default executor.
+
+    io, git, cpu-light and user are the built-in pools, sized by DEFAULT_SIZES or Config.THREAD_POOL_SIZES.
+    Any other name gets its own pool on first use.
+    """
+
+    def __init__(self):
+        self.pools: dict[str, ThreadPool] = {}
+        METRICS.add_collector(self.collect_metrics)
+
+    def get(self, name: str) -> ThreadPool:
+        pool = self.pools.get(name)
+
+        if pool is None:
+            if not self.pools:
+                Config.TASK_MANAGER.add_exit(self.shutdown)
+
+            size = Config.THREAD_POOL_SIZES.get(name) or DEFAULT_SIZES.get(name) or DEFAULT_SIZES["user"]
+            pool = self.pools[name] = ThreadPool(name, size)
+
+        return pool
+
+    def collect_metrics(self) -> None:
+        for name, pool in self.pools.items():
+            POOL_QUEUE_DEPTH.labels(name).set(pool.queue_depth)
+            POOL_ACTIVE.labels(name).set(pool.active)
+
+    def shutdown(self) -> None:
+        for pool in self.pools.values():
+            pool.shutdown()
+
+
+THREAD_POOLS = ThreadPools()
+
+
+async def run_in_thread(function: Callable, *args, pool: str = "user", **kwargs):
+    """asyncio.to_thread on one of THREAD_POOLS."""
+    return await THREAD_POOLS.get(pool).run(function, *args, **kwargs)
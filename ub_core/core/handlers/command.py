@@ -3,16 +3,16 @@ from ub_core.config import Cmd, Config
 from ub_core.core.handlers import UnifiedHandler, cmd_dispatcher, create
 
 
-def cmd_check(message: Message, trigger: str, sudo: bool = False) -> bool:
+def cmd_check(message: Message, trigger: str, client, sudo: bool = False) -> bool:
     """
-    Check if first word of message is a valid cmd \n
+    Check if first word of message is a valid cmd that runs on this client \n
     if sudo: check if sudo users have access to the cmd.
     """
     start_str = message.text.split(maxsplit=1)[0]
     cmd = start_str.replace(trigger, "", 1)
     cmd_obj: Cmd | None = Config.CMD_DICT.get(cmd)
 
-    if not cmd_obj:
+    if not cmd_obj or not cmd_obj.runs_on(client):
         return False
 
     if sudo:
@@ -36,10 +36,10 @@ def owner_check(_, client, message: Message) -> bool:
         or (client.is_user and message.chat.id != Config.OWNER_ID and not message.outgoing)
     ):
         return False
-    return cmd_check(message, Config.CMD_TRIGGER)
+    return cmd_check(message, Config.CMD_TRIGGER, client)
 
 
-def sudo_check(_, __, message: Message) -> bool:
+def sudo_check(_, client, message: Message) -> bool:
     """Check if Message is from a Sudo User"""
     if (
         not Config.SUDO
@@ -48,10 +48,10 @@ def sudo_check(_, __, message: Message) -> bool:
         or message.from_user.id not in Config.SUDO_USERS
     ):
         return False
-    return cmd_check(message, Config.SUDO_TRIGGER, sudo=True)
+    return cmd_check(message, Config.SUDO_TRIGGER, client, sudo=True)
 
 
-def super_user_check(_, __, message: Message):
+def super_user_check(_, client, message: Message):
     """Check if Message is from a Super User"""
     if (
         basic_check(message)
@@ -60,7 +60,7 @@ def super_user_check(_, __, message: Message):
         or message.from_user.id in Config.DISABLED_SUPERUSERS
     ):
         return False
-    return cmd_check(message, Config.SUDO_TRIGGER)
+    return cmd_check(message, Config.SUDO_TRIGGER, client)
 
 
 CMD_FILTER = create(owner_check) | create(sudo_check) | create(super_user_check)
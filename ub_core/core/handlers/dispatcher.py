@@ -1,5 +1,6 @@
 import asyncio
-from collections import defaultdict
+import time
+from collections import OrderedDict, defaultdict
 from collections.abc import Callable
 from datetime import UTC, datetime, timedelta
 
@@ -9,9 +10,17 @@ from pyrogram.types import Message as MessageUpdate
 from ..types import Message
 from ... import BOT
 from ...config import Config
+from ...diagnostics import BOOT_PROFILER, COMMAND_STATS, METRICS
 
 MESSAGE_TEXT_CACHE = defaultdict(str)
 
+# Commands already picked up by one of Config.CLIENTS, see claimed_by_other_client.
+CLAIMED_COMMANDS: OrderedDict[tuple, str] = OrderedDict()
+CLAIMED_COMMANDS_SIZE = 1000
+
+COMMANDS = METRICS.counter("ub_commands_total", "Commands run, by outcome.", labels=("cmd", "status"))
+COMMAND_DURATION = METRICS.histogram("ub_command_duration_seconds", "Time taken by commands.", labels=("cmd",))
+
 
 def anti_reaction(message: MessageUpdate):
     """Check if Message.text is same as before or if message is older than 6 hours and stop execution"""
@@ -28,6 +37,32 @@ def anti_reaction(message: MessageUpdate):
     return False
 
 
+def claimed_by_other_client(client: BOT, message: MessageUpdate) -> bool:
+    """
+    With EXTRA_CLIENTS, a cmd sent where several accounts can see it is run only by the first client to get it.
+
+    Message ids differ per account in basic groups, so the key is what every account sees the same:
+    chat, sender, date and text.
+    """
+    if len(Config.CLIENTS) < 2:
+        return False
+
+    sender_id = message.from_user.id if message.from_user else None
+    key = (message.chat.id, sender_id, message.date, message.text)
+    claimant = CLAIMED_COMMANDS.setdefault(key, client.name)
+
+    if len(CLAIMED_COMMANDS) > CLAIMED_COMMANDS_SIZE:
+        CLAIMED_COMMANDS.popitem(last=False)
+
+    return claimant != client.name
+
+
+def record_command(cmd: str, duration: float, status: str) -> None:
+    COMMAND_STATS.get(cmd).finish(duration, status)
+    COMMAND_DURATION.labels(cmd).observe(duration)
+    COMMANDS.labels(cmd, status).inc()
+
+
 async def cmd_dispatcher(
     client: BOT,
     update: MessageUpdate,
@@ -41,6 +76,9 @@ async def cmd_dispatcher(
     if check_for_reactions and anti_reaction(update):
         update.stop_propagation()
 
+    if is_command and claimed_by_other_client(client, update):
+        update.stop_propagation()
+
     if use_custom_object:
         update = Message(update)
 
@@ -52,9 +90,29 @@ async def cmd_dispatcher(
         func = cmd_object.func
 
     task = Config.TASK_MANAGER.create_temp_task(func(client, update), name=update.task_id)
+    start = time.perf_counter()
+    duration = 0.0
+    status = "ok"
+
+    if is_command:
+        COMMAND_STATS.get(update.cmd).start()
 
     try:
-        await task
+        # Stats cover the cmd's own run and outcome, not the delete and usage logging after it.
+        try:
+            await task
+        except asyncio.exceptions.CancelledError:
+            status = "cancelled"
+            raise
+        except (StopPropagation, ContinuePropagation):
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+
+        BOOT_PROFILER.mark_first_update()
 
         if is_command:
             if update.is_from_owner:
@@ -74,5 +132,10 @@ async def cmd_dispatcher(
     except Exception as e:
         client.log.error(e, exc_info=True, extra={"tg_message": update})
 
+    finally:
+        # Always, so in-flight counts come back down whatever the handlers above raise.
+        if is_command:
+            record_command(update.cmd, duration, status)
+
     if is_command:
         update.stop_propagation()
@@ -1,11 +1,146 @@
+import asyncio
+import gzip
+import html
+import json
+import shutil
+import time
+from collections import Counter, deque
 from pathlib import Path
 
 from ub_core import Config, Message, bot, utils
+from ub_core.config import get_shard_path
+from ub_core.core.executors import run_in_thread
 
-LOG_FILE = Path("logs/usage_record.txt").resolve()
+LOG_DIR = Path("logs").resolve()
 
-LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-LOG_FILE.unlink(missing_ok=True)
+JOURNAL_FILE = Path(get_shard_path(str(LOG_DIR / "usage_journal.jsonl")))
+
+LOG_DIR.mkdir(parents=True, exist_ok=True)
+# Left behind by older versions.
+(LOG_DIR / "usage_record.txt").unlink(missing_ok=True)
+
+
+class UsageJournal:
+    """
+    Command usage as JSON lines, written in batches off the loop.
+
+    record() only appends to a bounded buffer, the oldest records are dropped if flushes fall behind.
+    The buffer is written by a worker every FLUSH_INTERVAL seconds, the file is gzipped into an archive
+    once it grows past MAX_SIZE or gets uploaded, and only the newest MAX_ARCHIVES are kept.
+    Per user and per command counts are kept alongside so a summary never has to re-read the file.
+    """
+
+    FLUSH_INTERVAL: int = 10
+    MAX_BUFFER: int = 1000
+    MAX_SIZE: int = 1024 * 1024
+    MAX_ARCHIVES: int = 10
+
+    def __init__(self, path: Path):
+        self.path: Path = path
+        self.buffer: deque[dict] = deque(maxlen=self.MAX_BUFFER)
+        self.dropped: int = 0
+        self.unsent: list[Path] = []
+        self.lock = asyncio.Lock()
+
+        self.since: float = time.time()
+        self.cmd_counts: Counter[str] = Counter()
+        self.user_counts: Counter[str] = Counter()
+
+    def record(self, entry: dict) -> None:
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+
+        self.buffer.append(entry)
+        self.cmd_counts[entry["cmd"]] += 1
+        self.user_counts[f"{entry['user']} [{entry['user_id']}]"] += 1
+
+    def take_buffer(self) -> list[dict]:
+        entries = list(self.buffer)
+        self.buffer.clear()
+        return entries
+
+    def write(self, entries: list[dict]) -> None:
+        if entries:
+            with self.path.open("a", encoding="utf-8") as file:
+                file.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+
+        if self.path.is_file() and self.path.stat().st_size >= self.MAX_SIZE:
+            self.rotate()
+
+    def rotate(self) -> Path | None:
+        """Gzip the current file into an archive and start a new one."""
+        if not self.path.is_file() or self.path.stat().st_size == 0:
+            return None
+
+        archive = self.path.with_name(f"{self.path.stem}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz")
+
+        with self.path.open("rb") as source, gzip.open(archive, "wb") as target:
+            shutil.copyfileobj(source, target)
+
+        self.path.unlink()
+        self.unsent.append(archive)
+
+        for old in self.archives()[: -self.MAX_ARCHIVES]:
+            old.unlink(missing_ok=True)
+
+        return archive
+
+    def archives(self) -> list[Path]:
+        return sorted(self.path.parent.glob(f"{self.path.stem}-*.jsonl.gz"))
+
+    async def flush(self, rotate: bool = False) -> None:
+        async with self.lock:
+            entries = self.take_buffer()
+            await run_in_thread(self.write, entries, pool="io")
+
+            if rotate:
+                await run_in_thread(self.rotate, pool="io")
+
+    def take_unsent(self) -> list[Path]:
+        """Archives made since the last call that still exist."""
+        archives, self.unsent = self.unsent, []
+        return [archive for archive in archives if archive.is_file()]
+
+    def return_unsent(self, archives: list[Path]) -> None:
+        """Put archives that failed to upload back, ahead of any made since."""
+        self.unsent[:0] = archives
+
+    def flush_sync(self) -> None:
+        self.write(self.take_buffer())
+
+    def summary(self, limit: int = 10, max_length: int = 1024) -> str:
+        since = time.strftime("%d-%m %H:%M", time.localtime(self.since))
+        total = sum(self.cmd_counts.values())
+        shard = f" (shard {Config.SHARD_ID})" if Config.SHARD_ID is not None else ""
+        lines = [f"<b>#Usage</b>{shard} since {since}: {total} commands"]
+
+        if self.dropped:
+            lines.append(f"<i>{self.dropped} records dropped, buffer was full.</i>")
+
+        lines.append("\n<b>Commands:</b>")
+        lines.extend(f"{html.escape(cmd)}: {count}" for cmd, count in self.cmd_counts.most_common(limit))
+        lines.append("\n<b>Users:</b>")
+        lines.extend(f"{html.escape(user)}: {count}" for user, count in self.user_counts.most_common(limit))
+
+        text = "\n".join(lines)
+        # Cut on a line so no tag or entity is split.
+        while len(text) > max_length and "\n" in text:
+            text = text.rsplit("\n", 1)[0]
+        return text
+
+    def snapshot(self) -> tuple[Counter[str], Counter[str], int]:
+        return self.cmd_counts.copy(), self.user_counts.copy(), self.dropped
+
+    def reset_summary(self, sent: tuple[Counter[str], Counter[str], int]) -> None:
+        """Start a new summary, keeping whatever was counted after the sent snapshot was taken."""
+        cmd_counts, user_counts, dropped = sent
+        self.since = time.time()
+        self.dropped -= dropped
+        self.cmd_counts -= cmd_counts
+        self.user_counts -= user_counts
+
+
+USAGE_JOURNAL = UsageJournal(JOURNAL_FILE)
 
 
 def record_usage(update: Message):
@@ -25,26 +160,56 @@ def record_usage(update: Message):
         case _:
             pass
 
-    with LOG_FILE.open("a+") as f:
-        f.write(
-            f"user: {utils.get_name(update.from_user)}"
-            f"\ncmd: {update.cmd}"
-            f"\ninput: {update.input}"
-            f"\nlink: {getattr(update, 'link', '')}\n"
-            f"{'-' * 25}\n"
-        )
+    user = update.from_user or update.sender_chat
+
+    USAGE_JOURNAL.record(
+        {
+            "time": int(time.time()),
+            "user_id": user.id,
+            "user": utils.get_name(user),
+            "chat_id": update.chat.id,
+            "cmd": update.cmd,
+            "input": update.input,
+            "link": getattr(update, "link", ""),
+        }
+    )
+
+
+@bot.register_worker(interval=UsageJournal.FLUSH_INTERVAL, name="usage-journal-flush", run_at_start=False)
+async def flush_usage_journal():
+    if USAGE_JOURNAL.buffer:
+        await USAGE_JOURNAL.flush()
 
 
-@bot.register_worker(interval=3600, name="usage-record")
+@bot.register_exit
+def flush_usage_journal_on_exit():
+    USAGE_JOURNAL.flush_sync()
+
+
+@bot.register_worker(interval=3600, name="usage-record", run_at_start=False)
 async def upload_usage_record():
-    if Config.COMMAND_LOG_LEVEL == 0:
+    if Config.COMMAND_LOG_LEVEL == 0 or not USAGE_JOURNAL.cmd_counts:
         return
 
-    if not LOG_FILE.is_file() or LOG_FILE.stat().st_size == 0:
-        return
+    await USAGE_JOURNAL.flush(rotate=True)
 
-    await bot.send_document(
-        chat_id=Config.LOG_CHAT, message_thread_id=Config.LOG_CHAT_THREAD_ID, document=str(LOG_FILE)
-    )
+    archives = USAGE_JOURNAL.take_unsent()
+    snapshot = USAGE_JOURNAL.snapshot()
+    summary = USAGE_JOURNAL.summary()
+
+    for index, archive in enumerate(archives):
+        try:
+            await bot.send_document(
+                chat_id=Config.LOG_CHAT,
+                message_thread_id=Config.LOG_CHAT_THREAD_ID,
+                document=str(archive),
+                # Summary goes on the last one, it covers all of them.
+                caption=summary if archive == archives[-1] else "",
+            )
+        except Exception:
+            # Retried on the next run along with the summary.
+            USAGE_JOURNAL.return_unsent(archives[index:])
+            raise
 
-    LOG_FILE.write_text("")
+    if archives:
+        USAGE_JOURNAL.reset_summary(snapshot)
@@ -0,0 +1,264 @@
+import logging
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Generator
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO
+
+from ...config import get_shard_path
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+# Matches ColorFormatter's output, "%d-%m-%y %I:%M %p  LEVEL  [logger : module]  message"
+HEADER = re.compile(r"^(\d\d-\d\d-\d\d \d\d:\d\d [AP]M)  ([A-Z]+)  \[(.+?) : (.+?)\]  ")
+
+TIME_FORMAT = "%d-%m-%y %I:%M %p"
+
+
+def clean_line(raw: bytes) -> str:
+    return ANSI_ESCAPE.sub("", raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+
+
+class LogRecord:
+    """A header line and the traceback or raw lines logged with it."""
+
+    def __init__(self, offset: int, lines: list[str]):
+        self.offset: int = offset
+        self.lines: list[str] = lines
+
+        match = HEADER.match(lines[0]) if lines else None
+        self.time_text: str | None = match[1] if match else None
+        self.level: str | None = match[2] if match else None
+        self.logger: str | None = match[3] if match else None
+        self.module: str | None = match[4] if match else None
+
+    @property
+    def time(self) -> datetime | None:
+        return parse_time(self.time_text) if self.time_text else None
+
+    @property
+    def levelno(self) -> int:
+        level = logging.getLevelName(self.level) if self.level else 0
+        return level if isinstance(level, int) else 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines).rstrip("\n")
+
+
+_last_time: tuple[str, datetime] | None = None
+
+
+def parse_time(text: str) -> datetime:
+    # Logs are written with minute precision, consecutive records mostly share a timestamp.
+    global _last_time
+    if _last_time is None or _last_time[0] != text:
+        _last_time = (text, datetime.strptime(text, TIME_FORMAT))
+    return _last_time[1]
+
+
+class LogFilter:
+    def __init__(
+        self,
+        min_level: int = 0,
+        logger: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ):
+        self.min_level: int = min_level
+        self.logger: str | None = logger
+        self.since: datetime | None = since
+        self.until: datetime | None = until
+
+    @property
+    def has_time_range(self) -> bool:
+        return self.since is not None or self.until is not None
+
+    def matches(self, record: LogRecord) -> bool:
+        if self.min_level and record.levelno < self.min_level:
+            return False
+
+        if self.logger and (record.logger is None or self.logger not in record.logger):
+            return False
+
+        if self.has_time_range:
+            record_time = record.time
+            if record_time is None:
+                return False
+            if self.since and record_time < self.since:
+                return False
+            if self.until and record_time > self.until:
+                return False
+
+        return True
+
+
+class LogReader:
+    """
+    Reads the log file without loading it.
+
+    tail() seeks backwards from the end in BLOCK_SIZE blocks.
+    Time ranges start from a sparse index of (timestamp, offset), one entry every INDEX_STEP bytes,
+    extended from where it stopped on every query and rebuilt when the file is rotated.
+    search() streams records forward and only keeps the last few matches.
+    Blocking, call these from a thread, concurrent queries share the index under a lock.
+    """
+
+    BLOCK_SIZE: int = 64 * 1024
+    INDEX_STEP: int = 256 * 1024
+
+    def __init__(self, path: Path):
+        self.path: Path = path
+        self.index: list[tuple[datetime, int]] = []
+        self.indexed_upto: int = 0
+        self.file_id: tuple[int, int] | None = None
+        self.index_lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self.path.stat().st_size if self.path.is_file() else 0
+
+    @staticmethod
+    def iter_records(file: BinaryIO, offset: int = 0) -> Generator[LogRecord]:
+        file.seek(offset)
+        lines, start = [], offset
+
+        for raw in file:
+            line = clean_line(raw)
+
+            if HEADER.match(line) and lines:
+                yield LogRecord(start, lines)
+                lines, start = [], offset
+
+            lines.append(line)
+            offset += len(raw)
+
+        if lines:
+            yield LogRecord(start, lines)
+
+    def iter_lines_reversed(self, file: BinaryIO) -> Generator[tuple[int, bytes]]:
+        position = file.seek(0, os.SEEK_END)
+        remainder = b""
+
+        while position > 0:
+            size = min(self.BLOCK_SIZE, position)
+            position -= size
+            file.seek(position)
+            lines = (file.read(size) + remainder).split(b"\n")
+
+            # The first piece may be the tail of a line from the block before this one.
+            remainder = lines.pop(0)
+            offset = position + len(remainder) + 1
+            block_lines = []
+
+            for line in lines:
+                block_lines.append((offset, line))
+                offset += len(line) + 1
+
+            yield from reversed(block_lines)
+
+        if remainder:
+            yield 0, remainder
+
+    def iter_records_reversed(self, file: BinaryIO) -> Generator[LogRecord]:
+        lines = []
+
+        for offset, raw in self.iter_lines_reversed(file):
+            line = clean_line(raw)
+            lines.append(line)
+
+            if HEADER.match(line):
+                yield LogRecord(offset, lines[::-1])
+                lines = []
+
+        if lines:
+            yield LogRecord(0, lines[::-1])
+
+    def tail(self, count: int = 20, log_filter: LogFilter | None = None) -> list[LogRecord]:
+        """Last count records that pass the filter, oldest first."""
+        records = []
+
+        if not self.path.is_file():
+            return records
+
+        with self.path.open("rb") as file:
+            for record in self.iter_records_reversed(file):
+                if log_filter and log_filter.since:
+                    record_time = record.time
+                    if record_time is not None and record_time < log_filter.since:
+                        break
+
+                if log_filter is None or log_filter.matches(record):
+                    records.append(record)
+                    if len(records) >= count:
+                        break
+
+        return records[::-1]
+
+    def update_index(self) -> None:
+        """Call with index_lock held."""
+        stat = self.path.stat()
+        file_id = (stat.st_dev, stat.st_ino)
+
+        # Rotated or truncated, start over.
+        if file_id != self.file_id or stat.st_size < self.indexed_upto:
+            self.file_id = file_id
+            self.index.clear()
+            self.indexed_upto = 0
+
+        with self.path.open("rb") as file:
+            for record in self.iter_records(file, self.indexed_upto):
+                # The last record may still be getting its traceback, re-read it next time.
+                self.indexed_upto = record.offset
+
+                if record.time_text is None:
+                    continue
+
+                if not self.index or record.offset - self.index[-1][1] >= self.INDEX_STEP:
+                    self.index.append((record.time, record.offset))
+
+    def find_offset(self, since: datetime | None) -> int:
+        """Offset of an indexed record logged before since, reading from there can't miss anything."""
+        if since is None or not self.path.is_file():
+            return 0
+
+        with self.index_lock:
+            self.update_index()
+            position = bisect_left(self.index, since, key=lambda entry: entry[0])
+            return self.index[position - 1][1] if position else 0
+
+    def iter_range(self, log_filter: LogFilter | None = None) -> Generator[LogRecord]:
+        """Records that pass the filter, in order, starting from the index when there's a time range."""
+        if not self.path.is_file():
+            return
+
+        until = log_filter.until if log_filter else None
+
+        with self.path.open("rb") as file:
+            for record in self.iter_records(file, self.find_offset(log_filter.since if log_filter else None)):
+                if until is not None and record.time_text and record.time > until:
+                    break
+
+                if log_filter is None or log_filter.matches(record):
+                    yield record
+
+    def search(
+        self, pattern: re.Pattern, log_filter: LogFilter | None = None, limit: int = 20
+    ) -> tuple[list[LogRecord], int]:
+        """The last limit records that match pattern and the filter, and how many matched in total."""
+        matches = deque(maxlen=limit)
+        total = 0
+
+        for record in self.iter_range(log_filter):
+            if any(pattern.search(line) for line in record.lines):
+                matches.append(record)
+                total += 1
+
+        return list(matches), total
+
+
+APP_LOG_READER = LogReader(Path(get_shard_path("logs/app_logs.txt")).resolve())
@@ -3,6 +3,7 @@ from logging import ERROR, INFO, WARNING, Formatter, StreamHandler, basicConfig,
 
 from .telegram_log_record_handler import OnNetworkIssueHandler, TgErrorHandler
 from ... import Config
+from ...config import get_shard_path
 
 os.makedirs(name="logs", exist_ok=True)
 
@@ -66,7 +67,7 @@ custom_network_error_handler.setLevel(WARNING)
 custom_network_error_handler.setFormatter(ColorFormatter("network_error_handler"))
 
 
-file_handler = handlers.TimedRotatingFileHandler(filename="logs/app_logs.txt", when="W3", encoding="utf-8")
+file_handler = handlers.TimedRotatingFileHandler(filename=get_shard_path("logs/app_logs.txt"), when="W3", encoding="utf-8")
 file_handler.setFormatter(ColorFormatter("file_handler"))
 
 stream_handler = StreamHandler()
@@ -78,3 +79,11 @@ basicConfig(level=INFO, handlers={file_handler, stream_handler, custom_error_han
 getLogger("pyrogram").setLevel(WARNING)
 getLogger("httpx").setLevel(WARNING)
 getLogger("aiohttp.access").setLevel(WARNING)
+
+
+async def init_task():
+    Config.TASK_MANAGER.create_worker(
+        function=custom_error_handler.flush_to_tg,
+        interval=custom_error_handler.flush_interval,
+        name="tg-error-reporter",
+    )
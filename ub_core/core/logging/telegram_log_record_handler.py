@@ -1,6 +1,7 @@
-import asyncio
 import os
 import re
+import time
+from collections import deque
 from logging import Handler, LogRecord, getLogger
 
 from ub_core import Config, Message, bot
@@ -11,6 +12,8 @@ LOGGER = getLogger(Config.BOT_NAME)
 
 UPDATE_TYPES = Message
 
+ERROR_QUEUE_SIZE: int = 50
+
 
 def extract_message_from_traceback(tb) -> Message | None:
     while tb is not None:
@@ -37,11 +40,45 @@ def extract_message_info(message: Message | None) -> tuple[int, int | None, str
         return message_id, None, None
 
 
+def get_error_fingerprint(log_record: LogRecord) -> tuple[str, str, int]:
+    """Identify an error by its exception type and the line that raised it."""
+    if log_record.exc_info and log_record.exc_info[0]:
+        exc_type, _, tb = log_record.exc_info
+
+        while tb is not None and tb.tb_next is not None:
+            tb = tb.tb_next
+
+        if tb is not None:
+            return exc_type.__name__, tb.tb_frame.f_code.co_filename, tb.tb_lineno
+
+        return exc_type.__name__, log_record.pathname, log_record.lineno
+
+    return log_record.levelname, log_record.pathname, log_record.lineno
+
+
 class TgErrorHandler(Handler):
     """
     A Custom Logging Handler to Log Error and Above Events in TG LOG CHANNEL.
+
+    Records are de-duplicated by fingerprint and queued,
+    the queue is sent in batches by flush_to_tg() which runs as a worker.
     """
 
+    def __init__(
+        self,
+        suppress_window: int = Config.ERROR_SUPPRESS_WINDOW,
+        flush_interval: int = Config.ERROR_FLUSH_INTERVAL,
+        max_queue_size: int = ERROR_QUEUE_SIZE,
+    ):
+        super().__init__()
+        self.suppress_window = suppress_window
+        self.flush_interval = flush_interval
+
+        # fingerprint: [first seen, occurrences suppressed since]
+        self.occurrences: dict[tuple[str, str, int], list[float | int]] = {}
+        self.queue: deque[str] = deque(maxlen=max_queue_size)
+        self.dropped: int = 0
+
     def emit(self, log_record: LogRecord):
         try:
             self.format(log_record)
@@ -49,8 +86,35 @@ class TgErrorHandler(Handler):
         except Exception as e:
             print(e)
 
-    @staticmethod
-    def log_to_tg(log_record: LogRecord):
+    def queue_text(self, text: str) -> None:
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+
+        self.queue.append(text)
+
+    def summarise(self, fingerprint: tuple[str, str, int], count: int) -> str:
+        error_type, path, line_no = fingerprint
+        return (
+            f"#SUPPRESSED\n<b>{count}</b> more occurrences of <code>{error_type}</code>"
+            f"\n<b>Module</b>: <blockquote>{path}:{line_no}</blockquote>"
+            f"\n<b>Window</b>: <code>{self.suppress_window}s</code>"
+        )
+
+    def is_suppressed(self, fingerprint: tuple[str, str, int]) -> bool:
+        occurrence = self.occurrences.get(fingerprint)
+
+        if occurrence is None or time.time() - occurrence[0] >= self.suppress_window:
+            # The window ran out before a flush got to it, report its count before starting a new one.
+            if occurrence is not None and occurrence[1]:
+                self.queue_text(self.summarise(fingerprint, occurrence[1]))
+
+            self.occurrences[fingerprint] = [time.time(), 0]
+            return False
+
+        occurrence[1] += 1
+        return True
+
+    def log_to_tg(self, log_record: LogRecord):
         if not (bot.is_connected and bot.is_idling):
             return
 
@@ -61,6 +125,9 @@ class TgErrorHandler(Handler):
         ):
             return
 
+        if self.is_suppressed(get_error_fingerprint(log_record)):
+            return
+
         if hasattr(log_record, "tg_message"):
             tg_message = log_record.tg_message
         elif log_record.exc_info:
@@ -84,7 +151,52 @@ class TgErrorHandler(Handler):
         if not hasattr(log_record, "tg_message") and tg_message:
             text += f"\nUpdate Object: <pre language=json>{tg_message}</pre>"
 
-        asyncio.run_coroutine_threadsafe(coro=bot.log_text(text=text, name="traceback.txt"), loop=bot.loop)
+        self.queue_text(text)
+
+    def collect_suppressed(self) -> list[str]:
+        """Pop expired fingerprints and summarise the ones that were repeated."""
+        summaries = []
+        now = time.time()
+
+        for fingerprint, (first_seen, count) in list(self.occurrences.items()):
+            if now - first_seen < self.suppress_window:
+                continue
+
+            self.occurrences.pop(fingerprint)
+
+            if count:
+                summaries.append(self.summarise(fingerprint, count))
+
+        return summaries
+
+    async def flush_to_tg(self):
+        """Send queued tracebacks and suppression counters as a single message or document."""
+        if not (bot.is_connected and bot.is_idling):
+            return
+
+        with self.lock:
+            texts = [*self.queue, *self.collect_suppressed()]
+            self.queue.clear()
+            dropped, self.dropped = self.dropped, 0
+
+        if not texts:
+            return
+
+        header = []
+
+        if len(texts) > 1:
+            header.append(f"#BATCH <b>{len(texts)}</b> records")
+
+        if dropped:
+            header.append(f"#DROPPED <b>{dropped}</b> records because the queue was full.")
+
+        if header:
+            texts.insert(0, "\n".join(header))
+
+        try:
+            await bot.log_text(text="\n\n".join(texts), name="traceback.txt")
+        except Exception as e:
+            print(e)
 
 
 class OnNetworkIssueHandler(Handler):
@@ -2,9 +2,11 @@ import logging
 from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING
 
-from pyrogram import Client, utils
+from pyrogram import Client
 from pyrogram.enums import ParseMode
 
+from ..outbound import Priority
+from ..parser import parse_text
 from ...config import Config
 
 if TYPE_CHECKING:
@@ -24,14 +26,14 @@ class ChannelLogger(Client):
         type: str = "",
     ) -> "Message":
         """Log Text to Channel and to Stream/File if type matches logging method."""
-        text_and_entities = await utils.parse_text_entities(client=self, text=text, parse_mode=parse_mode, entities=[])
+        text = await parse_text(client=self, text=text, parse_mode=parse_mode)
 
         if type:
             if hasattr(LOGGER, type):
                 log = getattr(LOGGER, type)
-                log(text_and_entities["message"])
+                log(str(text))
 
-            text = f"#{type.upper()}\n{text}"
+            text = text.prepend(f"#{type.upper()}\n")
 
         schedule_date = None
         if not self.me.is_bot:
@@ -45,19 +47,23 @@ class ChannelLogger(Client):
             parse_mode=parse_mode,
             disable_notification=False,
             schedule_date=schedule_date,
-            message_thread_id=Config.LOG_CHAT_THREAD_ID
+            message_thread_id=Config.LOG_CHAT_THREAD_ID,
+            priority=Priority.LOW
         ))  # fmt:skip
 
-    async def log_message(self, message: "Message") -> "Message":
+    async def log_message(self: "BOT", message: "Message") -> "Message":
         """Log a Message to Log Channel"""
         schedule_date = None
 
         if not self.me.is_bot:
             schedule_date = datetime.now(UTC) + timedelta(seconds=10)
 
-        return (await message.copy(
+        return (await self.outbound.run(
+            Config.LOG_CHAT,
+            message.copy,
             chat_id=Config.LOG_CHAT,
             disable_notification=False,
             schedule_date=schedule_date,
-            message_thread_id=Config.LOG_CHAT_THREAD_ID
+            message_thread_id=Config.LOG_CHAT_THREAD_ID,
+            priority=Priority.LOW
         ))  # fmt:skip
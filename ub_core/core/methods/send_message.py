@@ -3,8 +3,9 @@ from typing import TYPE_CHECKING
 
 from pyrogram import Client
 from pyrogram.types import LinkPreviewOptions, ReplyParameters
-from pyrogram.utils import parse_text_entities
 
+from ..outbound import Priority
+from ..parser import MAX_MESSAGE_LENGTH, parse_text, split_parsed_text
 from ..types.message import Message
 
 if TYPE_CHECKING:
@@ -25,40 +26,45 @@ class SendMessage(Client):
         name: str = "output.txt",
         disable_preview: bool = None,
         reply_to_id: int = 0,
+        priority: Priority = Priority.NORMAL,
+        split: bool = False,
         **kwargs,
     ) -> Message | None:
         """
         Custom Method to Gracefully Handle text over 4096 chars. \n
-        Sends a document if text goes over the limit.
+        Sends a document if text goes over the limit or multiple messages if split is True.
+        Text is parsed once here and sent as ParsedText so pyrogram doesn't parse it again.
+        Calls are rate limited by the client's outbound scheduler.
         """
 
         if reply_to_id:
             kwargs["reply_parameters"] = ReplyParameters(message_id=reply_to_id)
 
-        if not isinstance(text, str):
-            text = str(text)
+        text = await parse_text(client=self, text=text, parse_mode=parse_mode or self.parse_mode, entities=entities)
 
-        text_and_entities = await parse_text_entities(
-            client=self,
-            text=text,
-            parse_mode=parse_mode or self.parse_mode,
-            entities=entities,
-        )
+        if isinstance(disable_preview, bool):
+            kwargs["link_preview_options"] = LinkPreviewOptions(is_disabled=disable_preview)
 
-        if len(text_and_entities["message"]) <= 4096:
-            if isinstance(disable_preview, bool):
-                kwargs["link_preview_options"] = LinkPreviewOptions(is_disabled=disable_preview)
-            message = await super().send_message(
-                chat_id=chat_id,
-                text=text,
-                entities=entities,
-                parse_mode=parse_mode,
-                **kwargs,
+        if len(text) <= MAX_MESSAGE_LENGTH:
+            message = await self.outbound.run(
+                chat_id, super().send_message, chat_id=chat_id, text=text, priority=priority, **kwargs
             )
             return Message(message=message)
 
+        if split:
+            message = None
+            for chunk in split_parsed_text(text):
+                message = await self.outbound.run(
+                    chat_id, super().send_message, chat_id=chat_id, text=chunk, priority=priority, **kwargs
+                )
+            return Message(message=message)
+
         kwargs.pop("link_preview_options", None)
 
-        doc = BytesIO(bytes(text_and_entities["message"], encoding="utf-8"))
+        doc = BytesIO(bytes(text, encoding="utf-8"))
         doc.name = name
-        return Message(await super().send_document(chat_id=chat_id, document=doc, **kwargs))
+        return Message(
+            await self.outbound.run(
+                chat_id, super().send_document, chat_id=chat_id, document=doc, priority=priority, **kwargs
+            )
+        )
@@ -0,0 +1,387 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any
+
+from pyrogram.errors import FloodWait, MessageIdInvalid, MessageNotModified
+
+from ..config import Config
+from ..diagnostics import METRICS
+
+if TYPE_CHECKING:
+    from pyrogram.types import Message
+
+    from .client import BOT
+
+LOGGER = logging.getLogger(Config.BOT_NAME)
+
+OUTBOUND_CALLS = METRICS.counter(
+    "ub_outbound_calls_total", "API calls released by the OutboundScheduler.", labels=("priority",)
+)
+OUTBOUND_WAIT = METRICS.histogram(
+    "ub_outbound_wait_seconds", "Time API calls waited for their turn.", labels=("priority",)
+)
+OUTBOUND_QUEUE = METRICS.gauge("ub_outbound_queue_depth", "API calls waiting for their turn.", labels=("priority",))
+FLOOD_WAITS = METRICS.counter("ub_flood_waits_total", "FloodWaits returned by TG.")
+FLOOD_WAIT_SECONDS = METRICS.counter("ub_flood_wait_seconds_total", "Seconds TG asked to wait in FloodWaits.")
+
+
+class Priority(IntEnum):
+    """Lower value is sent first."""
+
+    HIGH = 0  # Command Replies
+    NORMAL = 1
+    LOW = 2  # Logs, Progress Edits
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.default_rate: float = rate
+        self.rate: float = rate
+        self.capacity: float = capacity
+        self.tokens: float = capacity
+        self.updated: float = time.monotonic()
+        self.blocked_until: float = 0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available."""
+        self.refill(now)
+
+        if now < self.blocked_until:
+            return self.blocked_until - now
+
+        if self.tokens >= 1:
+            return 0
+
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def penalize(self, wait: float) -> None:
+        """Block for the FloodWait duration and halve the rate."""
+        self.tokens = 0
+        self.blocked_until = time.monotonic() + wait
+        self.rate = max(self.default_rate / 8, self.rate / 2)
+
+    def recover(self) -> None:
+        """Slowly climb back to the default rate after successful calls."""
+        if self.rate < self.default_rate:
+            self.rate = min(self.default_rate, self.rate * 1.1)
+
+    @property
+    def is_idle(self) -> bool:
+        return self.rate == self.default_rate and self.tokens >= self.capacity
+
+
+class OutboundScheduler:
+    """
+    Rate limits outgoing messages and edits per client.
+
+    A global bucket and one bucket per chat are matched to TG's limits:
+        ~30 messages/s overall, ~1 message/s in a chat and 20 messages/min in groups for bots.
+    Waiting calls are released in Priority order, so logs and progress edits queue behind command replies.
+    FloodWaits that reach the caller penalize the chat's bucket and the call is retried once the wait is over.
+    """
+
+    GLOBAL_RATE: float = 30
+    GLOBAL_BURST: float = 30
+
+    CHAT_RATE: float = 1
+    CHAT_BURST: float = 3
+
+    BOT_GROUP_RATE: float = 20 / 60
+    BOT_GROUP_BURST: float = 5
+
+    MAX_BUCKETS: int = 1024
+    MAX_FLOOD_RETRIES: int = 2
+    MAX_FLOOD_RETRY_WAIT: int = 60
+
+    def __init__(self, client: "BOT"):
+        self.client = client
+
+        self.global_bucket = TokenBucket(rate=self.GLOBAL_RATE, capacity=self.GLOBAL_BURST)
+        self.chat_buckets: dict[int | str, TokenBucket] = {}
+        self.queues: dict[Priority, deque[tuple[int | str, asyncio.Future, float]]] = {
+            priority: deque() for priority in Priority
+        }
+        self._timer: asyncio.TimerHandle | None = None
+
+        self.sent: int = 0
+        self.flood_waits: int = 0
+        self.last_flood_wait: int = 0
+        self.total_wait: float = 0
+        self.max_wait: float = 0
+
+        METRICS.add_collector(self.collect_metrics)
+
+    @property
+    def queue_depth(self) -> dict[str, int]:
+        return {priority.name: len(queue) for priority, queue in self.queues.items()}
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "sent": self.sent,
+            "avg_wait": round(self.total_wait / self.sent, 3) if self.sent else 0,
+            "max_wait": round(self.max_wait, 3),
+            "flood_waits": self.flood_waits,
+            "last_flood_wait": self.last_flood_wait,
+            "chat_buckets": len(self.chat_buckets),
+        }
+
+    def collect_metrics(self) -> None:
+        for priority, depth in self.queue_depth.items():
+            OUTBOUND_QUEUE.labels(priority).set(depth)
+
+    def create_bucket(self, chat_id: int | str) -> TokenBucket:
+        is_group = isinstance(chat_id, int) and chat_id < 0
+        is_bot = getattr(self.client.me, "is_bot", True)
+
+        if is_group and is_bot:
+            return TokenBucket(rate=self.BOT_GROUP_RATE, capacity=self.BOT_GROUP_BURST)
+
+        return TokenBucket(rate=self.CHAT_RATE, capacity=self.CHAT_BURST)
+
+    def get_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+
+        if bucket is None:
+            if len(self.chat_buckets) >= self.MAX_BUCKETS:
+                self.prune_buckets()
+
+            bucket = self.chat_buckets[chat_id] = self.create_bucket(chat_id)
+
+        return bucket
+
+    def prune_buckets(self) -> None:
+        now = time.monotonic()
+        for chat_id, bucket in list(self.chat_buckets.items()):
+            bucket.refill(now)
+            if bucket.is_idle and now >= bucket.blocked_until:
+                self.chat_buckets.pop(chat_id)
+
+    async def acquire(self, chat_id: int | str, priority: Priority = Priority.NORMAL) -> None:
+        """Wait till both the global and the chat bucket allow a call."""
+        future = asyncio.get_running_loop().create_future()
+        self.queues[priority].append((chat_id, future, time.monotonic()))
+        self.dispatch()
+        await future
+
+    def dispatch(self) -> None:
+        """Release every waiter that can go now and schedule a wake-up for the rest."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        next_delay: float | None = None
+
+        for priority in Priority:
+            queue = self.queues[priority]
+
+            for _ in range(len(queue)):
+                chat_id, future, queued_at = waiter = queue.popleft()
+
+                if future.done():
+                    continue
+
+                bucket = self.get_bucket(chat_id)
+                delay = max(self.global_bucket.delay(now), bucket.delay(now))
+
+                if delay:
+                    queue.append(waiter)
+                    next_delay = delay if next_delay is None else min(next_delay, delay)
+                    continue
+
+                self.global_bucket.consume()
+                bucket.consume()
+
+                waited = now - queued_at
+                self.sent += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+                OUTBOUND_CALLS.labels(priority.name).inc()
+                OUTBOUND_WAIT.labels(priority.name).observe(waited)
+
+                future.set_result(None)
+
+        if next_delay is not None:
+            self._timer = asyncio.get_running_loop().call_later(next_delay, self.dispatch)
+
+    def on_flood_wait(self, chat_id: int | str, wait: int) -> None:
+        LOGGER.warning(f"FloodWait of {wait}s in {chat_id}, slowing down outgoing messages for it.")
+        self.flood_waits += 1
+        self.last_flood_wait = wait
+        FLOOD_WAITS.inc()
+        FLOOD_WAIT_SECONDS.inc(wait)
+        self.get_bucket(chat_id).penalize(wait)
+
+    async def run(
+        self,
+        chat_id: int | str,
+        function: Callable[..., Awaitable],
+        /,
+        *args,
+        priority: Priority = Priority.NORMAL,
+        **kwargs,
+    ) -> Any:
+        """Call an API method once the chat's turn comes up and retry it after short FloodWaits."""
+        for attempt in range(self.MAX_FLOOD_RETRIES + 1):
+            await self.acquire(chat_id, priority)
+
+            try:
+                result = await function(*args, **kwargs)
+            except FloodWait as e:
+                wait = int(e.value)
+                self.on_flood_wait(chat_id, wait)
+
+                if attempt == self.MAX_FLOOD_RETRIES or wait > self.MAX_FLOOD_RETRY_WAIT:
+                    raise
+
+                continue
+
+            self.get_bucket(chat_id).recover()
+            return result
+
+
+class PendingEdit:
+    def __init__(self, message: "Message"):
+        self.message = message
+        self.text: str | None = None
+        self.kwargs: dict = {}
+        self.sent_text: str | None = None
+        self.last_edit: float = 0
+        self.task: asyncio.Task | None = None
+
+    @property
+    def is_pending(self) -> bool:
+        return (self.task is not None and not self.task.done()) or self.text != self.sent_text
+
+
+class EditCoalescer:
+    """
+    Latest-wins edits for progress and live output messages.
+
+    Callers submit the text they want a message to show,
+    a single task edits each message to its latest text at an interval
+    that grows with the number of live messages and the LOW priority backlog.
+    Texts that match what's already shown are never sent.
+    Messages with nothing new for IDLE_TIMEOUT are forgotten,
+    so transfers that failed or were cancelled before calling discard don't stay behind.
+    """
+
+    MIN_INTERVAL: float = 3
+    MAX_INTERVAL: float = 15
+    IDLE_TIMEOUT: float = 60
+
+    def __init__(self, client: "BOT"):
+        self.client = client
+
+        self.entries: dict[tuple[int, int], PendingEdit] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        self.sent: int = 0
+        self.skipped: int = 0
+
+    @property
+    def interval(self) -> float:
+        backlog = len(self.client.outbound.queues[Priority.LOW])
+        live = sum(entry.is_pending for entry in self.entries.values())
+        interval = self.MIN_INTERVAL * (1 + live // 4 + backlog // 8)
+        return min(interval, self.MAX_INTERVAL)
+
+    @staticmethod
+    def get_key(message: "Message") -> tuple[int, int]:
+        return message.chat.id, message.id
+
+    def submit(self, message: "Message", text: str, **kwargs) -> None:
+        """Set the text a message should show next, older pending texts are dropped."""
+        if Config.TASK_MANAGER.is_closed:
+            return
+
+        entry = self.entries.get(self.get_key(message))
+
+        if entry is None:
+            entry = self.entries[self.get_key(message)] = PendingEdit(message)
+        elif entry.text is not None and entry.text != entry.sent_text:
+            self.skipped += 1
+
+        entry.text = text
+        entry.kwargs = kwargs
+
+        if self._task is None or self._task.done():
+            self._task = Config.TASK_MANAGER.create_bg_task(self.run(), name="edit-coalescer")
+
+        self._wake.set()
+
+    async def discard(self, message: "Message") -> None:
+        """Drop pending text and wait for an in-flight edit so it can't land after the caller's final edit."""
+        entry = self.entries.pop(self.get_key(message), None)
+
+        if entry is not None and entry.task is not None:
+            await asyncio.gather(entry.task, return_exceptions=True)
+
+    async def run(self) -> None:
+        while not Config.TASK_MANAGER.is_closed:
+            now = time.monotonic()
+            next_due: float | None = None
+
+            for key, entry in list(self.entries.items()):
+                if entry.task is not None and not entry.task.done():
+                    continue
+
+                if entry.text == entry.sent_text:
+                    due = entry.last_edit + self.IDLE_TIMEOUT
+
+                    if now >= due:
+                        self.entries.pop(key)
+                        continue
+                else:
+                    due = entry.last_edit + self.interval
+
+                    if now >= due:
+                        entry.task = Config.TASK_MANAGER.create_temp_task(
+                            self.edit(entry), name=f"edit-coalescer:{key[0]}:{key[1]}"
+                        )
+                        continue
+
+                next_due = due if next_due is None else min(next_due, due)
+
+            self._wake.clear()
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=None if next_due is None else next_due - now)
+            except TimeoutError:
+                pass
+
+    async def edit(self, entry: PendingEdit) -> None:
+        from .types.message import Message
+
+        text, kwargs = entry.text, entry.kwargs
+
+        if isinstance(entry.message, Message):
+            kwargs = {"priority": Priority.LOW, **kwargs}
+
+        try:
+            await entry.message.edit(text=text, **kwargs)
+            self.sent += 1
+        except MessageNotModified:
+            pass
+        except MessageIdInvalid:
+            self.entries.pop(self.get_key(entry.message), None)
+        except Exception as e:
+            LOGGER.warning(f"EditCoalescer: {e}")
+        finally:
+            entry.sent_text = text
+            entry.last_edit = time.monotonic()
+            self._wake.set()
@@ -0,0 +1,165 @@
+import copy
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from pyrogram import enums, parser, utils
+from pyrogram.parser.utils import add_surrogates, remove_surrogates, within_surrogate
+
+if TYPE_CHECKING:
+    from pyrogram import raw
+    from pyrogram.types import MessageEntity
+
+    from .client import BOT
+
+MAX_MESSAGE_LENGTH = 4096
+
+
+class ParsedText(str):
+    """
+    Text that has already been through the parser, carrying its raw entities.
+    Parser returns it as is, so passing it to pyrogram methods doesn't parse it again.
+    """
+
+    entities: list["raw.base.MessageEntity"] | None
+
+    def __new__(cls, message: str, entities: list["raw.base.MessageEntity"] | None = None):
+        parsed_text = super().__new__(cls, message)
+        parsed_text.entities = entities or None
+        return parsed_text
+
+    def prepend(self, prefix: str) -> "ParsedText":
+        """Add plain text before the message and shift the entities by its length."""
+        shift = len(add_surrogates(prefix))
+        entities = []
+
+        for entity in self.entities or []:
+            entity = copy.copy(entity)
+            entity.offset += shift
+            entities.append(entity)
+
+        return ParsedText(prefix + self, entities)
+
+
+class Parser(parser.Parser):
+    """
+    Pyrogram's Parser with:
+        ParsedText passthrough.
+        An LRU cache for short texts which are often repeated (progress, status and log messages).
+    """
+
+    CACHE_SIZE: int = 128
+    MAX_CACHED_LENGTH: int = 8192
+
+    def __init__(self, client: "BOT"):
+        super().__init__(client)
+        self.cache: OrderedDict[tuple[enums.ParseMode, str], dict] = OrderedDict()
+
+    async def parse(self, text: str, mode: enums.ParseMode | None = None) -> dict:
+        if isinstance(text, ParsedText):
+            return {"message": str(text), "entities": text.entities}
+
+        if mode is None:
+            mode = self.client.parse_mode if self.client else enums.ParseMode.DEFAULT
+
+        if not isinstance(text, str) or len(text) > self.MAX_CACHED_LENGTH:
+            return await super().parse(text, mode)
+
+        key = (mode, text)
+        result = self.cache.get(key)
+
+        if result is None:
+            result = self.cache[key] = await super().parse(text, mode)
+
+            if len(self.cache) > self.CACHE_SIZE:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+
+        return {"message": result["message"], "entities": result["entities"] and list(result["entities"])}
+
+
+async def parse_text(
+    client: "BOT",
+    text: str,
+    parse_mode: enums.ParseMode | None = None,
+    entities: list["MessageEntity"] | None = None,
+) -> ParsedText:
+    """Parse text once and return a ParsedText that can be measured, split and sent without parsing again."""
+    if isinstance(text, ParsedText):
+        return text
+
+    text_and_entities = await utils.parse_text_entities(
+        client=client, text=str(text), parse_mode=parse_mode or client.parse_mode, entities=entities
+    )
+    return ParsedText(text_and_entities["message"], text_and_entities["entities"])
+
+
+def clip_entities(
+    entities: list["raw.base.MessageEntity"] | None, start: int, end: int
+) -> list["raw.base.MessageEntity"] | None:
+    """Return copies of entities that overlap start:end with offsets relative to start."""
+    clipped = []
+
+    for entity in entities or []:
+        entity_start = max(entity.offset, start)
+        entity_end = min(entity.offset + entity.length, end)
+
+        if entity_end <= entity_start:
+            continue
+
+        entity = copy.copy(entity)
+        entity.offset = entity_start - start
+        entity.length = entity_end - entity_start
+        clipped.append(entity)
+
+    return clipped or None
+
+
+def split_parsed_text(text: ParsedText, limit: int = MAX_MESSAGE_LENGTH) -> list[ParsedText]:
+    """
+    Split a ParsedText into chunks of up to limit chars.
+    Cuts at the last line break (or space) before the limit,
+    entities are clipped to each chunk so formatting like code blocks carries over.
+    """
+    # Entity offsets are in UTF-16 code units.
+    surrogated = add_surrogates(text)
+    total = len(surrogated)
+
+    chunks = []
+    start = 0
+
+    while start < total:
+        end = min(start + limit, total)
+
+        if end < total:
+            cut = surrogated.rfind("\n", start, end)
+
+            if cut <= start:
+                cut = surrogated.rfind(" ", start, end)
+
+            if cut > start:
+                end = cut + 1
+
+            while within_surrogate(surrogated, end):
+                end -= 1
+
+        chunk_start, chunk_end = start, end
+
+        # TG trims whitespace around messages which would shift the entities.
+        while chunk_start < chunk_end and surrogated[chunk_start].isspace():
+            chunk_start += 1
+
+        while chunk_end > chunk_start and surrogated[chunk_end - 1].isspace():
+            chunk_end -= 1
+
+        if chunk_end > chunk_start:
+            chunks.append(
+                ParsedText(
+                    remove_surrogates(surrogated[chunk_start:chunk_end]),
+                    clip_entities(text.entities, chunk_start, chunk_end),
+                )
+            )
+
+        start = end
+
+    return chunks
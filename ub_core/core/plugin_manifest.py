@@ -0,0 +1,288 @@
+import ast
+import asyncio
+import importlib
+import json
+import logging
+import sys
+from pathlib import Path
+from types import ModuleType
+
+from .executors import run_in_thread
+from ..config import Cmd, Config
+from ..diagnostics import BOOT_PROFILER
+
+LOGGER = logging.getLogger(Config.BOT_NAME)
+
+MANIFEST_PATH = Path(".cache/plugin_manifest.json")
+# Bumped whenever scan_module gets stricter, so cached entries are scanned again.
+MANIFEST_VERSION = 3
+
+# Top level statements a module may have and still be imported on demand.
+SAFE_NODES = (
+    ast.Import,
+    ast.ImportFrom,
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+    ast.Assign,
+    ast.AnnAssign,
+)
+
+
+def parse_add_cmd(decorator: ast.expr) -> tuple[list[str], bool, list[str]] | None:
+    """Return cmds, allow_sudo and clients of a literal @BOT.add_cmd(...) decorator."""
+    if not (
+        isinstance(decorator, ast.Call)
+        and isinstance(decorator.func, ast.Attribute)
+        and decorator.func.attr == "add_cmd"
+        and isinstance(decorator.func.value, ast.Name)
+        and decorator.func.value.id in ("BOT", "bot")
+    ):
+        return None
+
+    arguments = dict(zip(("cmd", "allow_sudo", "clients"), decorator.args))
+    arguments.update({keyword.arg: keyword.value for keyword in decorator.keywords})
+
+    try:
+        cmd = ast.literal_eval(arguments["cmd"])
+        allow_sudo = ast.literal_eval(arguments["allow_sudo"]) if "allow_sudo" in arguments else True
+        clients = ast.literal_eval(arguments["clients"]) if "clients" in arguments else None
+    except (KeyError, ValueError, TypeError, SyntaxError):
+        return None
+
+    cmds = cmd if isinstance(cmd, list) else [cmd]
+
+    if not all(isinstance(_cmd, str) for _cmd in cmds):
+        return None
+
+    if isinstance(clients, str):
+        clients = [clients]
+
+    if clients is not None and not all(isinstance(client, str) for client in clients):
+        return None
+
+    return cmds, bool(allow_sudo), list(clients or ())
+
+
+def is_pure_value(node: ast.expr | None) -> bool:
+    """Literals, names and containers of those: nothing that runs code on import."""
+    if node is None:
+        return True
+    return not any(isinstance(child, (ast.Call, ast.Await, ast.Lambda, ast.NamedExpr)) for child in ast.walk(node))
+
+
+def has_pure_signature(node: ast.FunctionDef | ast.AsyncFunctionDef) -> bool:
+    """Default values and annotations are evaluated when the def runs, on import for module level functions."""
+    arguments = node.args
+    annotations = [arg.annotation for arg in (*arguments.posonlyargs, *arguments.args, *arguments.kwonlyargs)]
+    annotations.extend(arg.annotation for arg in (arguments.vararg, arguments.kwarg) if arg is not None)
+    values = (*arguments.defaults, *arguments.kw_defaults, *annotations, node.returns)
+    return all(is_pure_value(value) for value in values)
+
+
+def is_pure_class(node: ast.ClassDef) -> bool:
+    """The class body runs on import: allow only docstrings, defs with pure signatures and pure assignments."""
+    if node.decorator_list or not all(is_pure_value(base) for base in node.bases):
+        return False
+
+    if not all(is_pure_value(keyword.value) for keyword in node.keywords):
+        return False
+
+    for statement in node.body:
+        if isinstance(statement, ast.Pass) or (
+            isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant)
+        ):
+            continue
+
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            # Names like staticmethod or property, a decorator call like @register(...) runs code.
+            if not has_pure_signature(statement) or not all(
+                isinstance(decorator, (ast.Name, ast.Attribute)) for decorator in statement.decorator_list
+            ):
+                return False
+
+        elif isinstance(statement, ast.ClassDef):
+            if not is_pure_class(statement):
+                return False
+
+        elif isinstance(statement, ast.Assign):
+            if not is_pure_value(statement.value):
+                return False
+
+        elif isinstance(statement, ast.AnnAssign):
+            if not (is_pure_value(statement.value) and is_pure_value(statement.annotation)):
+                return False
+
+        else:
+            return False
+
+    return True
+
+
+def scan_module(file: Path) -> dict:
+    """
+    Read a plugin's commands without importing it.
+    A module is lazy if it only defines things and registers cmds via literal add_cmd decorators,
+    anything else (init_task, handlers, workers, if blocks, bare calls) keeps it eager.
+    """
+    try:
+        tree = ast.parse(file.read_bytes(), filename=str(file))
+    except (SyntaxError, ValueError, OSError):
+        return {"lazy": False, "cmds": []}
+
+    cmds = []
+
+    for index, node in enumerate(tree.body):
+        if index == 0 and isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            continue
+
+        if not isinstance(node, SAFE_NODES):
+            return {"lazy": False, "cmds": []}
+
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.name == "init_task" or not has_pure_signature(node):
+                return {"lazy": False, "cmds": []}
+
+            for decorator in node.decorator_list:
+                add_cmd_args = parse_add_cmd(decorator)
+
+                if add_cmd_args is None:
+                    return {"lazy": False, "cmds": []}
+
+                doc = ast.get_docstring(node, clean=False) or "Not Documented."
+                cmds.extend(
+                    {"cmd": cmd, "allow_sudo": add_cmd_args[1], "clients": add_cmd_args[2], "doc": doc}
+                    for cmd in add_cmd_args[0]
+                )
+
+        elif isinstance(node, ast.ClassDef):
+            if not is_pure_class(node):
+                return {"lazy": False, "cmds": []}
+
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and not is_pure_value(node.value):
+            return {"lazy": False, "cmds": []}
+
+    return {"lazy": bool(cmds), "cmds": cmds}
+
+
+class PluginManifest:
+    """
+    Cached map of plugin files to the cmds they register.
+
+    Lazy plugins aren't imported at boot, their cmds go into CMD_DICT as stubs
+    which import the module on first use. Whatever is left is imported in the background once the bot is idling.
+    Entries are re-scanned when a file's mtime or size changes.
+    """
+
+    BACKGROUND_IMPORT_DELAY: int = 10
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path: Path = path
+        self.entries: dict[str, dict] = {}
+        self.lazy_modules: dict[str, Path] = {}
+        self.changed: bool = False
+        self.load()
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+
+        if data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("modules", {})
+
+    def save(self) -> None:
+        if not self.changed:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps({"version": MANIFEST_VERSION, "modules": self.entries}))
+            temp_path.replace(self.path)
+            self.changed = False
+        except OSError as e:
+            LOGGER.warning(f"PluginManifest: couldn't save manifest: {e}")
+
+    def get_entry(self, file: Path, module_name: str) -> dict:
+        stat = file.stat()
+        key = str(file)
+        entry = self.entries.get(key)
+
+        if (
+            entry is None
+            or entry.get("mtime_ns") != stat.st_mtime_ns
+            or entry.get("size") != stat.st_size
+            or entry.get("module") != module_name
+        ):
+            entry = self.entries[key] = {
+                "module": module_name,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                **scan_module(file),
+            }
+            self.changed = True
+
+        return entry
+
+    def defer(self, file: Path, module_name: str) -> bool:
+        """Register stubs for a lazy module instead of importing it, returns False if it must be imported now."""
+        if module_name in sys.modules:
+            return False
+
+        try:
+            entry = self.get_entry(file, module_name)
+        except OSError:
+            return False
+
+        if not entry["lazy"]:
+            return False
+
+        for cmd in entry["cmds"]:
+            stub = self.create_stub(module_name=module_name, cmd=cmd["cmd"], doc=cmd["doc"])
+            Config.CMD_DICT[cmd["cmd"]] = Cmd(
+                cmd=cmd["cmd"], func=stub, path=str(file), allow_sudo=cmd["allow_sudo"], clients=cmd["clients"]
+            )
+
+        self.lazy_modules[module_name] = file
+        return True
+
+    def import_module(self, module_name: str) -> ModuleType:
+        if module_name in sys.modules:
+            module = sys.modules[module_name]
+        else:
+            with BOOT_PROFILER.plugin_import(module_name, lazy=True):
+                module = importlib.import_module(module_name)
+        self.lazy_modules.pop(module_name, None)
+        return module
+
+    def create_stub(self, module_name: str, cmd: str, doc: str):
+        async def lazy_cmd(bot, message):
+            await run_in_thread(self.import_module, module_name, pool="io")
+
+            cmd_object = Config.CMD_DICT.get(cmd)
+
+            if cmd_object is None or cmd_object.func is lazy_cmd:
+                raise RuntimeError(f"{module_name} was imported but didn't register {cmd}")
+
+            return await cmd_object.func(bot, message)
+
+        lazy_cmd.__doc__ = doc
+        lazy_cmd.__module__ = module_name
+        return lazy_cmd
+
+    async def import_lazy_modules(self) -> None:
+        """Import the remaining lazy modules one by one after boot."""
+        await asyncio.sleep(self.BACKGROUND_IMPORT_DELAY)
+
+        for module_name in list(self.lazy_modules):
+            try:
+                await run_in_thread(self.import_module, module_name, pool="io")
+            except Exception as e:
+                LOGGER.error(e, exc_info=True)
+
+        LOGGER.info("Lazy Plugins Imported.")
+
+
+PLUGIN_MANIFEST = PluginManifest()
@@ -0,0 +1,160 @@
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import pickle
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ..config import Config
+
+LOGGER = logging.getLogger(Config.BOT_NAME)
+
+# Read into Config.IS_POOL_WORKER, importing ub_core with it set skips the client, logging and tasks.
+WORKER_ENV = "UB_PROCESS_POOL_WORKER"
+
+# The pool's initializer, exec'd in each worker before it unpickles anything that imports ub_core.
+# A function from ub_core can't be used: unpickling it would import ub_core before WORKER_ENV is set.
+WORKER_SETUP = f"""
+import os, signal
+os.environ[{WORKER_ENV!r}] = "1"
+# Ctrl+C reaches the whole process group, the parent shuts the pool down.
+signal.signal(signal.SIGINT, signal.SIG_IGN)
+"""
+
+
+def resolve_target(target: tuple) -> Callable:
+    kind, value = target[0], target[1:]
+
+    if kind == "object":
+        return value[0]
+
+    module_name, qualname = value
+
+    try:
+        function = importlib.import_module(module_name)
+
+        for attr in qualname.split("."):
+            function = getattr(function, attr)
+    except Exception as e:
+        raise RuntimeError(
+            f"{module_name} failed to import in a process pool worker: {type(e).__name__}: {e}\n"
+            f"Process targets must live in modules without import side effects, "
+            f"move {qualname} out of the plugin into a module that doesn't use bot decorators or start anything."
+        ) from None
+
+    # The module attribute is the make_async wrapper, run what it wraps.
+    return getattr(function, "__process_target__", function)
+
+
+def run_payload(payload: bytes) -> bytes:
+    """Runs in the pool, both ways are pickled here so pickling errors are reported as such."""
+    target, args, kwargs = pickle.loads(payload)
+    result = resolve_target(target)(*args, **kwargs)
+
+    try:
+        return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise TypeError(f"Result of {target[-1]} can't be sent back from the process pool: {e}") from None
+
+
+def get_target(function: Callable) -> tuple:
+    """Module level functions are sent by name, anything else (bound methods, partials) is pickled."""
+    qualname = getattr(function, "__qualname__", "")
+
+    if hasattr(function, "__module__") and qualname and "<" not in qualname and "." not in qualname:
+        return "name", function.__module__, qualname
+
+    if "<locals>" in qualname or "<lambda>" in qualname:
+        raise TypeError(
+            f"{qualname} can't run in the process pool, it must be importable: define it at module level."
+        )
+
+    return ("object", function)
+
+
+class ProcessPool:
+    """
+    ProcessPoolExecutor for CPU bound plugin code, started on first use with Config.PROCESS_POOL_SIZE workers.
+
+    Workers are forked from a clean forkserver process instead of this one, which has the loop,
+    pyrogram's connections and a bunch of threads going.
+    Functions are imported by name in the workers, so they must be defined at module level
+    in a module without import side effects: workers have no bot, so @bot decorators fail there.
+    A call that runs past its timeout can't be interrupted, the pool is killed and started again on the next call.
+    """
+
+    def __init__(self):
+        self.executor: ProcessPoolExecutor | None = None
+        self.exit_registered: bool = False
+
+    @staticmethod
+    def get_context() -> multiprocessing.context.BaseContext:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return multiprocessing.get_context(method)
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=Config.PROCESS_POOL_SIZE,
+                mp_context=self.get_context(),
+                initializer=exec,
+                initargs=(WORKER_SETUP, {}),
+            )
+
+            # The pool is started again after a timeout, shutdown only needs registering once.
+            if not self.exit_registered:
+                Config.TASK_MANAGER.add_exit(self.shutdown)
+                self.exit_registered = True
+
+            LOGGER.info(f"Process pool started with {Config.PROCESS_POOL_SIZE} workers.")
+
+        return self.executor
+
+    async def run(self, function: Callable, *args, timeout: float | None = None, **kwargs):
+        """Run function(*args, **kwargs) in the pool and return its result."""
+        name = getattr(function, "__qualname__", repr(function))
+
+        target = get_target(function)
+
+        try:
+            payload = pickle.dumps((target, args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            raise TypeError(f"Arguments of {name} can't be sent to the process pool: {e}") from None
+
+        executor = self.get_executor()
+        future = executor.submit(run_payload, payload)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except TimeoutError:
+            if not future.done():
+                LOGGER.warning(f"{name} timed out after {timeout}s in the process pool, restarting the pool.")
+                self.terminate(executor)
+            raise TimeoutError(f"{name} took longer than {timeout}s in the process pool.") from None
+        except BrokenProcessPool:
+            self.terminate(executor)
+            raise RuntimeError(f"{name}: the process pool was restarted or a worker died while running it.") from None
+
+        return pickle.loads(result)
+
+    def terminate(self, executor: ProcessPoolExecutor) -> None:
+        """Kill the pool's workers, running calls fail with BrokenProcessPool."""
+        if executor is self.executor:
+            self.executor = None
+
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.terminate(self.executor)
+
+
+PROCESS_POOL = ProcessPool()
+
@@ -0,0 +1,405 @@
+import ast
+import asyncio
+import importlib
+import logging
+import sys
+import time
+import traceback
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+from ub_core import ub_core_dir
+
+from .plugin_manifest import PLUGIN_MANIFEST
+from ..config import Cmd, Config
+from ..scheduler import Worker
+from ..task_manager import InitTask
+
+if TYPE_CHECKING:
+    from pyrogram.handlers.handler import Handler
+
+    from .client import BOT
+    from ..utils.file_watcher import FileWatcher
+
+LOGGER = logging.getLogger(Config.BOT_NAME)
+
+
+def get_coro_file(task: asyncio.Task) -> str | None:
+    code = getattr(task.get_coro(), "cr_code", None)
+    return code.co_filename if code else None
+
+
+class PluginResources:
+    """Everything a set of modules registered: cmds, pyrogram handlers, workers, bg tasks and exit callbacks."""
+
+    def __init__(self, client: "BOT", modules: set[str], files: set[str]):
+        self.cmds: dict[str, Cmd] = {
+            name: cmd for name, cmd in Config.CMD_DICT.items() if getattr(cmd.func, "__module__", None) in modules
+        }
+        # @wraps on the dispatch wrappers carries the plugin's module name over.
+        self.handlers: list[tuple["Handler", int]] = [
+            (handler, group)
+            for group, handlers in client.dispatcher.groups.items()
+            for handler in handlers
+            if getattr(handler.callback, "__module__", None) in modules
+        ]
+        # get_tasks falls back to every task when a type has none, hence the isinstance checks.
+        self.workers: list[Worker] = [
+            worker
+            for worker in Config.TASK_MANAGER.get_tasks(task_type="workers")
+            if isinstance(worker, Worker) and getattr(worker.function, "__module__", None) in modules
+        ]
+        self.bg_tasks: list[asyncio.Task] = [
+            task
+            for task in Config.TASK_MANAGER.get_tasks(task_type="bg")
+            if isinstance(task, asyncio.Task) and get_coro_file(task) in files
+        ]
+        self.exit_callbacks: list[Callable] = [
+            callback
+            for callback in Config.TASK_MANAGER.get_tasks(task_type="exit")
+            if callable(callback) and getattr(callback, "__module__", None) in modules
+        ]
+
+
+class ReloadResult:
+    def __init__(self, modules: list[str]):
+        self.modules: list[str] = modules
+        self.deferred: list[str] = []
+        self.added_cmds: set[str] = set()
+        self.removed_cmds: set[str] = set()
+        self.handlers: tuple[int, int] = (0, 0)
+        self.workers: tuple[int, int] = (0, 0)
+        self.bg_tasks: tuple[int, int] = (0, 0)
+        self.error: str | None = None
+        self.init_errors: dict[str, str] = {}
+        self.duration: float = 0
+
+    def __str__(self):
+        if self.error:
+            return f"Reload failed, kept the old modules:\n{self.error}"
+
+        lines = [f"Reloaded {len(self.modules)} module(s) in {self.duration:.3f}s:", *self.modules]
+
+        if self.deferred:
+            lines.append(f"deferred: {', '.join(self.deferred)}")
+        if self.added_cmds or self.removed_cmds:
+            lines.append(f"cmds: +{sorted(self.added_cmds)} -{sorted(self.removed_cmds)}")
+
+        lines.append(
+            f"handlers: {self.handlers[0]} -> {self.handlers[1]}, "
+            f"workers: {self.workers[0]} -> {self.workers[1]}, "
+            f"bg tasks: {self.bg_tasks[0]} -> {self.bg_tasks[1]}"
+        )
+        lines.extend(f"init task {name} failed: {error}" for name, error in self.init_errors.items())
+        return "\n".join(lines)
+
+
+class HotReloader:
+    """
+    Re-import changed plugins and the plugins that import from them, then swap what they registered.
+
+    Imports run on the loop thread so no update is handled halfway through a swap:
+        new cmds replace old ones and cmds that are gone are removed,
+        pyrogram handlers are added to a staging list and swapped in with a single assignment of dispatcher.groups,
+        old workers and bg tasks are cancelled, their exit callbacks are replaced by the new ones,
+        init tasks registered by the imports run with run_init_tasks and are dropped otherwise.
+    If an import fails, the old modules, cmds, handlers and tasks are all kept.
+
+    In DEV_MODE a FileWatcher over WORKING_DIR triggers this on save.
+    """
+
+    def __init__(self, client: "BOT"):
+        self.client = client
+        self.lock = asyncio.Lock()
+        self.watcher: "FileWatcher | None" = None
+
+    @staticmethod
+    def get_plugin_roots() -> list[Path]:
+        return [Config.WORKING_DIR, ub_core_dir / "default_plugins"]
+
+    @classmethod
+    def get_module_name(cls, file: Path) -> str | None:
+        file = file.resolve()
+
+        for root in cls.get_plugin_roots():
+            if file.is_relative_to(root):
+                package_dir = ub_core_dir.parent if root.is_relative_to(ub_core_dir) else root.parent
+                parts = file.relative_to(package_dir).with_suffix("").parts
+                return ".".join(parts[:-1] if parts[-1] == "__init__" else parts)
+
+        return None
+
+    @classmethod
+    def is_plugin_module(cls, module: ModuleType) -> bool:
+        file = getattr(module, "__file__", None)
+        return bool(file) and any(Path(file).is_relative_to(root) for root in cls.get_plugin_roots())
+
+    @staticmethod
+    def get_imports(file: Path, module_name: str, is_package: bool) -> set[str]:
+        """Modules a file imports, read from its source so `from x import CONSTANT` counts too."""
+        try:
+            tree = ast.parse(file.read_bytes(), filename=str(file))
+        except (SyntaxError, ValueError, OSError):
+            return set()
+
+        package = module_name if is_package else module_name.rpartition(".")[0]
+        imports = set()
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imports.update(alias.name for alias in node.names)
+
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    base = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                    base = f"{base}.{node.module}" if node.module else base
+                else:
+                    base = node.module
+
+                imports.add(base)
+                # from package import submodule
+                imports.update(f"{base}.{alias.name}" for alias in node.names)
+
+        return imports
+
+    @classmethod
+    def find_dependents(cls, names: set[str]) -> set[str]:
+        """names and every loaded plugin module that imports them, directly or not."""
+        dependents: dict[str, set[str]] = defaultdict(set)
+        modules = {
+            name: module for name, module in list(sys.modules.items()) if module and cls.is_plugin_module(module)
+        }
+
+        for name, lazy_file in PLUGIN_MANIFEST.lazy_modules.items():
+            modules.setdefault(name, lazy_file)
+
+        for name, module in modules.items():
+            file = module if isinstance(module, Path) else Path(module.__file__)
+
+            for dependency in cls.get_imports(file, name, is_package=file.name == "__init__.py"):
+                if dependency != name:
+                    dependents[dependency].add(name)
+
+        result = set(names)
+        pending = list(names)
+
+        while pending:
+            for dependent in dependents.get(pending.pop(), ()):
+                if dependent not in result:
+                    result.add(dependent)
+                    pending.append(dependent)
+
+        return result
+
+    def swap_handlers(self, old: list[tuple["Handler", int]], new: list[tuple["Handler", int]]) -> None:
+        """
+        Build new handler lists and assign them in one go, on every client in Config.CLIENTS.
+        Dispatcher workers that are mid-way through the old lists finish with them untouched.
+        """
+        old_ids = {id(handler) for handler, _ in old}
+
+        for client in Config.CLIENTS or [self.client]:
+            groups: dict[int, list] = {
+                group: [handler for handler in handlers if id(handler) not in old_ids]
+                for group, handlers in client.dispatcher.groups.items()
+            }
+
+            for handler, group in new:
+                groups.setdefault(group, []).append(handler)
+
+            client.dispatcher.groups = OrderedDict(sorted(groups.items()))
+
+    @staticmethod
+    def restore_modules(modules: set[str], old_modules: dict[str, ModuleType]) -> None:
+        for name in modules:
+            sys.modules.pop(name, None)
+
+        for name, module in old_modules.items():
+            sys.modules[name] = module
+            parent, _, child = name.rpartition(".")
+
+            if parent in sys.modules:
+                setattr(sys.modules[parent], child, module)
+
+    @staticmethod
+    def take_init_tasks(snapshot: set[InitTask]) -> list[InitTask]:
+        """Init tasks registered since the snapshot, removed from the store so they don't wait there forever."""
+        init_tasks = [
+            init_task
+            for init_task in Config.TASK_MANAGER.get_tasks(task_type="init")
+            if isinstance(init_task, InitTask) and init_task not in snapshot
+        ]
+        Config.TASK_MANAGER.detach_tasks(init_tasks, "init")
+        return init_tasks
+
+    @staticmethod
+    def drop_init_tasks(init_tasks: list[InitTask]) -> None:
+        for init_task in init_tasks:
+            if asyncio.iscoroutine(init_task.coro):
+                init_task.coro.close()
+
+    async def reload_modules(
+        self,
+        names: set[str],
+        files: dict[str, Path] | None = None,
+        allow_lazy: bool = True,
+        run_init_tasks: bool = False,
+    ) -> ReloadResult:
+        """
+        Reload the named modules along with their dependents, missing files are unloaded.
+        files maps module names that aren't loaded yet to their path.
+        """
+        async with self.lock:
+            start = time.perf_counter()
+            task_manager = Config.TASK_MANAGER
+
+            files = dict(files or {})
+            modules = self.find_dependents(names)
+
+            for name in modules:
+                if name not in files and getattr(sys.modules.get(name), "__file__", None):
+                    files[name] = Path(sys.modules[name].__file__)
+                elif name not in files and name in PLUGIN_MANIFEST.lazy_modules:
+                    files[name] = PLUGIN_MANIFEST.lazy_modules[name]
+
+            result = ReloadResult(sorted(modules))
+            old = PluginResources(self.client, modules, {str(file) for file in files.values()})
+
+            cmd_snapshot = dict(Config.CMD_DICT)
+            lazy_snapshot = dict(PLUGIN_MANIFEST.lazy_modules)
+            old_modules = {name: sys.modules.pop(name) for name in modules if name in sys.modules}
+
+            for name in modules:
+                PLUGIN_MANIFEST.lazy_modules.pop(name, None)
+
+            # Lazy stubs and cmds of deleted modules go, the imports below add back what still exists.
+            for cmd in old.cmds:
+                Config.CMD_DICT.pop(cmd, None)
+
+            task_manager.detach_tasks(old.bg_tasks, "bg")
+            # Boot already ran and cleared the init store, anything in it after the import is from these modules.
+            init_snapshot = set(task_manager.get_tasks(task_type="init"))
+            importlib.invalidate_caches()
+            self.client.staged_handlers = []
+
+            try:
+                for name in sorted(modules):
+                    file = files.get(name)
+
+                    if file is None or not file.is_file() or name in sys.modules:
+                        continue
+
+                    if allow_lazy and not Config.EAGER_LOAD and PLUGIN_MANIFEST.defer(file, name):
+                        result.deferred.append(name)
+                        continue
+
+                    # Private modules are only imported by the plugins that use them.
+                    if file.name.startswith("_") and name not in names:
+                        continue
+
+                    importlib.import_module(name)
+
+            except BaseException:
+                staged = self.client.staged_handlers
+                self.client.staged_handlers = None
+
+                new = PluginResources(self.client, modules, {str(file) for file in files.values()})
+
+                self.restore_modules(modules, old_modules)
+                Config.CMD_DICT.clear()
+                Config.CMD_DICT.update(cmd_snapshot)
+                PLUGIN_MANIFEST.lazy_modules.update(lazy_snapshot)
+
+                [worker.cancel() for worker in new.workers if worker not in old.workers]
+                [task.cancel() for task in new.bg_tasks]
+                task_manager.detach_tasks(set(new.exit_callbacks) - set(old.exit_callbacks), "exit")
+                self.drop_init_tasks(self.take_init_tasks(init_snapshot))
+
+                for worker in old.workers:
+                    task_manager.scheduler.workers[worker.name] = worker
+
+                task_manager.attach_tasks(old.bg_tasks, "bg")
+
+                result.error = traceback.format_exc()
+                result.handlers = (len(old.handlers), len(staged))
+                LOGGER.error(f"Reload of {', '.join(sorted(modules))} failed.\n{result.error}")
+                return result
+
+            staged = self.client.staged_handlers
+            self.client.staged_handlers = None
+            imported = sorted(name for name in modules if name in sys.modules)
+
+            new = PluginResources(self.client, modules, {str(file) for file in files.values()})
+            new_init_tasks = self.take_init_tasks(init_snapshot)
+
+            self.swap_handlers(old.handlers, staged)
+            [worker.cancel() for worker in old.workers]
+            [task.cancel() for task in old.bg_tasks]
+            # The re-imported modules registered their exit callbacks again.
+            task_manager.detach_tasks(old.exit_callbacks, "exit")
+
+            result.added_cmds = new.cmds.keys() - old.cmds.keys()
+            result.removed_cmds = old.cmds.keys() - new.cmds.keys()
+            result.handlers = (len(old.handlers), len(staged))
+            result.workers = (len(old.workers), len([worker for worker in new.workers if worker not in old.workers]))
+            result.bg_tasks = (len(old.bg_tasks), len(new.bg_tasks))
+
+            PLUGIN_MANIFEST.save()
+
+            if run_init_tasks:
+                for init_task in new_init_tasks:
+                    try:
+                        await asyncio.wait_for(init_task.coro, timeout=init_task.timeout)
+                    except Exception as e:
+                        result.init_errors[init_task.name] = f"{type(e).__name__}: {e}"
+                        LOGGER.exception(e)
+
+                for name in imported:
+                    module = sys.modules.get(name)
+
+                    if not hasattr(module, "init_task"):
+                        continue
+
+                    try:
+                        await module.init_task()
+                    except Exception as e:
+                        result.init_errors[f"{name}.init_task"] = f"{type(e).__name__}: {e}"
+                        LOGGER.exception(e)
+            else:
+                self.drop_init_tasks(new_init_tasks)
+
+            result.duration = time.perf_counter() - start
+            LOGGER.info(str(result))
+            return result
+
+    async def reload_files(self, paths: set[Path]) -> ReloadResult | None:
+        files = {}
+
+        for path in paths:
+            name = self.get_module_name(path)
+
+            if name and (name in sys.modules or name in PLUGIN_MANIFEST.lazy_modules or path.is_file()):
+                files[name] = path
+
+        if not files:
+            return None
+
+        return await self.reload_modules(set(files), files=files, run_init_tasks=True)
+
+    async def watch(self) -> None:
+        from ..utils.file_watcher import FileWatcher
+
+        self.watcher = FileWatcher(Config.WORKING_DIR)
+
+        async for paths in self.watcher.changes():
+            try:
+                await self.reload_files(paths)
+            except Exception as e:
+                LOGGER.error(e, exc_info=True)
+
+    def start(self) -> None:
+        Config.TASK_MANAGER.create_bg_task(self.watch(), name="plugin-hot-reload", replace=True)
+        LOGGER.info(f"Watching {Config.WORKING_DIR} for plugin changes.")
@@ -0,0 +1,453 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import struct
+import sys
+import time
+from collections import deque
+from enum import IntEnum
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+from pyrogram import idle, raw, utils
+from pyrogram.raw.core import Int, TLObject
+
+from ..config import Config
+from ..diagnostics import METRICS
+from ..diagnostics.metrics import UPDATES_RECEIVED, CountingQueue
+
+if TYPE_CHECKING:
+    from .client import BOT
+
+LOGGER = logging.getLogger(Config.BOT_NAME)
+
+FRAME_HEADER = struct.Struct(">BI")
+
+SYNCED_SETS = ("SUDO_USERS", "SUPERUSERS", "DISABLED_SUPERUSERS")
+
+SHARD_UPDATES = METRICS.counter("ub_shard_updates_total", "Updates routed to each shard.", labels=("shard",))
+
+SHARD_DROPPED = METRICS.counter(
+    "ub_shard_updates_dropped_total", "Updates dropped because a shard fell too far behind.", labels=("shard",)
+)
+
+SHARD_RESTARTS = METRICS.counter(
+    "ub_shard_restarts_total", "Shard processes restarted after crashing.", labels=("shard",)
+)
+
+
+class Frame(IntEnum):
+    UPDATE = 1
+    STATE = 2
+    STOP = 3
+    SESSION = 4
+
+
+def pack_frame(kind: Frame, payload: bytes = b"") -> bytes:
+    return FRAME_HEADER.pack(kind, len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[Frame, bytes]:
+    kind, length = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    return Frame(kind), await reader.readexactly(length)
+
+
+def get_shard_fds() -> tuple[int, int]:
+    read_fd, write_fd = map(int, os.environ["UB_SHARD_FDS"].split(","))
+    return read_fd, write_fd
+
+
+def read_session() -> str:
+    """
+    Blocking read of the session string the front sends as the first frame.
+    Called while the shard's client is created, before there's a loop to read the pipe with.
+    Not passed in the environment, where other processes of the user and every subprocess could read it.
+    """
+    read_fd, _ = get_shard_fds()
+
+    def read_exactly(size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = os.read(read_fd, size - len(data))
+            if not chunk:
+                raise ConnectionError("The front closed the pipe before sending the session.")
+            data += chunk
+        return data
+
+    kind, length = FRAME_HEADER.unpack(read_exactly(FRAME_HEADER.size))
+
+    if kind != Frame.SESSION:
+        raise ConnectionError(f"Expected the session from the front, got a {Frame(kind).name} frame.")
+
+    return read_exactly(length).decode()
+
+
+async def open_pipe_streams(read_fd: int, write_fd: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    loop = asyncio.get_running_loop()
+
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(read_fd, "rb", buffering=0))
+
+    transport, protocol = await loop.connect_write_pipe(
+        asyncio.streams.FlowControlMixin, os.fdopen(write_fd, "wb", buffering=0)
+    )
+    writer = asyncio.StreamWriter(transport, protocol, None, loop)
+    return reader, writer
+
+
+def encode_update(update: TLObject, users: dict, chats: dict) -> bytes:
+    """Raw TL bytes of the update followed by the users and chats it refers to."""
+    parts = [update.write(), Int(len(users))]
+    parts.extend(user.write() for user in users.values())
+    parts.append(Int(len(chats)))
+    parts.extend(chat.write() for chat in chats.values())
+    return b"".join(parts)
+
+
+def decode_update(data: bytes) -> tuple[TLObject, dict, dict]:
+    buffer = BytesIO(data)
+    update = TLObject.read(buffer)
+    users = {user.id: user for user in (TLObject.read(buffer) for _ in range(Int.read(buffer)))}
+    chats = {chat.id: chat for chat in (TLObject.read(buffer) for _ in range(Int.read(buffer)))}
+    return update, users, chats
+
+
+def get_chat_id(update: TLObject) -> int:
+    """Chat an update belongs to, updates without one all go to the same shard."""
+    peer = getattr(getattr(update, "message", None), "peer_id", None) or getattr(update, "peer", None)
+
+    if isinstance(peer, (raw.types.PeerUser, raw.types.PeerChat, raw.types.PeerChannel)):
+        return utils.get_raw_peer_id(peer)
+
+    for attr in ("chat_id", "channel_id", "user_id"):
+        value = getattr(update, attr, None)
+        if isinstance(value, int):
+            return value
+
+    return 0
+
+
+def get_state() -> dict:
+    return {
+        "SUDO": Config.SUDO,
+        **{name: sorted(getattr(Config, name)) for name in SYNCED_SETS},
+        "SUDO_CMDS": sorted(cmd for cmd, cmd_object in Config.CMD_DICT.items() if cmd_object.loaded_for_sudo),
+    }
+
+
+def apply_state(state: dict) -> None:
+    Config.SUDO = state["SUDO"]
+
+    # Update in place, plugins may hold references to these sets.
+    for name in SYNCED_SETS:
+        synced_set = getattr(Config, name)
+        synced_set.clear()
+        synced_set.update(state[name])
+
+    sudo_cmds = set(state["SUDO_CMDS"])
+    for cmd, cmd_object in Config.CMD_DICT.items():
+        cmd_object.loaded_for_sudo = cmd in sudo_cmds
+
+
+class ShardRouter(CountingQueue):
+    """The front's dispatcher queue, updates are sent to the shard that owns the chat instead of being queued."""
+
+    def __init__(self, front: "ShardFront"):
+        super().__init__()
+        self.front: ShardFront = front
+
+    def put_nowait(self, item) -> None:
+        # None is the dispatcher telling its own handler workers to stop.
+        if item is None:
+            super().put_nowait(item)
+            return
+
+        UPDATES_RECEIVED.value += 1
+        self.front.route(*item)
+
+
+class ShardProcess:
+    """A worker process as seen from the front: its pipes, frames waiting for it and restarts."""
+
+    MAX_PENDING: int = 10000
+    MAX_BUFFER: int = 16 * 1024 * 1024
+    STABLE_AFTER: int = 60
+
+    def __init__(self, shard_id: int, front: "ShardFront"):
+        self.shard_id: int = shard_id
+        self.front: ShardFront = front
+        self.process: asyncio.subprocess.Process | None = None
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.pending: deque[bytes] = deque(maxlen=self.MAX_PENDING)
+        self.restarts: int = 0
+        self.routed = SHARD_UPDATES.labels(str(shard_id))
+        self.dropped = SHARD_DROPPED.labels(str(shard_id))
+        self.dropping: bool = False
+
+    def drop(self, reason: str) -> None:
+        self.dropped.inc()
+
+        # Once per run of drops, not per update.
+        if not self.dropping:
+            self.dropping = True
+            LOGGER.warning(f"Shard {self.shard_id}: {reason}, dropping updates until it catches up.")
+
+    def send(self, frame: bytes) -> None:
+        writer = self.writer
+
+        if writer is None or writer.is_closing():
+            if len(self.pending) == self.pending.maxlen:
+                self.drop(f"not running and {self.MAX_PENDING} updates are already waiting for it")
+            else:
+                self.dropping = False
+            self.pending.append(frame)
+            return
+
+        if writer.transport.get_write_buffer_size() > self.MAX_BUFFER:
+            self.drop(f"over {self.MAX_BUFFER // 1024 // 1024}MiB of updates not read yet")
+            return
+
+        self.dropping = False
+        writer.write(frame)
+
+    async def spawn(self) -> None:
+        to_shard_read, to_shard_write = os.pipe()
+        from_shard_read, from_shard_write = os.pipe()
+
+        env = {
+            **os.environ,
+            "UB_SHARD_ID": str(self.shard_id),
+            "UB_SHARD_FDS": f"{to_shard_read},{from_shard_write}",
+        }
+
+        # Same interpreter options and module as this process, so bin/run-ub-core or `python -m app` both work.
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, *sys.orig_argv[1:], env=env, pass_fds=(to_shard_read, from_shard_write)
+        )
+        os.close(to_shard_read)
+        os.close(from_shard_write)
+
+        self.reader, self.writer = await open_pipe_streams(from_shard_read, to_shard_write)
+
+        # The shard blocks on the session while creating its client, it must be the first frame.
+        self.writer.write(pack_frame(Frame.SESSION, self.front.session_string.encode()))
+        # Always sent, null if no shard has synced yet, the shard doesn't sync its own state before this.
+        self.writer.write(pack_frame(Frame.STATE, json.dumps(self.front.state).encode()))
+
+        while self.pending:
+            self.writer.write(self.pending.popleft())
+
+    async def read_frames(self) -> None:
+        try:
+            while True:
+                kind, payload = await read_frame(self.reader)
+                if kind == Frame.STATE:
+                    self.front.on_state(self, json.loads(payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def supervise(self) -> None:
+        while True:
+            started = time.monotonic()
+            await self.spawn()
+            reader_task = asyncio.create_task(self.read_frames(), name=f"shard-{self.shard_id}-reader")
+
+            code = await self.process.wait()
+            reader_task.cancel()
+            self.writer.close()
+            self.writer = None
+
+            if self.front.stopping:
+                return
+
+            # Same exit codes as a single process: 69 restarts everything and 0 stops everything.
+            if code in (0, 69):
+                LOGGER.info(f"Shard {self.shard_id} exited with {code}, stopping all shards.")
+                self.front.client.exit_code = code
+                signal.raise_signal(signal.SIGINT)
+                return
+
+            if time.monotonic() - started > self.STABLE_AFTER:
+                self.restarts = 0
+
+            delay = min(2**self.restarts, 60)
+            self.restarts += 1
+            SHARD_RESTARTS.labels(str(self.shard_id)).inc()
+            LOGGER.error(f"Shard {self.shard_id} exited with {code}, restarting in {delay}s.")
+            await asyncio.sleep(delay)
+
+    async def stop(self, timeout: float) -> None:
+        if self.process is None or self.process.returncode is not None:
+            return
+
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(pack_frame(Frame.STOP))
+
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except TimeoutError:
+            LOGGER.warning(f"Shard {self.shard_id} didn't stop in {timeout}s, killing it.")
+            self.process.kill()
+            await self.process.wait()
+
+
+class ShardFront:
+    """
+    Receives updates and hands them to Config.SHARDS worker processes that run the plugins.
+
+    Updates are routed by chat id, so one chat always lands on the same shard and in order.
+    Workers log in with the front's session without receiving updates of their own.
+    Sudo state changed on one shard is broadcast to the rest, see ShardWorker.sync_state.
+    """
+
+    SHUTDOWN_TIMEOUT: float = 30
+
+    def __init__(self, client: "BOT"):
+        self.client: BOT = client
+        self.shards: list[ShardProcess] = [ShardProcess(shard_id, self) for shard_id in range(Config.SHARDS)]
+        self.session_string: str = ""
+        self.state: dict | None = None
+        self.stopping: bool = False
+
+    def route(self, update: TLObject, users: dict, chats: dict) -> None:
+        shard = self.shards[get_chat_id(update) % len(self.shards)]
+        shard.routed.value += 1
+        shard.send(pack_frame(Frame.UPDATE, encode_update(update, users, chats)))
+
+    def on_state(self, source: ShardProcess, state: dict) -> None:
+        self.state = state
+        frame = pack_frame(Frame.STATE, json.dumps(state).encode())
+
+        for shard in self.shards:
+            if shard is not source:
+                shard.send(frame)
+
+    async def run(self) -> None:
+        client = self.client
+        client.dispatcher.updates_queue = ShardRouter(self)
+
+        await client.start()
+        self.session_string = await client.export_session_string()
+
+        supervisors = [
+            asyncio.create_task(shard.supervise(), name=f"shard-{shard.shard_id}") for shard in self.shards
+        ]
+        LOGGER.info(f"Connected to TG. Routing updates to {len(self.shards)} shards.")
+
+        client.is_idling = True
+        await idle()
+
+        self.stopping = True
+        LOGGER.info("Stopping shards...")
+        await asyncio.gather(*(shard.stop(self.SHUTDOWN_TIMEOUT) for shard in self.shards))
+
+        for supervisor in supervisors:
+            supervisor.cancel()
+
+        await Config.TASK_MANAGER.close_and_run_exit_tasks()
+        await client.stop()
+
+
+class DispatcherLane:
+    """The client's dispatcher with a queue of its own, pyrogram's handler_worker runs on it unchanged."""
+
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+        self.updates_queue: CountingQueue = CountingQueue()
+
+    def __getattr__(self, name: str):
+        return getattr(self.dispatcher, name)
+
+
+class ShardWorker:
+    """
+    Runs inside a shard process: reads updates from the front into the client's dispatcher.
+
+    Each handler worker gets its own lane and every chat always lands on the same lane,
+    so updates of a chat are handled one after another in the order they came while other chats carry on.
+    """
+
+    STATE_INTERVAL: float = 1
+
+    def __init__(self, client: "BOT"):
+        self.client: BOT = client
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.last_state: dict | None = None
+        # Set by the front's first STATE frame, a restarted shard's state from the db may be older than the others'.
+        self.state_received: bool = False
+        self.lanes: list[DispatcherLane] = []
+
+    async def start(self) -> None:
+        self.reader, self.writer = await open_pipe_streams(*get_shard_fds())
+
+        # no_updates=True skips pyrogram's handler workers, updates come from the front instead.
+        dispatcher = self.client.dispatcher
+        for _ in range(self.client.workers):
+            lane = DispatcherLane(dispatcher)
+            self.lanes.append(lane)
+            dispatcher.locks_list.append(asyncio.Lock())
+            dispatcher.handler_worker_tasks.append(
+                asyncio.create_task(type(dispatcher).handler_worker(lane, dispatcher.locks_list[-1]))
+            )
+
+        Config.TASK_MANAGER.create_bg_task(self.read_frames(), name="shard-reader")
+        Config.TASK_MANAGER.create_worker(self.sync_state, interval=self.STATE_INTERVAL, name="shard-state-sync")
+
+    async def read_frames(self) -> None:
+        try:
+            while True:
+                kind, payload = await read_frame(self.reader)
+
+                if kind == Frame.UPDATE:
+                    update, users, chats = decode_update(payload)
+                    # The front cached these peers, this process needs them too to reply.
+                    await self.client.fetch_peers([*users.values(), *chats.values()])
+                    self.get_lane(update).updates_queue.put_nowait((update, users, chats))
+
+                elif kind == Frame.STATE:
+                    state = json.loads(payload)
+
+                    if state is not None:
+                        apply_state(state)
+
+                    self.last_state = get_state()
+                    self.state_received = True
+
+                elif kind == Frame.STOP:
+                    break
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            LOGGER.warning(f"Shard {Config.SHARD_ID}: lost the front process, stopping.")
+
+        signal.raise_signal(signal.SIGINT)
+
+    def get_lane(self, update: TLObject) -> DispatcherLane:
+        # The front already split chats by id % SHARDS, divide that out so all lanes get used.
+        return self.lanes[(get_chat_id(update) // max(Config.SHARDS, 1)) % len(self.lanes)]
+
+    async def sync_state(self) -> None:
+        """Send sudo state to the front when something on this shard changed it."""
+        if not self.state_received:
+            return
+
+        state = get_state()
+
+        if state != self.last_state and not self.writer.is_closing():
+            self.last_state = state
+            self.writer.write(pack_frame(Frame.STATE, json.dumps(state).encode()))
+
+    async def stop(self) -> None:
+        dispatcher = self.client.dispatcher
+
+        for lane in self.lanes:
+            lane.updates_queue.put_nowait(None)
+
+        await asyncio.gather(*dispatcher.handler_worker_tasks, return_exceptions=True)
+        dispatcher.handler_worker_tasks.clear()
+
+        if self.writer is not None:
+            self.writer.close()
@@ -2,9 +2,11 @@ import asyncio
 from io import BytesIO
 from typing import TYPE_CHECKING, Self
 
-from pyrogram import enums, errors, filters, types, utils
+from pyrogram import enums, errors, filters, types
 
 from .extra_properties import Properties
+from ..outbound import Priority
+from ..parser import MAX_MESSAGE_LENGTH, parse_text, split_parsed_text
 from ...config import Config
 
 if TYPE_CHECKING:
@@ -68,23 +70,31 @@ class Message(Properties, types.Message):
         disable_preview: bool = None,
         parse_mode: "ParseMode" = None,
         entities: list["MessageEntity"] = None,
+        priority: Priority = Priority.NORMAL,
+        split: bool = False,
         **kwargs,
     ) -> "Message":
-        """Edit self.text or send a file with text if text length exceeds 4096 chars"""
+        """
+        Edit self.text or send a file with text if text length exceeds 4096 chars.
+        With split, self is edited to the first 4096 chars and the rest is sent as replies.
+        """
 
         if isinstance(disable_preview, bool):
             kwargs["link_preview_options"] = types.LinkPreviewOptions(is_disabled=disable_preview)
 
-        parse_mode = parse_mode or self._client.parse_mode
-
-        text_and_entities = await utils.parse_text_entities(
-            client=self._client, text=text, parse_mode=parse_mode, entities=entities
+        parsed_text = await parse_text(
+            client=self._client, text=text, parse_mode=parse_mode or self._client.parse_mode, entities=entities
         )
 
-        # text, entities = text_and_entities.values()
+        chunks = []
+
+        if split and len(parsed_text) > MAX_MESSAGE_LENGTH:
+            parsed_text, *chunks = split_parsed_text(parsed_text)
 
-        if len(text_and_entities["message"]) <= 4096:
-            task = super().edit_text(text=text, parse_mode=parse_mode, entities=entities, **kwargs)
+        if len(parsed_text) <= MAX_MESSAGE_LENGTH:
+            task = self._client.outbound.run(
+                self.chat.id, super().edit_text, text=parsed_text, priority=priority, **kwargs
+            )
 
             if del_in:
                 edited_message = await async_deleter(coro=task, del_in=del_in, block=block)
@@ -102,12 +112,17 @@ class Message(Properties, types.Message):
                 caption = self.text
                 entities = self.entities
 
-            file = BytesIO(text.encode())
+            file = BytesIO(parsed_text.encode())
             file.name = name
             media = types.InputMediaDocument(
                 media=file, caption=caption, caption_entities=entities, disable_content_type_detection=disable_preview
             )
-            edited_message = await self.edit_media(media=media, file_name=name)
+            edited_message = await self._client.outbound.run(
+                self.chat.id, self.edit_media, media=media, file_name=name, priority=priority
+            )
+
+        for chunk in chunks:
+            await self.reply(chunk, disable_preview=disable_preview, priority=priority)
 
         return edited_message
 
@@ -158,6 +173,7 @@ class Message(Properties, types.Message):
         block: bool = True,
         disable_preview: bool = False,
         reply_parameters: types.ReplyParameters = None,
+        priority: Priority = Priority.HIGH,
         **kwargs,
     ) -> "Message":
         """reply text or send a file with text if text length exceeds 4096 chars"""
@@ -166,6 +182,7 @@ class Message(Properties, types.Message):
             text=text,
             disable_preview=disable_preview,
             reply_parameters=reply_parameters or types.ReplyParameters(message_id=self.id),
+            priority=priority,
             **kwargs,
         )
         if del_in:
@@ -0,0 +1,16 @@
+from ub_core import BOT, Message
+from ub_core.diagnostics import BOOT_PROFILER
+
+
+@BOT.add_cmd(cmd="boot")
+async def boot_report(bot: BOT, message: Message):
+    """
+    CMD: BOOT
+    INFO: Show how long each part of the last boot took.
+    FLAGS:
+        -all: list every plugin import and init task instead of the slowest 10.
+    USAGE:
+        .boot | .boot -all
+    """
+    limit = 1000 if "-all" in message.flags else 10
+    await message.reply(f"<pre language=java>{BOOT_PROFILER.report(limit=limit)}</pre>", name="boot_report.txt")
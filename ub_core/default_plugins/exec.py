@@ -11,7 +11,7 @@ import ub_core
 
 # noinspection PyUnresolvedReferences
 # ruff: noqa: F401
-from ub_core import BOT, Cmd, Config, CustomDB, Message, bot, core, default_plugins, ub_core_dir, utils
+from ub_core import BOT, Cmd, Config, Message, bot, core, default_plugins, ub_core_dir, utils
 
 # noinspection PyUnresolvedReferences
 # ruff: noqa: F401
@@ -37,6 +37,10 @@ def generate_locals(message: Message) -> tuple:
 
 
 async def _exec(bot: BOT, message: Message, code: str):
+    # CustomDB is loaded on first use, resolve it here so it's still available as a global.
+    if "CustomDB" not in globals():
+        globals()["CustomDB"] = ub_core.CustomDB
+
     function_definitions = {}
     exec(
         "async def __exec(bot: BOT, message: Message):"
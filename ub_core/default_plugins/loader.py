@@ -1,7 +1,6 @@
-import importlib
+import html
 import os
-import sys
-import traceback
+from pathlib import Path
 
 from ub_core import BOT, Config, Message
 
@@ -11,7 +10,7 @@ async def loader(bot: BOT, message: Message) -> Message | None:
     CMD: LOAD
     INFO: Load a Bot Plugin.
     FLAGS:
-        -r to reload a cmd.
+        -r to reload a cmd's plugin and the plugins that import from it.
         -rit call init task on reload
     USAGE:
         .load [reply to plugin]
@@ -35,21 +34,18 @@ async def loader(bot: BOT, message: Message) -> Message | None:
             return
 
         module = str(cmd_module.func.__module__)  # NOQA
+        files = {}
     else:
         file_name: str = os.path.splitext(message.replied.document.file_name)[0]
         module = f"app.temp.{file_name}"
         await message.replied.download("app/temp/")
+        files = {module: Path(f"app/temp/{file_name}.py").resolve()}
 
-    reload = sys.modules.pop(module, None)
-    status: str = "Reloaded" if reload else "Loaded"
-
-    try:
-        new_module = importlib.import_module(module)
-        if hasattr(new_module, "init_task") and "-rit" in message.flags:
-            await new_module.init_task()
-        await reply.edit(f"{status} {module}")
-    except:
-        await reply.edit(f"```\n{traceback.format_exc()}```")
+    # Swaps cmds, handlers, workers and bg tasks of the module and the plugins importing it.
+    result = await bot.reloader.reload_modules(
+        {module}, files=files, allow_lazy=False, run_init_tasks="-rit" in message.flags
+    )
+    await reply.edit(f"<pre language=java>{html.escape(str(result))}</pre>", name="reload.txt")
 
 
 if Config.DEV_MODE:
@@ -1,7 +1,45 @@
-import aiofiles
+import html
+import re
+from datetime import datetime, timedelta
+from logging import ERROR, WARNING
 
 from ub_core import BOT, Message
-from ub_core.utils import run_shell_cmd
+from ub_core.core.executors import run_in_thread
+from ub_core.core.logging.log_reader import APP_LOG_READER, LogFilter
+
+DURATION = re.compile(r"^(\d+)([smhd])$")
+
+UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def get_flag_value(message: Message, flag: str) -> str | None:
+    if flag not in message.flags:
+        return None
+    try:
+        value = message.get_flag_value(flag)
+    except IndexError:
+        return None
+    return None if value.startswith("-") else value
+
+
+def parse_ago(value: str | None) -> datetime | None:
+    """2h -> 2 hours ago"""
+    if not value:
+        return None
+    match = DURATION.match(value)
+    if not match:
+        raise ValueError(f"Invalid duration: {value}, use something like 30m, 2h or 1d.")
+    return datetime.now() - timedelta(**{UNITS[match[2]]: int(match[1])})
+
+
+def build_filter(message: Message) -> LogFilter:
+    min_level = ERROR if "-e" in message.flags else WARNING if "-w" in message.flags else 0
+    return LogFilter(
+        min_level=min_level,
+        logger=get_flag_value(message, "-l"),
+        since=parse_ago(get_flag_value(message, "-since")),
+        until=parse_ago(get_flag_value(message, "-until")),
+    )
 
 
 @BOT.add_cmd(cmd="logs")
@@ -10,21 +48,61 @@ async def read_logs(bot: BOT, message: Message):
     CMD: Logs
     INFO: Check bot logs
     FLAGS:
-        -tail: get last few lines from file
+        -tail: get last few log records from file
+        -grep: show the last matches of a regex
+        -w | -e: only warnings | errors and above
+        -l: only records from loggers that contain this name
+        -since | -until: time range, as 30m, 2h, 1d ago
     USAGE:
         .logs
         .logs -tail 10
+        .logs -tail 20 -e
+        .logs -grep FloodWait -since 1d
+        .logs -l pyrogram -since 2h -until 1h
     """
+    if not APP_LOG_READER.path.is_file():
+        await message.reply("No logs yet.")
+        return
 
-    if "-tail" in message.flags:
-        text = await run_shell_cmd(cmd=f"tail -n {int(message.filtered_input)} logs/app_logs.txt")
-        await message.reply(f"<pre language=java>{text}</pre>")
+    try:
+        log_filter = build_filter(message)
+    except ValueError as e:
+        await message.reply(str(e))
         return
 
-    async with aiofiles.open("logs/app_logs.txt") as aio_file:
-        text = await aio_file.read()
+    if "-grep" in message.flags:
+        pattern = get_flag_value(message, "-grep")
+
+        if not pattern:
+            await message.reply("Give a pattern to search for.")
+            return
+
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            await message.reply(f"Invalid pattern: {e}")
+            return
+
+        records, total = await run_in_thread(APP_LOG_READER.search, regex, log_filter, pool="io")
+        header = f"{total} matches, showing the last {len(records)}:\n\n"
+
+    elif "-tail" in message.flags or log_filter.min_level or log_filter.logger or log_filter.has_time_range:
+        count = get_flag_value(message, "-tail")
+        count = int(count) if count and count.isdigit() else 20
+        records = await run_in_thread(APP_LOG_READER.tail, count, log_filter, pool="io")
+        header = ""
+
+    elif APP_LOG_READER.size < 4096:
+        records = await run_in_thread(APP_LOG_READER.tail, 1000, pool="io")
+        header = ""
 
-    if len(text) < 4096:
-        await message.reply(f"<pre language=java>{text}</pre>")
     else:
-        await message.reply_document(document="logs/app_logs.txt")
+        await message.reply_document(document=str(APP_LOG_READER.path))
+        return
+
+    if not records:
+        await message.reply("No matching logs.")
+        return
+
+    text = html.escape(header + "\n".join(record.text for record in records))
+    await message.reply(f"<pre language=java>{text}</pre>", name="logs.txt")
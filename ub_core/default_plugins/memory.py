@@ -0,0 +1,75 @@
+import gc
+import json
+
+from aiohttp import web
+
+from ub_core import BOT, Config, Message
+from ub_core.diagnostics import MEMORY_PROFILER
+from ub_core.diagnostics.memory import format_size
+from ub_core.utils import aio
+
+
+@BOT.add_cmd(cmd="mem", allow_sudo=False)
+async def memory_stats(bot: BOT, message: Message):
+    """
+    CMD: MEM
+    INFO: Memory usage, GC stats and on demand allocation tracing.
+    FLAGS:
+        -start: start tracing [optionally pass number of frames to keep] and set a baseline.
+        -stop: stop tracing.
+        -mark: set a new baseline.
+        -diff: memory growth since the baseline grouped by plugin file.
+        -top: biggest allocation sites.
+        -gc: run a full collection.
+    USAGE:
+        .mem | .mem -start 25 | .mem -diff | .mem -top
+    """
+    flags = message.flags
+    frames = message.filtered_input
+
+    if "-start" in flags and frames and not frames.isdigit():
+        await message.reply("Give the number of frames to keep, like: .mem -start 25")
+        return
+
+    try:
+        if "-start" in flags:
+            frames = int(frames or MEMORY_PROFILER.DEFAULT_FRAMES)
+            await bot.make_async(MEMORY_PROFILER.start)(frames)
+            text = f"Tracing started with {frames} frames."
+
+        elif "-stop" in flags:
+            MEMORY_PROFILER.stop()
+            text = "Tracing stopped."
+
+        elif "-mark" in flags:
+            await bot.make_async(MEMORY_PROFILER.mark)()
+            text = "Baseline set."
+
+        elif "-diff" in flags:
+            diff = await bot.make_async(MEMORY_PROFILER.diff)(limit=15)
+            text = "\n".join(f"{format_size(size):>12} {count:>+8} {owner}" for owner, size, count in diff)
+
+        elif "-top" in flags:
+            top = await bot.make_async(MEMORY_PROFILER.top)(limit=15)
+            text = "\n".join(f"{format_size(size):>12} {count:>8} {site}" for site, size, count in top)
+
+        elif "-gc" in flags:
+            text = f"Collected {gc.collect()} objects.\n\n{MEMORY_PROFILER.report()}"
+
+        else:
+            text = MEMORY_PROFILER.report()
+
+    except RuntimeError as e:
+        text = f"{e} Start it with -start."
+
+    await message.reply(f"<pre language=java>{text or 'Nothing to show.'}</pre>", name="memory.txt")
+
+
+async def memory_stats_handler(request: web.Request) -> web.Response:
+    # No object count, the route isn't authenticated and that walks the whole heap on the loop.
+    stats = MEMORY_PROFILER.get_stats(count_objects=False)
+    return web.json_response(stats, dumps=lambda data: json.dumps(data, default=str))
+
+
+if Config.MEMORY_ENDPOINT and aio.server.port and not aio.server.is_running():
+    aio.server.add_route(method="GET", path="/memory", handler=memory_stats_handler, name="MEMORY_STATS")
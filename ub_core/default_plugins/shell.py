@@ -1,11 +1,30 @@
 import asyncio
 
 from pyrogram.enums import ParseMode
+from pyrogram.types import InputMediaDocument
 
 from ub_core import BOT, Config, Message
 from ub_core.utils import shell
 
 
+async def send_final_output(bot: BOT, message: Message, cmd: str, output: shell.OutputCapture, name: str):
+    """Edit the full output in or upload it straight from the spill file if it's too long."""
+    if output.size + len(cmd) < 4000:
+        await message.edit(
+            text=f"<pre language=shell>~$ {cmd}\n\n{output.text}</pre>",
+            name=name,
+            disable_preview=True,
+            parse_mode=ParseMode.HTML,
+        )
+        return
+
+    output.flush()
+    media = InputMediaDocument(
+        media=output.path, caption=f"<pre language=shell>~$ {cmd[:900]}</pre>", parse_mode=ParseMode.HTML
+    )
+    await bot.outbound.run(message.chat.id, message.edit_media, media=media, file_name=name)
+
+
 async def run_cmd(bot: BOT, message: Message) -> None:
     cmd: str = message.input.strip()
     reply: Message = await message.reply("executing...")
@@ -32,18 +51,15 @@ async def live_shell(bot: BOT, message: Message):
     sub_process: shell.AsyncShell = await shell.AsyncShell.run_cmd(cmd)
     try:
         await asyncio.create_task(sub_process.send_output(message=reply), name=reply.task_id)
-        await reply.edit(
-            text=f"<pre language=shell>~$ {cmd}\n\n{sub_process.stdout}</pre>",
-            name="shell.txt",
-            disable_preview=True,
-            parse_mode=ParseMode.HTML,
-        )
+        await send_final_output(bot=bot, message=reply, cmd=cmd, output=sub_process.output, name="shell.txt")
     except asyncio.exceptions.CancelledError:
         sub_process.cancel()
         await reply.edit("`Cancelled....`")
     except BaseException:
         sub_process.cancel()
         raise
+    finally:
+        sub_process.output.close()
 
 
 # Interactive Shell with Live Output
@@ -91,11 +107,8 @@ async def interactive_shell(bot: BOT, message: Message):
 
                 await asyncio.create_task(sub_process.send_output(stdout_message), name=stdout_message.task_id)
 
-                await stdout_message.edit(
-                    text=f"<pre language=shell>~$ {input_text}\n\n{sub_process.stdout}</pre>",
-                    name="shell.txt",
-                    disable_preview=True,
-                    parse_mode=ParseMode.HTML,
+                await send_final_output(
+                    bot=bot, message=stdout_message, cmd=input_text, output=sub_process.output, name="shell.txt"
                 )
                 sub_process.flush_stdout()
 
@@ -108,6 +121,8 @@ async def interactive_shell(bot: BOT, message: Message):
     except BaseException:
         sub_process.cancel()
         raise
+    finally:
+        sub_process.output.close()
 
 
 if Config.DEV_MODE:
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from ub_core import BOT, Config, Message, bot
+from ub_core.config import get_shard_path
+from ub_core.core.executors import run_in_thread
+from ub_core.diagnostics import COMMAND_STATS
+
+STATS_FILE = Path(get_shard_path("logs/command_stats.json")).resolve()
+
+SORT_FLAGS = {"-calls": "calls", "-avg": "avg_time", "-max": "max_time", "-errors": "errors"}
+
+
+@bot.register_init(name="command-stats.load", critical=False)
+async def load_command_stats():
+    if Config.PERSIST_COMMAND_STATS:
+        await run_in_thread(COMMAND_STATS.load, STATS_FILE, pool="io")
+
+
+@bot.register_worker(interval=600, name="command-stats.save", run_at_start=False)
+async def save_command_stats():
+    if Config.PERSIST_COMMAND_STATS and COMMAND_STATS.stats:
+        await run_in_thread(COMMAND_STATS.save, STATS_FILE, pool="io")
+
+
+@bot.register_exit
+def save_command_stats_on_exit():
+    if Config.PERSIST_COMMAND_STATS and COMMAND_STATS.stats:
+        COMMAND_STATS.save(STATS_FILE)
+
+
+@BOT.add_cmd(cmd="stats")
+async def command_stats(bot: BOT, message: Message):
+    """
+    CMD: STATS
+    INFO: Show calls, errors, running count and latency percentiles of commands.
+    FLAGS:
+        -calls | -avg | -max | -errors: sort by that instead of total time.
+        -all: list every command instead of the top 15.
+        -reset: clear the stats.
+    USAGE:
+        .stats | .stats -calls | .stats ping
+    """
+    if "-reset" in message.flags:
+        COMMAND_STATS.reset()
+        await message.reply("Command stats cleared.")
+        return
+
+    if message.filtered_input:
+        cmd = message.filtered_input.split()[0]
+        if cmd not in COMMAND_STATS.stats:
+            await message.reply(f"No stats for <code>{cmd}</code>.")
+            return
+        stats = {cmd: COMMAND_STATS.stats[cmd]}
+    else:
+        stats = COMMAND_STATS.stats
+
+    sort_by = next((SORT_FLAGS[flag] for flag in message.flags if flag in SORT_FLAGS), "total_time")
+    limit = 1000 if "-all" in message.flags else 15
+
+    text = COMMAND_STATS.report(sort_by=sort_by, limit=limit, stats=stats)
+    await message.reply(f"<pre language=java>{text}</pre>", name="command_stats.txt")
@@ -1,20 +1,17 @@
 import asyncio
 
 from ub_core import BOT, Config, Message, __version__
-from ub_core.utils import aio, run_shell_cmd
+from ub_core.utils import aio, run_in_thread, run_shell_cmd
 
-REPO = Config.REPO
 
-
-async def get_commits() -> str | None:
-    try:
-        await asyncio.wait_for(asyncio.to_thread(REPO.git.fetch), timeout=10)
-    except TimeoutError:
-        return
+def fetch_commits() -> str:
+    """Blocking, opens the repo on first use and walks commits: run it in the git pool."""
+    repo = Config.REPO
+    repo.git.fetch()
 
     commits: str = ""
 
-    for idx, commit in enumerate(REPO.iter_commits("HEAD..origin/main")):
+    for idx, commit in enumerate(repo.iter_commits("HEAD..origin/main")):
         commits += (
             f"<a href='https://github.com/{commit.author}'>{commit.author}</a>"
             " pushed "
@@ -28,10 +25,22 @@ async def get_commits() -> str | None:
     return commits
 
 
+def reset_and_pull() -> None:
+    repo = Config.REPO
+    repo.git.reset("--hard")
+    repo.git.pull(Config.UPSTREAM_REPO, "--rebase=true")
+
+
+async def get_commits() -> str | None:
+    try:
+        return await asyncio.wait_for(run_in_thread(fetch_commits, pool="git"), timeout=10)
+    except TimeoutError:
+        return
+
+
 async def pull_commits() -> bool:
-    REPO.git.reset("--hard")
     try:
-        await asyncio.wait_for(asyncio.to_thread(REPO.git.pull, Config.UPSTREAM_REPO, "--rebase=true"), timeout=10)
+        await asyncio.wait_for(run_in_thread(reset_and_pull, pool="git"), timeout=10)
         return True
     except TimeoutError:
         return False
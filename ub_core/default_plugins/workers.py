@@ -0,0 +1,39 @@
+import time
+
+from ub_core import BOT, Config, Message
+
+
+def format_time(timestamp: float | None) -> str:
+    return time.strftime("%d-%m %H:%M:%S", time.localtime(timestamp)) if timestamp else "-"
+
+
+@BOT.add_cmd(cmd="workers")
+async def worker_stats(bot: BOT, message: Message):
+    """
+    CMD: WORKERS
+    INFO: Show the schedule, last run, duration and errors of each worker.
+    USAGE: .workers
+    """
+    stats = Config.TASK_MANAGER.scheduler.stats
+
+    if not stats:
+        await message.reply("No workers running.")
+        return
+
+    lines = []
+
+    for name, worker in sorted(stats.items()):
+        avg = f"{worker['avg_duration']:.3f}s" if worker["avg_duration"] is not None else "-"
+        lines.append(
+            f"{name} [{worker['schedule']}, {worker['mode']}]\n"
+            f"  runs: {worker['runs']} errors: {worker['errors']} "
+            f"skipped: {worker['skipped']} missed: {worker['missed']}\n"
+            f"  last: {format_time(worker['last_run'])} next: {format_time(worker['next_run'])}\n"
+            f"  duration: avg {avg} max {worker['max_duration']:.3f}s"
+        )
+
+        if worker["last_error"]:
+            lines.append(f"  last error: {worker['last_error']}")
+
+    text = "\n".join(lines)
+    await message.reply(f"<pre language=java>{text}</pre>", name="workers.txt")
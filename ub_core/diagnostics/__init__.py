@@ -0,0 +1,7 @@
+# Imported before anything else in ub_core, keep this package stdlib only.
+
+from .boot_profiler import BOOT_PROFILER
+from .command_stats import COMMAND_STATS
+from .loop_watchdog import LOOP_WATCHDOG
+from .memory import MEMORY_PROFILER
+from .metrics import METRICS
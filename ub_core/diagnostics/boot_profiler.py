@@ -0,0 +1,112 @@
+import sys
+import threading
+import time
+from collections.abc import Awaitable
+from contextlib import contextmanager
+
+
+def get_awaitable_name(awaitable: Awaitable) -> str:
+    """module.qualname of a coroutine, all module level init tasks share the name init_task."""
+    frame = getattr(awaitable, "cr_frame", None)
+    module = frame.f_globals.get("__name__", "") if frame else ""
+    return ".".join(filter(None, (module, getattr(awaitable, "__qualname__", str(awaitable)))))
+
+
+class PluginImport:
+    def __init__(self, module: str, duration: float, new_modules: list[str], lazy: bool):
+        self.module: str = module
+        self.duration: float = duration
+        # Modules that were first imported by this plugin, like -X importtime's cumulative column.
+        self.new_modules: list[str] = new_modules
+        self.lazy: bool = lazy
+
+
+class BootProfiler:
+    """
+    Records how long each stage of a boot takes:
+        phases: diagnostics, env, config, db, client, connect, plugins, init tasks...
+        plugin imports: time and the modules each plugin pulled in
+        init tasks: time and outcome of each task
+        first update: time from start till the first update was handled
+    """
+
+    def __init__(self):
+        self.started_at: float = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.plugin_imports: list[PluginImport] = []
+        # name: (duration, status, critical)
+        self.init_tasks: dict[str, tuple[float, str, bool]] = {}
+        self.first_update: float | None = None
+        self.lock = threading.RLock()
+
+    @property
+    def uptime(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def record_phase(self, name: str, start: float) -> None:
+        """Record a phase that started at perf_counter() value start, moving the boot start back if it's earlier."""
+        self.started_at = min(self.started_at, start)
+        self.phases[name] = time.perf_counter() - start
+
+    @contextmanager
+    def plugin_import(self, module: str, lazy: bool = False):
+        # Imports run in threads, one at a time so that new modules are attributed correctly.
+        with self.lock:
+            before = set(sys.modules)
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                duration = time.perf_counter() - start
+                new_modules = [name for name in sys.modules.keys() - before if name != module]
+                self.plugin_imports.append(
+                    PluginImport(module=module, duration=duration, new_modules=sorted(new_modules), lazy=lazy)
+                )
+
+    def record_init_task(self, name: str, duration: float, status: str, critical: bool = True) -> None:
+        self.init_tasks[name] = (duration, status, critical)
+
+    def mark_first_update(self) -> None:
+        if self.first_update is None:
+            self.first_update = self.uptime
+
+    def report(self, limit: int = 10) -> str:
+        lines = [f"Boot Report [{self.uptime:.2f}s since start]", "", "Phases:"]
+        lines.extend(f"  {name}: {duration:.3f}s" for name, duration in self.phases.items())
+
+        eager = [plugin for plugin in self.plugin_imports if not plugin.lazy]
+        lazy = [plugin for plugin in self.plugin_imports if plugin.lazy]
+
+        for title, plugins in (("Plugin Imports", eager), ("Lazy Plugin Imports", lazy)):
+            if not plugins:
+                continue
+
+            total = sum(plugin.duration for plugin in plugins)
+            lines.extend(["", f"{title} [{len(plugins)} in {total:.3f}s, slowest {limit}]:"])
+
+            for plugin in sorted(plugins, key=lambda plugin: plugin.duration, reverse=True)[:limit]:
+                lines.append(f"  {plugin.module}: {plugin.duration:.3f}s [+{len(plugin.new_modules)} modules]")
+
+        if self.init_tasks:
+            lines.extend(["", f"Init Tasks [{len(self.init_tasks)}]:"])
+            for name, (duration, status, critical) in sorted(
+                self.init_tasks.items(), key=lambda item: item[1][0], reverse=True
+            )[:limit]:
+                background = "" if critical else ", background"
+                lines.append(f"  {name}: {duration:.3f}s [{status}{background}]")
+
+        first_update = f"{self.first_update:.2f}s" if self.first_update is not None else "not yet"
+        lines.extend(["", f"First update handled: {first_update}"])
+
+        return "\n".join(lines)
+
+
+BOOT_PROFILER = BootProfiler()
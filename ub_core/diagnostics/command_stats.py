@@ -0,0 +1,180 @@
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any
+
+from .metrics import METRICS
+
+COMMANDS_IN_FLIGHT = METRICS.gauge("ub_commands_in_flight", "Commands currently running.", labels=("cmd",))
+
+COMMAND_QUANTILES = METRICS.gauge(
+    "ub_command_duration_quantile_seconds",
+    "Command duration percentiles since boot, estimated from CmdStats buckets.",
+    labels=("cmd", "quantile"),
+)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class CmdStats:
+    """
+    Fixed size latency and outcome stats of one command.
+
+    Durations go into log spaced buckets, each one GROWTH times wider than the last,
+    so percentiles are within ~10% no matter how many runs are recorded.
+    """
+
+    BASE: float = 0.001
+    GROWTH: float = 2**0.25
+    BUCKETS: int = 96
+
+    def __init__(self):
+        self.calls: int = 0
+        self.errors: int = 0
+        self.cancelled: int = 0
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+        self.total_time: float = 0
+        self.max_time: float = 0
+        self.last_run: float | None = None
+        self.counts: list[int] = [0] * self.BUCKETS
+
+    @classmethod
+    def bucket_index(cls, duration: float) -> int:
+        if duration <= cls.BASE:
+            return 0
+        return min(math.ceil(math.log(duration / cls.BASE, cls.GROWTH)), cls.BUCKETS - 1)
+
+    @classmethod
+    def bucket_bound(cls, index: int) -> float:
+        return cls.BASE * cls.GROWTH**index
+
+    def start(self) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.last_run = time.time()
+
+    def finish(self, duration: float, status: str) -> None:
+        self.in_flight -= 1
+        self.calls += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.counts[self.bucket_index(duration)] += 1
+
+        if status == "error":
+            self.errors += 1
+        elif status == "cancelled":
+            self.cancelled += 1
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0
+
+    def percentile(self, quantile: float) -> float:
+        """Upper bound of the bucket the quantile falls in, capped at the slowest run seen."""
+        if not self.calls:
+            return 0
+
+        rank = quantile * self.calls
+        cumulative = 0
+
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(self.bucket_bound(index), self.max_time)
+
+        return self.max_time
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {key: value for key, value in vars(self).items() if key not in ("in_flight", "counts")}
+        # Most buckets stay empty, store the used ones only.
+        data["counts"] = {index: count for index, count in enumerate(self.counts) if count}
+        return data
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Merge saved stats into these, commands may have run before the file was loaded."""
+        for key in ("calls", "errors", "cancelled", "total_time"):
+            setattr(self, key, getattr(self, key) + data.get(key, 0))
+
+        for key in ("max_in_flight", "max_time", "last_run"):
+            values = [value for value in (getattr(self, key), data.get(key)) if value is not None]
+            setattr(self, key, max(values) if values else None)
+
+        for index, count in data.get("counts", {}).items():
+            self.counts[min(int(index), self.BUCKETS - 1)] += count
+
+
+class CommandStats:
+    """Per command CmdStats, keyed by command name so stats survive plugin reloads."""
+
+    def __init__(self):
+        self.stats: dict[str, CmdStats] = {}
+        self.since: float = time.time()
+        METRICS.add_collector(self.collect_metrics)
+
+    def get(self, cmd: str) -> CmdStats:
+        stats = self.stats.get(cmd)
+        if stats is None:
+            stats = self.stats[cmd] = CmdStats()
+        return stats
+
+    def reset(self) -> None:
+        # Keep in-flight commands around, their finish() still has to land somewhere.
+        for cmd, stats in list(self.stats.items()):
+            if stats.in_flight:
+                fresh = self.stats[cmd] = CmdStats()
+                fresh.in_flight = stats.in_flight
+            else:
+                del self.stats[cmd]
+        self.since = time.time()
+
+    def collect_metrics(self) -> None:
+        for cmd, stats in self.stats.items():
+            COMMANDS_IN_FLIGHT.labels(cmd).set(stats.in_flight)
+            for quantile in QUANTILES:
+                COMMAND_QUANTILES.labels(cmd, str(quantile)).set(stats.percentile(quantile))
+
+    def save(self, path: Path) -> None:
+        data = {"since": self.since, "commands": {cmd: stats.to_dict() for cmd, stats in self.stats.items()}}
+        temp = path.with_suffix(".tmp")
+        temp.write_text(json.dumps(data))
+        temp.replace(path)
+
+    def load(self, path: Path) -> None:
+        if not path.is_file():
+            return
+
+        data = json.loads(path.read_text())
+        self.since = min(self.since, data.get("since", self.since))
+
+        for cmd, stats in data.get("commands", {}).items():
+            self.get(cmd).load(stats)
+
+    def report(self, sort_by: str = "total_time", limit: int = 15, stats: dict[str, CmdStats] | None = None) -> str:
+        stats = self.stats if stats is None else stats
+
+        if not stats:
+            return "No commands run yet."
+
+        rows = sorted(stats.items(), key=lambda item: getattr(item[1], sort_by), reverse=True)
+        since = time.strftime("%d-%m %H:%M", time.localtime(self.since))
+        lines = [f"Command stats since {since}, by {sort_by}:"]
+
+        for cmd, cmd_stats in rows[:limit]:
+            p50, p95, p99 = (cmd_stats.percentile(quantile) for quantile in QUANTILES)
+            lines.append(
+                f"\n{cmd}"
+                f"\n  calls: {cmd_stats.calls} errors: {cmd_stats.errors} cancelled: {cmd_stats.cancelled}"
+                f" running: {cmd_stats.in_flight} (max {cmd_stats.max_in_flight})"
+                f"\n  total: {cmd_stats.total_time:.2f}s avg: {cmd_stats.avg_time:.3f}s"
+                f"\n  p50: {p50:.3f}s p95: {p95:.3f}s p99: {p99:.3f}s max: {cmd_stats.max_time:.3f}s"
+            )
+
+        if len(rows) > limit:
+            lines.append(f"\n...and {len(rows) - limit} more")
+
+        return "\n".join(lines)
+
+
+COMMAND_STATS = CommandStats()
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+
+from .memory import MemoryProfiler
+from .metrics import METRICS
+
+LOOP_LAG = METRICS.histogram(
+    "ub_event_loop_lag_seconds",
+    "How late the loop ran a timer scheduled every LoopWatchdog.INTERVAL seconds.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+LOOP_STALLS = METRICS.counter(
+    "ub_event_loop_stalls_total",
+    "Times the loop was blocked for longer than LOOP_STALL_THRESHOLD, per coroutine that was running.",
+    labels=("coro",),
+)
+
+LOOP_STALL_DURATION = METRICS.histogram(
+    "ub_event_loop_stall_seconds",
+    "How long the loop stayed blocked once a stall was detected.",
+    buckets=(0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+LOOP_LAST_STALL = METRICS.gauge("ub_event_loop_last_stall_timestamp_seconds", "Unix time of the last stall.")
+
+
+def get_current_task(loop: asyncio.AbstractEventLoop) -> asyncio.Task | None:
+    """The task the loop is currently stepping, readable from other threads unlike asyncio.current_task."""
+    return getattr(asyncio.tasks, "_current_tasks", {}).get(loop)
+
+
+def get_coro_name(task: asyncio.Task | None) -> str:
+    if task is None:
+        return "<loop callback>"
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class Stall:
+    """What the loop thread was doing when the watchdog caught it blocked."""
+
+    def __init__(self, task: asyncio.Task | None, stack: traceback.StackSummary, lag: float):
+        self.task_name: str = task.get_name() if task else "-"
+        self.coro_name: str = get_coro_name(task)
+        self.stack: traceback.StackSummary = stack
+        self.caught_at: float = time.time()
+        self.lag: float = lag
+        self.duration: float = lag
+
+    @property
+    def blocking_frame(self) -> traceback.FrameSummary | None:
+        """Innermost frame, usually the sync call that's holding the loop."""
+        return self.stack[-1] if self.stack else None
+
+    @property
+    def plugin_frame(self) -> traceback.FrameSummary | None:
+        """Innermost frame from a plugin or ub_core, points at the line that made the blocking call."""
+        roots = MemoryProfiler.get_plugin_roots()
+
+        for frame in reversed(self.stack):
+            path = Path(frame.filename)
+            if any(path.is_relative_to(root) for root in roots):
+                return frame
+
+        return None
+
+    @staticmethod
+    def format_frame(frame: traceback.FrameSummary | None) -> str:
+        if frame is None:
+            return "-"
+        return f"{frame.filename}:{frame.lineno} in {frame.name}"
+
+    def __str__(self) -> str:
+        return (
+            f"Event loop blocked for {self.duration:.2f}s"
+            f"\n  task: {self.task_name} [{self.coro_name}]"
+            f"\n  at: {self.format_frame(self.plugin_frame)}"
+            f"\n  blocking: {self.format_frame(self.blocking_frame)}"
+            f"\n\n{''.join(self.stack.format())}"
+        )
+
+
+class LoopWatchdog:
+    """
+    Measures loop lag with a timer every INTERVAL seconds and catches stalls from a helper thread.
+
+    The thread only reads the timer's deadline, when the loop is more than threshold seconds past it
+    the loop thread's stack and the task being stepped are captured right away, while the offending call is
+    still on the stack. The stall is logged and counted by the loop itself once it gets going again,
+    so logging handlers never run off the loop thread.
+    """
+
+    INTERVAL: float = 0.25
+    CHECK_INTERVAL: float = 0.1
+    STACK_LIMIT: int = 30
+
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.handle: asyncio.TimerHandle | None = None
+        self.expected: float = 0
+        self.last_lag: float = 0
+
+        self.threshold: float = 0
+        self.loop_thread_id: int | None = None
+        self.thread: threading.Thread | None = None
+        self.stop_event = threading.Event()
+
+        self.pending_stall: Stall | None = None
+        self.stalls: deque[Stall] = deque(maxlen=20)
+
+    def start(self, loop: asyncio.AbstractEventLoop, threshold: float = 0) -> None:
+        """Start the lag timer, and the stall catching thread if threshold is set."""
+        if self.handle is not None:
+            return
+
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()
+        self.schedule()
+
+        if threshold > 0:
+            self.threshold = threshold
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.watch, name="loop-watchdog", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def schedule(self) -> None:
+        self.expected = self.loop.time() + self.INTERVAL
+        self.handle = self.loop.call_at(self.expected, self.tick)
+
+    def tick(self) -> None:
+        self.last_lag = max(0.0, self.loop.time() - self.expected)
+        LOOP_LAG.observe(self.last_lag)
+
+        if self.pending_stall is not None:
+            stall, self.pending_stall = self.pending_stall, None
+            self.report(stall)
+
+        self.schedule()
+
+    def watch(self) -> None:
+        caught_deadline = None
+
+        while not self.stop_event.wait(self.CHECK_INTERVAL):
+            # loop.time() is time.monotonic() on the default and uvloop loops.
+            deadline = self.expected
+            lag = time.monotonic() - deadline
+
+            if lag < self.threshold or deadline == caught_deadline or self.handle is None:
+                continue
+
+            caught_deadline = deadline
+
+            try:
+                self.pending_stall = self.capture(lag)
+            except Exception:
+                # Frames can vanish while being walked, the next stall will do.
+                continue
+
+    def capture(self, lag: float) -> Stall | None:
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return None
+
+        stack = traceback.StackSummary.extract(traceback.walk_stack(frame), limit=self.STACK_LIMIT)
+        stack.reverse()
+
+        # Drop the loop's own frames above the callback that's running.
+        for index in range(len(stack) - 1, -1, -1):
+            if stack[index].filename == asyncio.events.__file__ and stack[index].name == "_run":
+                del stack[: index + 1]
+                break
+
+        return Stall(task=get_current_task(self.loop), stack=stack, lag=lag)
+
+    def report(self, stall: Stall) -> None:
+        stall.duration = max(stall.lag, self.last_lag)
+        self.stalls.append(stall)
+
+        LOOP_STALLS.labels(stall.coro_name).inc()
+        LOOP_STALL_DURATION.observe(stall.duration)
+        LOOP_LAST_STALL.set(stall.caught_at)
+
+        from ..config import Config
+
+        logging.getLogger(Config.BOT_NAME).warning(stall)
+
+
+LOOP_WATCHDOG = LoopWatchdog()
@@ -0,0 +1,201 @@
+import gc
+import linecache
+import os
+import resource
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from .metrics import METRICS
+
+IGNORED_FILES = (tracemalloc.__file__, linecache.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+def format_size(size: int | float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class MemoryProfiler:
+    """
+    On demand memory diagnostics, tracemalloc is off unless started here or with TRACEMALLOC=<frames> in env.
+        start/stop tracing, diff against a baseline snapshot grouped by plugin file,
+        top allocation sites, RSS and GC generation stats.
+    """
+
+    DEFAULT_FRAMES: int = 16
+
+    def __init__(self):
+        self.baseline: tracemalloc.Snapshot | None = None
+        self.baseline_at: float | None = None
+
+    @property
+    def is_tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = DEFAULT_FRAMES) -> None:
+        """Start tracing, more frames are needed to attribute allocations in libraries to the plugin calling them."""
+        if not self.is_tracing:
+            tracemalloc.start(frames)
+        self.mark()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self.baseline = self.baseline_at = None
+
+    @staticmethod
+    def take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, file_name) for file_name in IGNORED_FILES]
+        )
+
+    def mark(self) -> None:
+        """Set the point diffs are taken from."""
+        self.baseline = self.take_snapshot()
+        self.baseline_at = time.time()
+
+    @staticmethod
+    def get_plugin_roots() -> list[Path]:
+        from .. import ub_core_dir
+        from ..config import Config
+
+        return [Config.WORKING_DIR, ub_core_dir]
+
+    @staticmethod
+    def get_owner(traceback: tracemalloc.Traceback, roots: list[Path]) -> str:
+        """The most recent frame that's in a plugin dir, else the allocating file."""
+        for frame in reversed(traceback):
+            path = Path(frame.filename)
+            for root in roots:
+                if path.is_relative_to(root):
+                    return str(path.relative_to(root.parent))
+
+        return traceback[-1].filename if len(traceback) else "<unknown>"
+
+    def diff(self, limit: int = 10) -> list[tuple[str, int, int]]:
+        """(plugin file, size diff, count diff) since the baseline, biggest growth first."""
+        if not self.is_tracing or self.baseline is None:
+            raise RuntimeError("Memory tracing isn't running.")
+
+        roots = self.get_plugin_roots()
+        grouped: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+
+        for stat in self.take_snapshot().compare_to(self.baseline, "traceback"):
+            owner = grouped[self.get_owner(stat.traceback, roots)]
+            owner[0] += stat.size_diff
+            owner[1] += stat.count_diff
+
+        results = sorted(grouped.items(), key=lambda item: item[1][0], reverse=True)
+        return [(owner, size, count) for owner, (size, count) in results[:limit]]
+
+    def top(self, limit: int = 10) -> list[tuple[str, int, int]]:
+        """(file:line, size, count) of the biggest allocation sites."""
+        if not self.is_tracing:
+            raise RuntimeError("Memory tracing isn't running.")
+
+        return [
+            (f"{stat.traceback[-1].filename}:{stat.traceback[-1].lineno}", stat.size, stat.count)
+            for stat in self.take_snapshot().statistics("lineno")[:limit]
+        ]
+
+    @staticmethod
+    def get_rss() -> dict[str, int]:
+        """Current and peak RSS in bytes."""
+        rss = {}
+        try:
+            with open("/proc/self/status") as status:
+                for line in status:
+                    if line.startswith(("VmRSS:", "VmHWM:")):
+                        key, value, _ = line.split()
+                        rss["rss" if key == "VmRSS:" else "peak_rss"] = int(value) * 1024
+        except OSError:
+            pass
+
+        rss.setdefault("peak_rss", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+        return rss
+
+    @staticmethod
+    def get_gc_stats(count_objects: bool = True) -> dict[str, Any]:
+        stats = {
+            "counts": gc.get_count(),
+            "thresholds": gc.get_threshold(),
+            "generations": gc.get_stats(),
+            "garbage": len(gc.garbage),
+        }
+
+        # Walks every tracked object, keep it off request paths.
+        if count_objects:
+            stats["objects"] = len(gc.get_objects())
+
+        return stats
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return self.get_stats()
+
+    def get_stats(self, count_objects: bool = True) -> dict[str, Any]:
+        stats = {**self.get_rss(), "gc": self.get_gc_stats(count_objects), "tracing": self.is_tracing}
+
+        if self.is_tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            stats.update(
+                traced=current,
+                traced_peak=peak,
+                tracemalloc_overhead=tracemalloc.get_tracemalloc_memory(),
+                baseline_age=round(time.time() - self.baseline_at, 1) if self.baseline_at else None,
+            )
+
+        return stats
+
+    def report(self) -> str:
+        stats = self.stats
+        lines = [
+            f"RSS: {format_size(stats.get('rss', 0))} [peak {format_size(stats['peak_rss'])}]",
+            f"GC counts: {stats['gc']['counts']} thresholds: {stats['gc']['thresholds']}",
+        ]
+        lines.extend(
+            f"  gen {index}: {gen['collections']} collections, {gen['collected']} collected, "
+            f"{gen['uncollectable']} uncollectable"
+            for index, gen in enumerate(stats["gc"]["generations"])
+        )
+        lines.append(f"Tracked objects: {stats['gc']['objects']}")
+
+        if stats["tracing"]:
+            lines.append(
+                f"Traced: {format_size(stats['traced'])} [peak {format_size(stats['traced_peak'])}, "
+                f"overhead {format_size(stats['tracemalloc_overhead'])}]"
+            )
+        else:
+            lines.append("Tracing: off")
+
+        return "\n".join(lines)
+
+
+MEMORY_PROFILER = MemoryProfiler()
+
+RSS = METRICS.gauge("ub_process_resident_memory_bytes", "Resident memory of the process.")
+PEAK_RSS = METRICS.gauge("ub_process_peak_resident_memory_bytes", "Peak resident memory of the process.")
+GC_COLLECTIONS = METRICS.gauge("ub_gc_collections", "GC runs per generation since start.", labels=("generation",))
+GC_PENDING = METRICS.gauge(
+    "ub_gc_pending_objects", "Allocations counted towards the next collection.", labels=("generation",)
+)
+TRACED = METRICS.gauge("ub_tracemalloc_traced_bytes", "Memory traced by tracemalloc, 0 when it's off.")
+
+
+@METRICS.add_collector
+def collect_memory_metrics() -> None:
+    # Skips gc.get_objects(), walking every object on each scrape isn't cheap.
+    rss = MEMORY_PROFILER.get_rss()
+    RSS.set(rss.get("rss", 0))
+    PEAK_RSS.set(rss["peak_rss"])
+
+    for generation, (stats, pending) in enumerate(zip(gc.get_stats(), gc.get_count())):
+        GC_COLLECTIONS.labels(generation).set(stats["collections"])
+        GC_PENDING.labels(generation).set(pending)
+
+    TRACED.set(tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0)
@@ -0,0 +1,250 @@
+import asyncio
+import math
+import time
+import weakref
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """
+    Base for metrics with optional labels.
+
+    Values are plain attributes updated in place on the loop thread, there are no locks.
+    Get a labelled child once and keep it around on hot paths: metric.labels(cmd="ping").inc()
+    """
+
+    type: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: tuple[str, ...] = tuple(labels)
+        self.children: dict[tuple, "Metric"] = {}
+
+    def labels(self, *values, **kw_values) -> "Metric":
+        key = values or tuple(kw_values[name] for name in self.label_names)
+        child = self.children.get(key)
+
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name}: expected labels {self.label_names}, got {key}")
+            child = self.children[key] = self.create_child()
+
+        return child
+
+    def create_child(self) -> "Metric":
+        return type(self)(self.name, self.documentation)
+
+    def samples(self) -> Iterable[tuple[str, tuple, float]]:
+        """(suffix, label values + extra label, value) rows of this metric."""
+        if not self.label_names:
+            yield from self.child_samples(self, ())
+            return
+
+        for key, child in list(self.children.items()):
+            yield from self.child_samples(child, key)
+
+    def child_samples(self, child: "Metric", key: tuple) -> Iterable[tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(f"{self.name}{suffix}{labels} {format_value(value)}" for suffix, labels, value in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def child_samples(self, child: "Counter", key: tuple):
+        yield "", format_labels(self.label_names, key), child.value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.value: float = 0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def child_samples(self, child: "Gauge", key: tuple):
+        yield "", format_labels(self.label_names, key), child.value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        # Per bucket counts, made cumulative when rendered.
+        self.counts: list[int] = [0] * (len(self.buckets) + 1)
+        self.sum: float = 0
+        self.count: int = 0
+
+    def create_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def child_samples(self, child: "Histogram", key: tuple):
+        cumulative = 0
+
+        for bound, count in zip((*self.buckets, math.inf), child.counts):
+            cumulative += count
+            yield "_bucket", format_labels(self.label_names, key, f'le="{format_value(float(bound))}"'), cumulative
+
+        yield "_sum", format_labels(self.label_names, key), child.sum
+        yield "_count", format_labels(self.label_names, key), child.count
+
+
+class MetricsRegistry:
+    """
+    Pre-aggregated metrics rendered in the Prometheus text format.
+
+    Hot paths only bump numbers, anything that can be read off existing state
+    (store sizes, queue depths, memory) is filled in by collectors when /metrics is scraped.
+    Metrics are created once by name, so a reloaded plugin gets the same object back.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], None]] = []
+
+    def get_or_create(self, cls: type[Metric], name: str, documentation: str, **kwargs) -> Metric:
+        metric = self.metrics.get(name)
+
+        if metric is None:
+            metric = self.metrics[name] = cls(name, documentation, **kwargs)
+        elif not isinstance(metric, cls):
+            raise TypeError(f"{name} is already registered as a {metric.type}")
+
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self.get_or_create(Counter, name, documentation, labels=labels)
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Gauge:
+        return self.get_or_create(Gauge, name, documentation, labels=labels)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.get_or_create(Histogram, name, documentation, labels=labels, buckets=buckets)
+
+    def add_collector(self, collector: Callable[[], None]) -> Callable[[], None]:
+        """Register a function that updates gauges right before the metrics are rendered."""
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+        return collector
+
+    def collect(self) -> None:
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception:
+                # A broken collector shouldn't take the whole endpoint down.
+                pass
+
+    def render(self) -> str:
+        self.collect()
+        lines = []
+
+        for name in sorted(self.metrics):
+            lines.extend(self.metrics[name].render())
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+UPDATES_RECEIVED = METRICS.counter("ub_updates_received_total", "Updates queued by pyrogram's dispatcher.")
+
+UPDATES_DISPATCHED = METRICS.counter(
+    "ub_updates_dispatched_total", "Updates handled by a handler, per handler group.", labels=("group",)
+)
+
+
+UPDATES_QUEUED = METRICS.gauge("ub_updates_queue_depth", "Updates waiting in dispatcher queues for a handler worker.")
+
+
+class CountingQueue(asyncio.Queue):
+    """Dispatcher updates queue that counts what goes in, the backlog of all of them is UPDATES_QUEUED."""
+
+    instances: weakref.WeakSet["CountingQueue"] = weakref.WeakSet()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingQueue.instances.add(self)
+
+    def put_nowait(self, item) -> None:
+        if item is not None:
+            UPDATES_RECEIVED.value += 1
+        super().put_nowait(item)
+
+
+@METRICS.add_collector
+def collect_update_queues() -> None:
+    UPDATES_QUEUED.set(sum(queue.qsize() for queue in CountingQueue.instances))
@@ -0,0 +1,508 @@
+import asyncio
+import heapq
+import logging
+import random
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from .diagnostics import METRICS
+
+if TYPE_CHECKING:
+    from .task_manager import TaskManager
+
+LOGGER = logging.getLogger("Config")
+
+CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+WORKER_RUNS = METRICS.counter("ub_worker_runs_total", "Worker runs.", labels=("worker",))
+WORKER_ERRORS = METRICS.counter("ub_worker_errors_total", "Worker runs that raised.", labels=("worker",))
+WORKER_SKIPPED = METRICS.counter(
+    "ub_worker_skipped_total", "Worker runs skipped by overlap or catch up rules.", labels=("worker",)
+)
+
+MONTH_NAMES = {name: index for index, name in enumerate(("jan feb mar apr may jun jul aug sep oct nov dec").split(), 1)}
+DAY_NAMES = {name: index for index, name in enumerate(("sun mon tue wed thu fri sat").split())}
+
+
+class ScheduleMode(Enum):
+    FIXED_RATE = "fixed_rate"  # Runs on a fixed grid, the function's runtime doesn't shift the next run.
+    FIXED_DELAY = "fixed_delay"  # Next run is interval seconds after the previous one finished.
+
+
+class OverlapPolicy(Enum):
+    """What to do when a run is due while max_overlap runs are still going."""
+
+    SKIP = "skip"
+    QUEUE = "queue"  # Run once as soon as a slot frees up.
+    REPLACE = "replace"  # Cancel the oldest run and start the new one.
+
+
+class CatchUp(Enum):
+    """What to do with runs missed while the loop was blocked or the system was suspended."""
+
+    SKIP = "skip"  # Drop them, resume on the next slot.
+    ONCE = "once"  # Collapse them into a single run now.
+    ALL = "all"  # Run each of them, up to WorkerScheduler.MAX_CATCH_UP.
+
+
+class CronExpression:
+    """
+    Standard 5 field cron: minute hour day-of-month month day-of-week, in local time.
+    Supports *, lists, ranges, steps, month/day names and the @daily style aliases.
+    """
+
+    FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+    def __init__(self, expression: str):
+        self.expression: str = expression
+        parts = CRON_ALIASES.get(expression.strip().lower(), expression).split()
+
+        if len(parts) != 5:
+            raise ValueError(f"Invalid cron expression: {expression}")
+
+        values = [self.parse_field(part, *limits) for part, limits in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        # 7 is Sunday too.
+        self.weekdays: set[int] = {day % 7 for day in weekdays}
+
+        # Like cron, if both day fields are restricted a day matching either one runs.
+        self.any_day: bool = parts[2] == "*"
+        self.any_weekday: bool = parts[4] == "*"
+
+    def __repr__(self):
+        return f"CronExpression({self.expression!r})"
+
+    @staticmethod
+    def parse_value(value: str, name: str) -> int:
+        value = value.lower()
+        names = MONTH_NAMES if name == "month" else DAY_NAMES if name == "weekday" else {}
+        return names[value] if value in names else int(value)
+
+    @classmethod
+    def parse_field(cls, field: str, name: str, low: int, high: int) -> set[int]:
+        values = set()
+
+        for part in field.split(","):
+            value_range, _, step = part.partition("/")
+
+            if value_range == "*":
+                start, end = low, high
+            elif "-" in value_range:
+                start, end = (cls.parse_value(value, name) for value in value_range.split("-", 1))
+            else:
+                start = cls.parse_value(value_range, name)
+                end = high if step else start
+
+            step = int(step) if step else 1
+
+            if not (low <= start <= end <= high) or step < 1:
+                raise ValueError(f"Invalid cron {name} field: {field}")
+
+            values.update(range(start, end + 1, step))
+
+        return values
+
+    def matches_day(self, date: datetime) -> bool:
+        day_match = date.day in self.days
+        weekday_match = (date.weekday() + 1) % 7 in self.weekdays
+
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+
+        return day_match or weekday_match
+
+    def next_after(self, date: datetime) -> datetime:
+        """First matching minute after date."""
+        date = date.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        give_up_year = date.year + 5
+
+        while date.year <= give_up_year:
+            if date.month not in self.months:
+                date = date.replace(day=1, hour=0, minute=0)
+                date = date.replace(year=date.year + 1, month=1) if date.month == 12 else date.replace(month=date.month + 1)
+                continue
+
+            if not self.matches_day(date):
+                date = date.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            if date.hour not in self.hours:
+                date = date.replace(minute=0) + timedelta(hours=1)
+                continue
+
+            if date.minute not in self.minutes:
+                date += timedelta(minutes=1)
+                continue
+
+            return date
+
+        raise ValueError(f"{self} never matches.")
+
+
+class Worker:
+    """
+    A periodic job run by the WorkerScheduler.
+    Quacks like an asyncio.Task (get_name, cancel, done, cancelled) so TaskManager can store, find and cancel it.
+    """
+
+    def __init__(
+        self,
+        scheduler: "WorkerScheduler",
+        function: Callable,
+        name: str,
+        interval: float | None = None,
+        cron: str | None = None,
+        mode: ScheduleMode = ScheduleMode.FIXED_DELAY,
+        jitter: float = 0,
+        max_overlap: int = 1,
+        on_overlap: OverlapPolicy = OverlapPolicy.SKIP,
+        catch_up: CatchUp = CatchUp.ONCE,
+        break_condition: Callable | None = None,
+    ):
+        if not interval and not cron:
+            raise ValueError(f"{name}: a worker needs an interval or a cron expression.")
+
+        self.scheduler = scheduler
+        self.function: Callable = function
+        self.name: str = name
+        self.interval: float | None = interval
+        self.cron: CronExpression | None = CronExpression(cron) if cron else None
+        self.mode: ScheduleMode = ScheduleMode(mode)
+        self.jitter: float = jitter
+        self.max_overlap: int = max(1, max_overlap)
+        self.on_overlap: OverlapPolicy = OverlapPolicy(on_overlap)
+        self.catch_up: CatchUp = CatchUp(catch_up)
+        self.break_condition: Callable | None = break_condition
+
+        # Slot on the schedule's grid: loop time for intervals, wall time for cron.
+        self.slot: float | datetime | None = None
+        # Loop time the timer fires at, slot + jitter.
+        self.due: float | None = None
+
+        self.running: list[asyncio.Task] = []
+        self.pending: int = 0
+        self._done: bool = False
+        self._cancelled: bool = False
+        self._callbacks: list[Callable] = []
+
+        self.runs: int = 0
+        self.errors: int = 0
+        self.skipped: int = 0
+        self.missed: int = 0
+        self.last_run: float | None = None
+        self.last_duration: float | None = None
+        self.max_duration: float = 0
+        self.total_duration: float = 0
+        self.last_error: str | None = None
+
+    def __repr__(self):
+        schedule = f"cron={self.cron.expression!r}" if self.cron else f"interval={self.interval}"
+        return f"Worker(name={self.name}, {schedule}, mode={self.mode.value})"
+
+    def get_name(self) -> str:
+        return self.name
+
+    def done(self) -> bool:
+        return self._done
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def add_done_callback(self, callback: Callable) -> None:
+        if self._done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def cancel(self) -> bool:
+        if self._done:
+            return False
+
+        self._cancelled = True
+        self.finish()
+        return True
+
+    def finish(self) -> None:
+        if self._done:
+            return
+
+        self._done = True
+        self.pending = 0
+
+        for task in self.running:
+            if task is not asyncio.current_task():
+                task.cancel()
+
+        for callback in self._callbacks:
+            callback(self)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        if self.due is not None and not self._done:
+            next_run = time.time() + max(0.0, self.due - self.scheduler.loop.time())
+        else:
+            next_run = None
+
+        return {
+            "schedule": self.cron.expression if self.cron else f"every {self.interval}s",
+            "mode": self.mode.value,
+            "runs": self.runs,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "missed": self.missed,
+            "running": len(self.running),
+            "pending": self.pending,
+            "last_run": self.last_run,
+            "next_run": next_run,
+            "last_duration": self.last_duration,
+            "avg_duration": self.total_duration / self.runs if self.runs else None,
+            "max_duration": self.max_duration,
+            "last_error": self.last_error,
+            "done": self._done,
+        }
+
+    def first_slot(self, now: float) -> float | datetime:
+        if self.cron:
+            return self.cron.next_after(datetime.now())
+        return now
+
+    def next_slot(self, slot: float | datetime, now: float) -> tuple[float | datetime, int]:
+        """The next slot after now on this worker's grid and how many slots were passed over on the way."""
+        if self.cron:
+            wall_now = datetime.now()
+            missed = 0
+            slot = self.cron.next_after(slot)
+
+            while slot <= wall_now and missed <= WorkerScheduler.MAX_CATCH_UP:
+                missed += 1
+                slot = self.cron.next_after(slot)
+
+            if slot <= wall_now:
+                slot = self.cron.next_after(wall_now)
+
+            return slot, missed
+
+        if self.mode is ScheduleMode.FIXED_DELAY:
+            return now + self.interval, 0
+
+        missed = max(0, int((now - slot) // self.interval))
+        return slot + (missed + 1) * self.interval, missed
+
+    def slot_to_loop_time(self, slot: float | datetime) -> float:
+        loop_time = self.scheduler.loop.time()
+
+        if isinstance(slot, datetime):
+            loop_time += max(0.0, (slot - datetime.now()).total_seconds())
+        else:
+            loop_time = slot
+
+        return loop_time + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def fire(self, now: float) -> None:
+        """Called by the scheduler when due: start a run, count what was missed and queue the next slot."""
+        if self._done:
+            return
+
+        if isinstance(self.slot, datetime) and datetime.now() < self.slot - timedelta(seconds=1):
+            # Wall clock was turned back, wait for the slot again.
+            self.scheduler.push(self, self.slot_to_loop_time(self.slot))
+            return
+
+        late = now - self.due if self.due is not None else 0
+
+        if self.mode is ScheduleMode.FIXED_DELAY and not self.cron:
+            self.due = None
+            self.start_run()
+            return
+
+        next_slot, missed = self.next_slot(self.slot, now)
+        self.missed += missed
+
+        if self.catch_up is CatchUp.SKIP and (missed or late > self.scheduler.MISFIRE_GRACE):
+            self.skipped += 1
+        else:
+            if self.catch_up is CatchUp.ALL:
+                self.pending = min(self.pending + missed, WorkerScheduler.MAX_CATCH_UP)
+            self.start_run()
+
+        self.slot = next_slot
+        self.scheduler.push(self, self.slot_to_loop_time(next_slot))
+
+    def start_run(self) -> None:
+        if len(self.running) >= self.max_overlap:
+            match self.on_overlap:
+                case OverlapPolicy.SKIP:
+                    self.skipped += 1
+                    return
+                case OverlapPolicy.QUEUE:
+                    self.pending = max(self.pending, 1)
+                    return
+                case OverlapPolicy.REPLACE:
+                    self.running[0].cancel()
+                    self.running.pop(0)
+
+        task = self.scheduler.loop.create_task(self.run(), name=f"{self.name}:run")
+        self.running.append(task)
+        task.add_done_callback(self.on_run_done)
+
+    def on_run_done(self, task: asyncio.Task) -> None:
+        if task in self.running:
+            self.running.remove(task)
+
+        if self._done:
+            return
+
+        if self.pending and len(self.running) < self.max_overlap:
+            self.pending -= 1
+            self.start_run()
+            return
+
+        if self.mode is ScheduleMode.FIXED_DELAY and not self.cron and not self.running:
+            self.scheduler.push(self, self.slot_to_loop_time(self.scheduler.loop.time() + self.interval))
+
+    async def run(self) -> None:
+        from .utils.helpers import run_unknown_callable
+
+        if self.break_condition and await run_unknown_callable(self.break_condition):
+            LOGGER.info(f"{self.name}: break_condition returned True... terminating worker...")
+            self.finish()
+            return
+
+        self.last_run = time.time()
+        start = time.perf_counter()
+
+        try:
+            await run_unknown_callable(self.function)
+        except asyncio.CancelledError:
+            LOGGER.info(f"{self.name}: run cancelled...")
+            raise
+        except Exception as e:
+            self.errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            LOGGER.exception(e)
+        finally:
+            duration = time.perf_counter() - start
+            self.runs += 1
+            self.last_duration = duration
+            self.total_duration += duration
+            self.max_duration = max(self.max_duration, duration)
+
+
+class WorkerScheduler:
+    """
+    Runs every worker off one timer heap and a single loop timer.
+
+    Fixed rate workers stay on their grid regardless of how long each run takes,
+    fixed delay workers wait interval seconds after each run like the old while-sleep loop.
+    Runs missed because the loop was blocked are handled by the worker's CatchUp rule.
+    """
+
+    # A fixed rate run this late counts as missed for CatchUp.SKIP.
+    MISFIRE_GRACE: float = 1
+    MAX_CATCH_UP: int = 10
+
+    def __init__(self, task_manager: "TaskManager"):
+        self.task_manager = task_manager
+        self.heap: list[tuple[float, int, Worker]] = []
+        self.workers: dict[str, Worker] = {}
+        self._counter: int = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_at: float | None = None
+        METRICS.add_collector(self.collect_metrics)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self.task_manager.loop
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {name: worker.stats for name, worker in self.workers.items()}
+
+    def collect_metrics(self) -> None:
+        for name, worker in self.workers.items():
+            WORKER_RUNS.labels(name).value = worker.runs
+            WORKER_ERRORS.labels(name).value = worker.errors
+            WORKER_SKIPPED.labels(name).value = worker.skipped
+
+    def add(self, worker: Worker, run_at_start: bool = True) -> Worker:
+        now = self.loop.time()
+
+        if worker.cron:
+            worker.slot = worker.first_slot(now)
+            due = worker.slot_to_loop_time(worker.slot)
+        else:
+            worker.slot = now if run_at_start else now + worker.interval
+            due = worker.slot if run_at_start else worker.slot_to_loop_time(worker.slot)
+
+        self.workers[worker.name] = worker
+        worker.add_done_callback(self.remove)
+        self.push(worker, due)
+        return worker
+
+    def remove(self, worker: Worker) -> None:
+        if self.workers.get(worker.name) is worker:
+            self.workers.pop(worker.name)
+
+    def push(self, worker: Worker, due: float) -> None:
+        if worker.done():
+            return
+
+        worker.due = due
+        self._counter += 1
+        heapq.heappush(self.heap, (due, self._counter, worker))
+
+        if self._timer_at is None or due < self._timer_at:
+            self.schedule_timer()
+
+    def schedule_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_at = None
+
+        # Drop cancelled workers and stale entries left behind by reschedules.
+        while self.heap and (self.heap[0][2].done() or self.heap[0][2].due != self.heap[0][0]):
+            heapq.heappop(self.heap)
+
+        if self.heap:
+            self._timer_at = self.heap[0][0]
+            self._timer = self.loop.call_at(self._timer_at, self.dispatch)
+
+    def dispatch(self) -> None:
+        self._timer = self._timer_at = None
+        now = self.loop.time()
+
+        while self.heap and self.heap[0][0] <= now:
+            due, _, worker = heapq.heappop(self.heap)
+
+            if worker.done() or worker.due != due:
+                continue
+
+            try:
+                worker.fire(now)
+            except Exception as e:
+                # Its next slot can't be worked out (a cron that never matches), so it will never fire again.
+                LOGGER.exception(e)
+                worker.finish()
+
+        self.schedule_timer()
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_at = None
+
+        for worker in list(self.workers.values()):
+            worker.cancel()
+
+        self.heap.clear()
@@ -2,12 +2,19 @@ import asyncio
 import json
 import logging
 import threading
-from collections.abc import Awaitable, Callable, Coroutine, Generator
+import time
+from collections.abc import Awaitable, Callable, Coroutine, Generator, Iterable
 from functools import wraps
 from inspect import isawaitable, iscoroutine
 
+from .diagnostics import BOOT_PROFILER, METRICS
+from .diagnostics.boot_profiler import get_awaitable_name
+from .scheduler import CatchUp, OverlapPolicy, ScheduleMode, Worker, WorkerScheduler
+
 LOGGER = logging.getLogger("Config")
 
+TASKS = METRICS.gauge("ub_tasks", "Tasks tracked by the TaskManager per store.", labels=("type",))
+
 
 def ensure_is_not_closed(function):
     @wraps(function)
@@ -19,6 +26,25 @@ def ensure_is_not_closed(function):
     return inner
 
 
+class InitTask:
+    def __init__(
+        self,
+        coro: Coroutine | Awaitable,
+        name: str | None = None,
+        depends_on: Iterable[str] = (),
+        timeout: float | None = None,
+        critical: bool = True,
+    ):
+        self.coro = coro
+        self.name: str = name or get_awaitable_name(coro)
+        self.depends_on: tuple[str, ...] = tuple(depends_on)
+        self.timeout: float | None = timeout
+        self.critical: bool = critical
+
+    def __repr__(self):
+        return f"InitTask(name={self.name}, depends_on={self.depends_on}, critical={self.critical})"
+
+
 class TaskManager:
     __instance = None
 
@@ -38,6 +64,8 @@ class TaskManager:
         self._loop = None
         self.lock = threading.Lock()
         self.async_lock = asyncio.Lock()
+        self.scheduler = WorkerScheduler(self)
+        METRICS.add_collector(self.collect_metrics)
 
     def __str__(self) -> str:
         return json.dumps(self._store, indent=4, ensure_ascii=False, default=str)
@@ -63,15 +91,26 @@ class TaskManager:
     def all_tasks(self) -> Generator:
         for tasks in list(self._store.values()):
             for task in tasks:
-                if isinstance(task, asyncio.Task):
+                if isinstance(task, (asyncio.Task, Worker)):
                     yield task
 
+    def collect_metrics(self) -> None:
+        for task_type, store in self._store.items():
+            TASKS.labels(task_type).set(len(store))
+
     @property
     def locked(self):
         return self.lock.locked() or self.async_lock.locked()
 
     @ensure_is_not_closed
-    def add_init(self, coro: Coroutine | Awaitable) -> None:
+    def add_init(
+        self,
+        coro: Coroutine | Awaitable,
+        name: str | None = None,
+        depends_on: Iterable[str] = (),
+        timeout: float | None = None,
+        critical: bool = True,
+    ) -> None:
         """
         type:
             must be coroutines/awaitable
@@ -83,13 +122,20 @@ class TaskManager:
             init_task and @register_task(type=init) are mutually exclusive
             DO NOT NAME FUNCTION init_task and then do @bot.register_task(type=init)
             THIS WILL DUPLICATE IT.
+
+            name: defaults to module.qualname of the coroutine
+            depends_on: names of init tasks that must finish first, independent tasks run in parallel
+            timeout: seconds before the task is cancelled
+            critical: boot waits for critical tasks, the rest finish in background once the bot is idling
         ex:
             funcs to extract and set data from db / files etc
         """
         with self.lock:
             if not isawaitable(coro):
                 raise TypeError(f"INIT requires awaitable got: {coro}")
-            self._store["init"].add(coro)
+            self._store["init"].add(
+                InitTask(coro=coro, name=name, depends_on=depends_on, timeout=timeout, critical=critical)
+            )
             return None
 
     @ensure_is_not_closed
@@ -134,9 +180,10 @@ class TaskManager:
 
     @ensure_is_not_closed
     def create_temp_task(self, coro: Coroutine, name: str, extra_callback: Callable = None) -> asyncio.Task:
-        with self.lock:
-            from .utils.helpers import run_unknown_callable
+        # Outside the lock: the first import of utils creates Aio, which registers its tasks here.
+        from .utils.helpers import run_unknown_callable
 
+        with self.lock:
             temp_task: asyncio.Task = self.loop.create_task(coro, name=name)
             self._store["temp"].add(temp_task)
             temp_task.add_done_callback(
@@ -147,43 +194,59 @@ class TaskManager:
             )
             return temp_task
 
-    @staticmethod
-    async def _worker(function: Callable, interval: int, break_condition: Callable, name: str):
-        from .utils.helpers import run_unknown_callable
-
-        while True:
-            if break_condition and await run_unknown_callable(break_condition):
-                LOGGER.info(f"{name}: break_condition returned True... terminating worker...")
-                return "break_condition returned True... terminating worker..."
-
-            try:
-                await run_unknown_callable(function)
-            except asyncio.CancelledError:
-                LOGGER.info(f"{name}: cancelled...")
-                return
-            except Exception as e:
-                LOGGER.exception(e)
-
-            await asyncio.sleep(interval)
-
     @ensure_is_not_closed
-    def create_worker(self, function: Callable, interval: int, name: str = None, break_condition: Callable = None):
+    def create_worker(
+        self,
+        function: Callable,
+        interval: float | None = None,
+        name: str = None,
+        break_condition: Callable = None,
+        cron: str | None = None,
+        mode: ScheduleMode = ScheduleMode.FIXED_DELAY,
+        jitter: float = 0,
+        max_overlap: int = 1,
+        on_overlap: OverlapPolicy = OverlapPolicy.SKIP,
+        catch_up: CatchUp = CatchUp.ONCE,
+        run_at_start: bool = True,
+    ) -> Worker:
         """
-        just a while loop wrapper for bg tasks,
-        so you don't have to write worker code again and again
+        schedule a function to run periodically,
+        all workers share the TaskManager's WorkerScheduler instead of running a while loop each
 
         @param function: any kind of function/awaitable
-        @param interval: amount to sleep before next call
-        @param break_condition: optional lambda/function that returns true to stop worker
+        @param interval: seconds between runs
         @param name: name for the worker
-        @return: None
+        @param break_condition: optional lambda/function that returns true to stop worker
+        @param cron: 5 field cron expression or @hourly/@daily..., used instead of interval
+        @param mode: FIXED_DELAY (default) waits interval after each run ends like the old while-sleep worker,
+            FIXED_RATE keeps runs on a fixed grid, cron workers are always on their grid
+        @param jitter: up to this many seconds are randomly added to each run
+        @param max_overlap: how many runs may be going at once
+        @param on_overlap: SKIP | QUEUE | REPLACE a run that's due when max_overlap runs are going
+        @param catch_up: SKIP | ONCE | ALL runs missed while the loop was blocked
+        @param run_at_start: run the first interval right away
+        @return: Worker, works with get_tasks and cancel_tasks like a Task.
+            This used to return an asyncio.Task, Worker has get_name, cancel, done and add_done_callback
+            but isn't awaitable.
         """
         with self.lock:
             name = name or f"{function.__name__}-worker"
-            coro = self._worker(function, interval, break_condition, name)
-            task = self.loop.create_task(coro, name=name)
-            self._store["workers"].add(task)
-            return task
+            worker = Worker(
+                scheduler=self.scheduler,
+                function=function,
+                name=name,
+                interval=interval,
+                cron=cron,
+                mode=mode,
+                jitter=jitter,
+                max_overlap=max_overlap,
+                on_overlap=on_overlap,
+                catch_up=catch_up,
+                break_condition=break_condition,
+            )
+            self._store["workers"].add(worker)
+            worker.add_done_callback(self._store["workers"].discard)
+            return self.scheduler.add(worker, run_at_start=run_at_start)
 
     @ensure_is_not_closed
     def get_tasks(self, name: str = None, task_type: str = None) -> Generator[asyncio.Task]:
@@ -201,6 +264,17 @@ class TaskManager:
         else:
             yield from set_to_search
 
+    @ensure_is_not_closed
+    def detach_tasks(self, tasks: Iterable[asyncio.Task | Worker], task_type: str) -> None:
+        """Stop tracking tasks without cancelling them, hot reload uses this so new ones can take their names."""
+        with self.lock:
+            self._store[task_type].difference_update(tasks)
+
+    @ensure_is_not_closed
+    def attach_tasks(self, tasks: Iterable[asyncio.Task | Worker], task_type: str) -> None:
+        with self.lock:
+            self._store[task_type].update(task for task in tasks if not task.done())
+
     @ensure_is_not_closed
     def cancel_tasks(self, name: str = None, task_type: str = None) -> set[asyncio.Task]:
         """
@@ -211,19 +285,124 @@ class TaskManager:
         [task.cancel() for task in tasks if not (task.done() or task.cancelled())]
         return tasks
 
+    @staticmethod
+    def find_cycles(init_tasks: dict[str, InitTask]) -> set[str]:
+        """Names of init tasks that are part of (or depend on) a dependency cycle."""
+        state: dict[str, str] = {}
+        cyclic: set[str] = set()
+
+        def visit(name: str) -> bool:
+            if state.get(name) == "visiting":
+                return True
+            if name in state:
+                return name in cyclic
+
+            state[name] = "visiting"
+            has_cycle = any(visit(dep) for dep in init_tasks[name].depends_on if dep in init_tasks)
+            state[name] = "done"
+
+            if has_cycle:
+                cyclic.add(name)
+            return has_cycle
+
+        for task_name in init_tasks:
+            visit(task_name)
+
+        return cyclic
+
+    async def _run_init_task(self, init_task: InitTask, tasks: dict[str, asyncio.Task], cyclic: set[str]):
+        start = time.perf_counter()
+        status = "ok"
+
+        try:
+            if init_task.name in cyclic:
+                status = "skipped"
+                raise RuntimeError(f"{init_task.name}: dependency cycle in {init_task.depends_on}")
+
+            for dep in init_task.depends_on:
+                if dep not in tasks:
+                    LOGGER.warning(f"{init_task.name}: unknown init dependency {dep}, ignoring...")
+                    continue
+                try:
+                    await asyncio.shield(tasks[dep])
+                except Exception as e:
+                    start, status = time.perf_counter(), "skipped"
+                    raise RuntimeError(f"{init_task.name}: skipped, dependency {dep} failed: {e}") from e
+
+            start = time.perf_counter()
+            return await asyncio.wait_for(init_task.coro, timeout=init_task.timeout)
+
+        except TimeoutError:
+            status = "timeout"
+            raise TimeoutError(f"{init_task.name}: timed out after {init_task.timeout}s")
+        except BaseException:
+            if status == "ok":
+                status = "failed"
+            raise
+        finally:
+            if iscoroutine(init_task.coro):
+                # No-op if it ran, avoids "never awaited" warnings for skipped tasks.
+                init_task.coro.close()
+            BOOT_PROFILER.record_init_task(
+                name=init_task.name,
+                duration=time.perf_counter() - start,
+                status=status,
+                critical=init_task.critical,
+            )
+
+    @staticmethod
+    def _log_init_result(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            LOGGER.error(task.exception(), exc_info=task.exception())
+
     @ensure_is_not_closed
     async def run_init_tasks(self):
+        """
+        Run init tasks as a dependency graph:
+            tasks start as soon as their dependencies are done,
+            boot waits only for critical tasks and the ones they depend on.
+        """
         async with self.async_lock:
-            results = await asyncio.gather(*self._store["init"], return_exceptions=True)
-            [LOGGER.exception(result) for result in results if isinstance(result, BaseException)]
-            LOGGER.info("Init Tasks Completed.")
-            self._store["init"].clear()
+            with self.lock:
+                init_tasks: dict[str, InitTask] = {}
+
+                for init_task in self._store["init"]:
+                    if init_task.name in init_tasks:
+                        LOGGER.warning(f"Duplicate init task name: {init_task.name}")
+                        init_task.name = f"{init_task.name}-{id(init_task)}"
+                    init_tasks[init_task.name] = init_task
+
+                self._store["init"].clear()
+
+            cyclic = self.find_cycles(init_tasks)
+            tasks: dict[str, asyncio.Task] = {}
+
+            for name, init_task in init_tasks.items():
+                tasks[name] = self.loop.create_task(self._run_init_task(init_task, tasks, cyclic), name=f"init:{name}")
+
+            critical = [tasks[name] for name, init_task in init_tasks.items() if init_task.critical]
+            background = [tasks[name] for name, init_task in init_tasks.items() if not init_task.critical]
+
+            if critical:
+                await asyncio.wait(critical)
+            [self._log_init_result(task) for task in critical]
+
+            for task in background:
+                if task.done():
+                    self._log_init_result(task)
+                else:
+                    self._store["bg"].add(task)
+                    task.add_done_callback(self._log_init_result)
+                    task.add_done_callback(self._store["bg"].discard)
+
+            LOGGER.info(f"Init Tasks Completed. [{len(critical)} critical, {len(background)} in background]")
 
     @ensure_is_not_closed
     async def close_and_run_exit_tasks(self):
         async with self.async_lock:
             LOGGER.info("Running exit tasks...")
             self.cancel_tasks()
+            self.scheduler.close()
             from .utils.helpers import run_unknown_callable
 
             for resource in self._store["exit"]:
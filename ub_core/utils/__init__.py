@@ -19,6 +19,9 @@ from .media_helper import (
     get_type,
     make_file_name_tg_safe,
 )
-from .shell import AsyncShell, check_audio, get_duration, run_shell_cmd, take_ss
+from .shell import AsyncShell, MediaInfo, check_audio, get_duration, probe, run_shell_cmd, take_screenshots, take_ss
+from ..config import Config
+from ..core.executors import run_in_thread
 
-aio = Aio()
+# No session or server tasks in process pool workers.
+aio = None if Config.IS_POOL_WORKER else Aio()
@@ -2,11 +2,13 @@ import asyncio
 import json
 import logging
 import os
+import time
 from collections.abc import Callable
 from functools import wraps
 from io import BytesIO
+from types import SimpleNamespace
 
-from aiohttp import ClientSession, ContentTypeError, web
+from aiohttp import ClientSession, ContentTypeError, TraceConfig, web
 from yarl import URL
 
 from .media_helper import (
@@ -16,9 +18,42 @@ from .media_helper import (
     get_type,
 )
 from ..config import Config
+from ..diagnostics import METRICS
 
 LOGGER = logging.getLogger(Config.BOT_NAME)
 
+HTTP_REQUESTS = METRICS.counter("ub_http_requests_total", "Outgoing HTTP requests.", labels=("client", "status"))
+HTTP_DURATION = METRICS.histogram(
+    "ub_http_request_duration_seconds", "Time till the response headers arrived.", labels=("client",)
+)
+HTTP_RECEIVED_BYTES = METRICS.counter("ub_http_received_bytes_total", "Response bytes read.", labels=("client",))
+
+
+def get_trace_config(client: str) -> TraceConfig:
+    """aiohttp hooks that record requests, latency and bytes read for a ClientSession."""
+    duration = HTTP_DURATION.labels(client)
+    received = HTTP_RECEIVED_BYTES.labels(client)
+
+    async def on_request_start(session: ClientSession, context: SimpleNamespace, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session: ClientSession, context: SimpleNamespace, params):
+        duration.observe(time.perf_counter() - context.start)
+        HTTP_REQUESTS.labels(client, f"{params.response.status // 100}xx").inc()
+
+    async def on_request_exception(session: ClientSession, context: SimpleNamespace, params):
+        HTTP_REQUESTS.labels(client, "error").inc()
+
+    async def on_response_chunk_received(session: ClientSession, context: SimpleNamespace, params):
+        received.value += len(params.chunk)
+
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    return trace_config
+
 
 class AioServer:
     def __init__(self):
@@ -30,9 +65,10 @@ class AioServer:
         self.port = os.environ.get("API_PORT", 0)
 
         if self.port:
-            Config.TASK_MANAGER.add_init(self.start())
+            Config.TASK_MANAGER.add_init(self.start(), name="aio.server", critical=False)
             Config.TASK_MANAGER.add_exit(self.close)
             self.set_health_check_handler()
+            self.set_metrics_handler()
 
     async def start(self):
         await self.set_app()
@@ -121,13 +157,23 @@ class AioServer:
         LOGGER.debug(repr(request))
         return web.Response(text="Web Server Running...")
 
+    @ensure_not_running
+    def set_metrics_handler(self) -> web.RouteDef:
+        return self.add_route(method="GET", path="/metrics", handler=self.handle_metrics_request, name="METRICS")
+
+    @staticmethod
+    async def handle_metrics_request(request):
+        return web.Response(
+            body=METRICS.render().encode(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        )
+
 
 class Aio:
     def __init__(self):
         """Setup aio object and params"""
         self.session: ClientSession | None = None
 
-        Config.TASK_MANAGER.add_init(self.set_session())
+        Config.TASK_MANAGER.add_init(self.set_session(), name="aio.session")
         Config.TASK_MANAGER.add_exit(self.close)
 
         self.server: AioServer = AioServer()
@@ -138,7 +184,7 @@ class Aio:
     async def set_session(self):
         """Setup ClientSession on boot."""
         LOGGER.info("AioHttp Session Created.")
-        self.session = ClientSession()
+        self.session = ClientSession(trace_configs=[get_trace_config("aio")])
 
         if self.ping_url:
             LOGGER.info(f"Starting Auto-Ping Task at {self.ping_url} with {self.ping_interval} seconds interval.")
@@ -10,6 +10,7 @@ from aiohttp import ClientResponse, ClientSession
 from pyrogram.types import Message
 from yarl import URL
 
+from .aiohttp_tools import get_trace_config
 from .helpers import progress
 from .media_helper import (
     bytes_to_mb,
@@ -18,6 +19,7 @@ from .media_helper import (
     get_filename_from_url,
     get_type,
 )
+from ..core.outbound import EditCoalescer
 
 
 class DownloadedFile:
@@ -118,7 +120,7 @@ class Download:
         self._headers = headers if headers is not None else self._default_headers
 
     async def set_sessions(self):
-        self.client_session = ClientSession(headers=self._headers)
+        self.client_session = ClientSession(headers=self._headers, trace_configs=[get_trace_config("download")])
         self.file_response_session = await self.client_session.get(url=URL(self.url, encoded=self.is_encoded_url))
         self.headers = self.file_response_session.headers
 
@@ -235,15 +237,18 @@ class Download:
         if not isinstance(self.message_to_edit, Message):
             return
 
-        while not self.is_done:
-            await progress(
-                current_size=self.completed_size_bytes,
-                total_size=self.size_bytes or 1,
-                response=self.message_to_edit,
-                action_str="Downloading...",
-                file_path=str(self.file_path),
-            )
-            await asyncio.sleep(8)
+        try:
+            while not self.is_done:
+                await progress(
+                    current_size=self.completed_size_bytes,
+                    total_size=self.size_bytes or 1,
+                    response=self.message_to_edit,
+                    action_str="Downloading...",
+                    file_path=str(self.file_path),
+                )
+                await asyncio.sleep(EditCoalescer.MIN_INTERVAL)
+        finally:
+            await self.message_to_edit._client.edit_coalescer.discard(self.message_to_edit)
 
     def return_file(self) -> DownloadedFile:
         if not self.file_path.is_file():
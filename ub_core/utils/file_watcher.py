@@ -0,0 +1,226 @@
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from collections.abc import AsyncGenerator, Generator
+from pathlib import Path
+
+from ..config import Config
+from ..core.executors import run_in_thread
+
+LOGGER = logging.getLogger(Config.BOT_NAME)
+
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+EVENT_HEADER = struct.Struct("iIII")
+
+IGNORED_DIRS = ("__pycache__",)
+
+
+def is_ignored_dir(path: Path) -> bool:
+    return path.name.startswith(".") or path.name in IGNORED_DIRS
+
+
+class FileWatcher:
+    """
+    Watch a directory tree for changed files.
+
+    Uses inotify through libc when available, costs nothing while idle.
+    Falls back to comparing mtimes every poll_interval seconds on other platforms.
+    Bursts of events (editors write, rename and chmod on save) are collected for debounce seconds
+    and handed out as one set of paths.
+    """
+
+    READ_SIZE: int = 65536
+
+    def __init__(
+        self,
+        root: Path,
+        suffixes: tuple[str, ...] = (".py",),
+        debounce: float = 0.5,
+        poll_interval: float = 2,
+    ):
+        self.root: Path = root
+        self.suffixes: tuple[str, ...] = suffixes
+        self.debounce: float = debounce
+        self.poll_interval: float = poll_interval
+
+        self.changed: set[Path] = set()
+        self.event = asyncio.Event()
+
+        self.backend: str | None = None
+        self._fd: int | None = None
+        self._watches: dict[int, Path] = {}
+        self._libc: ctypes.CDLL | None = None
+        self._poll_task: asyncio.Task | None = None
+
+    def is_watched(self, path: Path) -> bool:
+        return path.suffix in self.suffixes and not path.name.startswith(".")
+
+    @staticmethod
+    def iter_dirs(path: Path) -> Generator[Path]:
+        for dir_path, dir_names, _ in os.walk(path):
+            dir_names[:] = [name for name in dir_names if not is_ignored_dir(Path(name))]
+            yield Path(dir_path)
+
+    def mark(self, path: Path) -> None:
+        self.changed.add(path)
+        self.event.set()
+
+    def start(self) -> None:
+        try:
+            self.start_inotify()
+            self.backend = "inotify"
+        except (OSError, AttributeError) as e:
+            LOGGER.info(f"FileWatcher: inotify unavailable ({e}), polling every {self.poll_interval}s.")
+            self.close()
+            self._poll_task = asyncio.create_task(self.poll(), name="file-watcher-poll")
+            self.backend = "polling"
+
+    def close(self) -> None:
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+            self._watches.clear()
+
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+
+    def start_inotify(self) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+        self._fd = fd
+
+        for directory in self.iter_dirs(self.root):
+            self.add_watch(directory)
+
+        asyncio.get_running_loop().add_reader(fd, self.read_events)
+
+    def add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"{directory}: {os.strerror(ctypes.get_errno())}")
+
+        self._watches[wd] = directory
+
+    def read_events(self) -> None:
+        try:
+            data = os.read(self._fd, self.READ_SIZE)
+        except BlockingIOError:
+            return
+
+        offset = 0
+
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                LOGGER.warning("FileWatcher: inotify queue overflowed, some changes were missed.")
+                continue
+
+            directory = self._watches.get(wd)
+
+            if directory is None:
+                continue
+
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            path = directory / os.fsdecode(name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not is_ignored_dir(path):
+                    self.on_new_dir(path)
+                continue
+
+            # Files show up as CREATE and then CLOSE_WRITE, wait for the write.
+            if mask & IN_CREATE:
+                continue
+
+            if self.is_watched(path):
+                self.mark(path)
+
+    def on_new_dir(self, path: Path) -> None:
+        """Watch a new (or moved in) directory and report the files already in it."""
+        for directory in self.iter_dirs(path):
+            try:
+                self.add_watch(directory)
+            except OSError as e:
+                LOGGER.warning(f"FileWatcher: {e}")
+
+        for directory in self.iter_dirs(path):
+            for file in directory.iterdir():
+                if file.is_file() and self.is_watched(file):
+                    self.mark(file)
+
+    def scan(self) -> dict[Path, tuple[int, int]]:
+        files = {}
+
+        for directory in self.iter_dirs(self.root):
+            try:
+                entries = list(directory.iterdir())
+            except OSError:
+                continue
+
+            for file in entries:
+                if self.is_watched(file):
+                    try:
+                        stat = file.stat()
+                    except OSError:
+                        continue
+                    files[file] = (stat.st_mtime_ns, stat.st_size)
+
+        return files
+
+    async def poll(self) -> None:
+        files = await run_in_thread(self.scan, pool="io")
+
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = await run_in_thread(self.scan, pool="io")
+
+            for file in current.keys() | files.keys():
+                if current.get(file) != files.get(file):
+                    self.mark(file)
+
+            files = current
+
+    async def changes(self) -> AsyncGenerator[set[Path], None]:
+        """Yield sets of paths that were created, changed or deleted."""
+        self.start()
+
+        try:
+            while True:
+                await self.event.wait()
+                await asyncio.sleep(self.debounce)
+                self.event.clear()
+
+                changed, self.changed = self.changed, set()
+
+                if changed:
+                    yield changed
+        finally:
+            self.close()
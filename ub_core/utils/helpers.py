@@ -3,32 +3,42 @@ import logging
 import time
 from collections import defaultdict
 from inspect import isawaitable, iscoroutine, iscoroutinefunction
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from pyrogram.enums import ParseMode
 from pyrogram.types import Chat, Message, User
-from telegraph.aio import Telegraph
 
 from .media_helper import bytes_to_mb
 from ..config import Config
+from ..core.executors import run_in_thread
 
-TELEGRAPH: None | Telegraph = None
+if TYPE_CHECKING:
+    from telegraph.aio import Telegraph
 
+TELEGRAPH: "None | Telegraph" = None
+TELEGRAPH_LOCK = asyncio.Lock()
 
-PROGRESS_DICT: dict[str, dict[str, float]] = defaultdict(lambda: {"start_time": (t := time.time()), "progress_time": t})
+
+PROGRESS_DICT: dict[str, dict[str, float]] = defaultdict(lambda: {"start_time": time.time()})
 
 LOGGER = logging.getLogger(Config.BOT_NAME)
 
 
-async def init_task():
+async def get_telegraph() -> "Telegraph":
+    """Import telegraph and create the account on first post instead of at boot."""
     global TELEGRAPH
-    TELEGRAPH = Telegraph()
-    try:
-        await TELEGRAPH.create_account(
-            short_name=Config.BOT_NAME, author_name=Config.BOT_NAME, author_url=Config.UPSTREAM_REPO
-        )
-    except Exception as e:
-        LOGGER.error(f"Failed to Create Telegraph Account: {e}")
+
+    async with TELEGRAPH_LOCK:
+        if TELEGRAPH is None:
+            from telegraph.aio import Telegraph
+
+            telegraph = Telegraph()
+            await telegraph.create_account(
+                short_name=Config.BOT_NAME, author_name=Config.BOT_NAME, author_url=Config.UPSTREAM_REPO
+            )
+            TELEGRAPH = telegraph
+
+    return TELEGRAPH
 
 
 async def post_to_telegraph(
@@ -37,7 +47,7 @@ async def post_to_telegraph(
     author_name: str = Config.BOT_NAME,
     author_url: str = Config.UPSTREAM_REPO,
 ) -> str:
-    telegraph = await TELEGRAPH.create_page(
+    telegraph = await (await get_telegraph()).create_page(
         title=title, html_content=f"<p>{text}</p>", author_name=author_name, author_url=author_url
     )
     return telegraph["url"]
@@ -63,23 +73,22 @@ def format_time(seconds):
 
 
 async def progress(current_size: int, total_size: int, response: Message, action_str: str = "", file_path: str = ""):
+    """
+    Show Upload/Download progress on response.
+    Edits go through the client's EditCoalescer so calling this often is cheap,
+    only the latest progress is sent at the coalescer's pace.
+    """
     if current_size == total_size:
         PROGRESS_DICT.pop(file_path, 0)
+        # Don't let a pending progress edit land after the caller's final edit.
+        await response._client.edit_coalescer.discard(response)
         return
 
-    # start and progress time
+    # start time
     progress_info = PROGRESS_DICT[file_path]
 
     current_time = time.time()
 
-    # if it has not been 8 sec since the last edit don't show progress.
-    edit_time_diff = current_time - progress_info["progress_time"]
-    if edit_time_diff < 8:
-        return
-
-    # Update progress time to current time
-    progress_info["progress_time"] = current_time
-
     # Time Since Download/Upload started
     elapsed_time = current_time - progress_info["start_time"]
 
@@ -99,7 +108,8 @@ async def progress(current_size: int, total_size: int, response: Message, action
     fill_length = (current_size / total_size) * bar_length
     progress_bar = "[" + ("#" * int(fill_length)).ljust(bar_length, "-") + "]"
 
-    await response.edit(
+    response._client.edit_coalescer.submit(
+        response,
         text=f"""
 <b>{action_str.capitalize()}</b> <code>{percentage:.2f}%</code>
 
@@ -121,7 +131,8 @@ def create_chunks(array: list[Any], chunk_size: int = 5) -> list[list[Any]]:
     return [array[idx : idx + chunk_size] for idx in range(0, len(array), chunk_size)]
 
 
-async def run_unknown_callable(resource, *args, ignore_errors: bool = False, **kwargs) -> Any:
+async def run_unknown_callable(resource, *args, ignore_errors: bool = False, pool: str = "user", **kwargs) -> Any:
+    """Await coroutines and awaitables, run plain functions in a thread of the named pool."""
     try:
         if resource is None:
             return
@@ -130,7 +141,7 @@ async def run_unknown_callable(resource, *args, ignore_errors: bool = False, **k
         elif iscoroutine(resource) or isawaitable(resource):
             return await resource
         else:
-            return await asyncio.to_thread(resource, *args, **kwargs)
+            return await run_in_thread(resource, *args, pool=pool, **kwargs)
     except Exception as e:
         if ignore_errors:
             LOGGER.exception(e)
@@ -1,11 +1,26 @@
 import asyncio
+import codecs
 import ctypes
+import heapq
+import itertools
+import json
 import os
+import platform
+import resource
+import shutil
 import signal
+import subprocess
+import tempfile
+import time
+import uuid
+from collections import OrderedDict, deque
 from typing import TYPE_CHECKING, Any
 
 from pyrogram.enums import ParseMode
 
+from ..config import Config
+from ..core.outbound import Priority
+
 if TYPE_CHECKING:
     from asyncio.subprocess import Process
 
@@ -20,19 +35,287 @@ def set_pdeathsig():
     libc.prctl(PR_SET_PDEATHSIG, signal.SIGKILL)
 
 
-def kill_subprocess(proc: "Process"):
+def kill_subprocess(proc: "Process | PooledProcess"):
     os.killpg(proc.pid, signal.SIGKILL)
 
 
-async def run_shell_cmd(cmd: str, timeout: int = 300, ret_val: Any | None = None) -> str:
-    """Runs a Shell Command and Returns Output"""
-    sub_process: Process = await asyncio.create_subprocess_shell(
-        cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.STDOUT,
-        start_new_session=True,
-        preexec_fn=set_pdeathsig,
-    )
+class ResourceLimits:
+    """
+    Optional limits applied to a pooled process before exec.
+        cpu_seconds: RLIMIT_CPU, SIGXCPU at the limit and SIGKILL 5s later.
+        address_space: RLIMIT_AS in bytes.
+        nice: added to the process's niceness.
+        ionice_class/ionice_level: IO scheduling class (1 RT, 2 best-effort, 3 idle) and level 0-7.
+    """
+
+    IOPRIO_CLASS_SHIFT = 13
+    IOPRIO_WHO_PROCESS = 1
+    SYS_IOPRIO_SET: int | None = {"x86_64": 251, "aarch64": 30, "armv7l": 314, "i686": 289}.get(platform.machine())
+
+    def __init__(
+        self,
+        cpu_seconds: int | None = None,
+        address_space: int | None = None,
+        nice: int | None = None,
+        ionice_class: int | None = None,
+        ionice_level: int = 4,
+    ):
+        self.cpu_seconds = cpu_seconds
+        self.address_space = address_space
+        self.nice = nice
+        self.ionice_class = ionice_class
+        self.ionice_level = ionice_level
+
+    def apply(self) -> None:
+        """Runs in the child between fork and exec: no locks, no logging."""
+        set_pdeathsig()
+
+        if self.cpu_seconds:
+            resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds + 5))
+
+        if self.address_space:
+            resource.setrlimit(resource.RLIMIT_AS, (self.address_space, self.address_space))
+
+        if self.nice:
+            os.nice(self.nice)
+
+        if self.ionice_class is not None and self.SYS_IOPRIO_SET is not None:
+            ioprio = (self.ionice_class << self.IOPRIO_CLASS_SHIFT) | self.ionice_level
+            libc.syscall(self.SYS_IOPRIO_SET, self.IOPRIO_WHO_PROCESS, 0, ioprio)
+
+
+class ProcessStats:
+    def __init__(self, cmd: str, priority: Priority):
+        self.cmd: str = cmd
+        self.priority: Priority = priority
+        self.pid: int | None = None
+        self.returncode: int | None = None
+        self.queued_at: float = time.monotonic()
+        self.started_at: float | None = None
+        self.ended_at: float | None = None
+        self.user_cpu: float = 0
+        self.system_cpu: float = 0
+        # KiB
+        self.max_rss: int = 0
+
+    @property
+    def queued_for(self) -> float:
+        return round((self.started_at or time.monotonic()) - self.queued_at, 3)
+
+    @property
+    def runtime(self) -> float:
+        if self.started_at is None:
+            return 0
+        return round((self.ended_at or time.monotonic()) - self.started_at, 3)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "cmd": self.cmd,
+            "priority": self.priority.name,
+            "pid": self.pid,
+            "returncode": self.returncode,
+            "queued_for": self.queued_for,
+            "runtime": self.runtime,
+            "user_cpu": round(self.user_cpu, 3),
+            "system_cpu": round(self.system_cpu, 3),
+            "max_rss": self.max_rss,
+        }
+
+    def __str__(self):
+        return json.dumps(self.to_dict(), indent=4, ensure_ascii=False)
+
+
+class PooledProcess:
+    """The bits of asyncio's Process that are used here, for processes spawned by the SubprocessPool."""
+
+    def __init__(self, popen: subprocess.Popen, stdout: asyncio.StreamReader, stats: ProcessStats):
+        self.popen = popen
+        self.pid: int = popen.pid
+        self.stdout: asyncio.StreamReader = stdout
+        self.stats: ProcessStats = stats
+        self.returncode: int | None = None
+        self.exited: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    async def wait(self) -> int:
+        return await asyncio.shield(self.exited)
+
+    async def communicate(self) -> tuple[bytes, None]:
+        stdout = await self.stdout.read()
+        await self.wait()
+        return stdout, None
+
+
+class SubprocessPool:
+    """
+    Caps the number of shell commands running at once.
+
+    Commands over the limit wait for a slot in Priority order, for up to queue_timeout seconds.
+    Processes are reaped with wait4, via a pidfd on the loop or a thread where pidfds aren't available,
+    so runtime, CPU time and peak RSS of each command are recorded.
+    """
+
+    HISTORY_SIZE: int = 50
+
+    def __init__(self, name: str, limit: int, queue_timeout: float | None = None):
+        self.name: str = name
+        self.limit: int = limit
+        self.queue_timeout: float | None = queue_timeout
+        self.running: int = 0
+        self.waiters: list[tuple[Priority, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+        self.spawned: int = 0
+        self.history: deque[ProcessStats] = deque(maxlen=self.HISTORY_SIZE)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "queued": sum(not future.done() for *_, future in self.waiters),
+            "spawned": self.spawned,
+            "recent": [stats.to_dict() for stats in self.history],
+        }
+
+    async def acquire(self, priority: Priority = Priority.NORMAL, timeout: float | None = None) -> None:
+        if self.running < self.limit and not self.waiters:
+            self.running += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self._counter), future))
+
+        try:
+            # wait_for returns normally if the slot was handed over as it timed out.
+            await asyncio.wait_for(future, timeout)
+        except TimeoutError:
+            raise TimeoutError(f"No {self.name} slot after {timeout}s, {self.running}/{self.limit} running.") from None
+        except asyncio.CancelledError:
+            # The slot was handed over right before the cancel, pass it on.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Hand the slot to the next waiter or free it."""
+        while self.waiters:
+            *_, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+
+        self.running -= 1
+
+    async def spawn(
+        self,
+        cmd: str,
+        priority: Priority = Priority.NORMAL,
+        limits: ResourceLimits | None = None,
+        queue_timeout: float | None = None,
+    ) -> PooledProcess:
+        """
+        Wait for a slot and start cmd in a new session with stdout and stderr piped together.
+        Raises TimeoutError if no slot frees up in queue_timeout seconds, the pool's default if not given.
+        """
+        stats = ProcessStats(cmd=cmd, priority=priority)
+        await self.acquire(priority, timeout=queue_timeout or self.queue_timeout)
+
+        try:
+            popen = subprocess.Popen(
+                cmd,
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+                preexec_fn=limits.apply if limits else set_pdeathsig,
+            )
+        except BaseException:
+            self.release()
+            raise
+
+        self.spawned += 1
+        stats.pid = popen.pid
+        stats.started_at = time.monotonic()
+
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(loop=loop)
+        process = PooledProcess(popen=popen, stdout=reader, stats=stats)
+        self.watch(process)
+
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader, loop=loop), popen.stdout)
+        return process
+
+    def watch(self, process: PooledProcess) -> None:
+        loop = asyncio.get_running_loop()
+
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            waiter = loop.run_in_executor(None, os.wait4, process.pid, 0)
+            waiter.add_done_callback(lambda future: self.on_exit(process, future))
+            return
+
+        def reap():
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+            waiter = loop.create_future()
+            try:
+                waiter.set_result(os.wait4(process.pid, 0))
+            except OSError as e:
+                waiter.set_exception(e)
+            self.on_exit(process, waiter)
+
+        loop.add_reader(pidfd, reap)
+
+    def on_exit(self, process: PooledProcess, waiter: asyncio.Future) -> None:
+        stats = process.stats
+        stats.ended_at = time.monotonic()
+
+        if waiter.exception() is None:
+            _, status, rusage = waiter.result()
+            stats.returncode = os.waitstatus_to_exitcode(status)
+            stats.user_cpu = rusage.ru_utime
+            stats.system_cpu = rusage.ru_stime
+            stats.max_rss = rusage.ru_maxrss
+        else:
+            stats.returncode = -1
+
+        # Stop Popen from trying to reap it again.
+        process.returncode = process.popen.returncode = stats.returncode
+
+        self.history.append(stats)
+        self.release()
+
+        if not process.exited.done():
+            process.exited.set_result(stats.returncode)
+
+
+# Commands that finish on their own: run_shell_cmd, ffmpeg/ffprobe helpers, pip.
+SUBPROCESS_POOL = SubprocessPool(
+    name="subprocess", limit=Config.SUBPROCESS_LIMIT, queue_timeout=Config.SUBPROCESS_QUEUE_TIMEOUT
+)
+
+# AsyncShell commands stream output for as long as they run (.sh tail -f), they get their own slots
+# so they can't hold up the rest. InteractiveShell isn't pooled at all.
+LIVE_SHELL_POOL = SubprocessPool(
+    name="live shell", limit=Config.LIVE_SHELL_LIMIT, queue_timeout=Config.SUBPROCESS_QUEUE_TIMEOUT
+)
+
+
+async def run_shell_cmd(
+    cmd: str,
+    timeout: int = 300,
+    ret_val: Any | None = None,
+    priority: Priority = Priority.NORMAL,
+    limits: ResourceLimits | None = None,
+) -> str:
+    """Runs a Shell Command in the SubprocessPool and Returns Output"""
+    try:
+        sub_process: PooledProcess = await SUBPROCESS_POOL.spawn(cmd, priority=priority, limits=limits)
+    except TimeoutError:
+        if ret_val is not None:
+            return ret_val
+        raise
 
     try:
         stdout, _ = await asyncio.wait_for(fut=sub_process.communicate(), timeout=timeout)
@@ -44,71 +327,397 @@ async def run_shell_cmd(cmd: str, timeout: int = 300, ret_val: Any | None = None
         raise
 
 
+THUMBNAIL_CACHE_SIZE = 256
+THUMBNAIL_CACHE: OrderedDict[tuple[str, int, int, float], str] = OrderedDict()
+THUMBNAIL_FUTURES: dict[tuple[str, int, int, float], asyncio.Future] = {}
+
+
+async def _extract_frames(video: str, path: str, pending: dict[tuple[str, int, int, float], asyncio.Future]) -> None:
+    os.makedirs(path, exist_ok=True)
+    batch_id = uuid.uuid4().hex[:8]
+    outputs = {key: os.path.join(path, f"ss-{batch_id}-{index}.png") for index, key in enumerate(pending)}
+
+    inputs = " ".join(f'''-ss {key[-1]} -i "{video}"''' for key in pending)
+    maps = " ".join(f'''-map {index}:v:0 -frames:v 1 "{thumb}"''' for index, thumb in enumerate(outputs.values()))
+
+    try:
+        await run_shell_cmd(f"ffmpeg -hide_banner -loglevel error {inputs} {maps}", priority=Priority.LOW)
+    finally:
+        for key, future in pending.items():
+            THUMBNAIL_FUTURES.pop(key, None)
+            thumb = outputs[key] if os.path.isfile(outputs[key]) else None
+
+            if thumb:
+                THUMBNAIL_CACHE[key] = thumb
+                if len(THUMBNAIL_CACHE) > THUMBNAIL_CACHE_SIZE:
+                    THUMBNAIL_CACHE.popitem(last=False)
+
+            if not future.done():
+                future.set_result(thumb)
+
+
+def _link_into(thumb: str | None, path: str) -> str | None:
+    """The frame as a file in path: callers delete their own dir, so a frame cached in another one is linked over."""
+    if thumb is None or os.path.dirname(thumb) == os.path.abspath(path):
+        return thumb
+
+    os.makedirs(path, exist_ok=True)
+    target = os.path.join(path, f"ss-{uuid.uuid4().hex[:8]}.png")
+
+    try:
+        os.link(thumb, target)
+    except FileNotFoundError:
+        return None
+    except OSError:
+        # Different filesystem.
+        try:
+            shutil.copyfile(thumb, target)
+        except FileNotFoundError:
+            return None
+
+    return target
+
+
+async def take_screenshots(video: str, path: str, timestamps: list[int | float]) -> list[str | None]:
+    """
+    Returns Frames of Video at each timestamp [None for frames that couldn't be taken]
+    Missing frames are extracted by a single ffmpeg running in the SubprocessPool at LOW priority.
+    Frames are cached by the video's path, size and mtime and concurrent requests for a frame share the ffmpeg,
+    frames returned are always in path.
+    """
+    video = os.path.abspath(str(video).strip())
+
+    try:
+        stat = os.stat(video)
+    except OSError:
+        return [None] * len(timestamps)
+
+    loop = asyncio.get_running_loop()
+    futures: list[asyncio.Future] = []
+    pending: dict[tuple[str, int, int, float], asyncio.Future] = {}
+
+    for timestamp in timestamps:
+        key = (video, stat.st_size, stat.st_mtime_ns, float(timestamp))
+        thumb = THUMBNAIL_CACHE.get(key)
+
+        if thumb and os.path.isfile(thumb):
+            THUMBNAIL_CACHE.move_to_end(key)
+            future = loop.create_future()
+            future.set_result(thumb)
+        elif key in THUMBNAIL_FUTURES:
+            future = THUMBNAIL_FUTURES[key]
+        else:
+            future = pending[key] = THUMBNAIL_FUTURES[key] = loop.create_future()
+
+        futures.append(future)
+
+    if pending:
+        # A task so the shared futures still resolve if this caller is cancelled.
+        Config.TASK_MANAGER.create_temp_task(_extract_frames(video, path, pending), name="take-screenshots")
+
+    thumbs = await asyncio.gather(*[asyncio.shield(future) for future in futures])
+    return [_link_into(thumb, path) for thumb in thumbs]
+
+
 async def take_ss(video: str, path: str, timestamp: int | float = 0.1) -> None | str:
     """Returns First Frame [if time stamp is none] of Video for Thumbnails"""
-    thumb = os.path.join(path, "i.png")
-    await run_shell_cmd(
-        f'''ffmpeg -hide_banner -loglevel error -ss {timestamp} -i "{video.strip()}" -vframes 1 "{thumb}"'''
+    return (await take_screenshots(video=video, path=path, timestamps=[timestamp]))[0]
+
+
+class StreamInfo:
+    def __init__(self, data: dict):
+        self.index: int = data.get("index", 0)
+        self.codec_type: str = data.get("codec_type", "")
+        self.codec_name: str = data.get("codec_name", "")
+        self.width: int = data.get("width", 0)
+        self.height: int = data.get("height", 0)
+        self.duration: float = float(data.get("duration") or 0)
+        self.raw: dict = data
+
+    def __repr__(self):
+        return f"StreamInfo(index={self.index}, type={self.codec_type}, codec={self.codec_name})"
+
+
+class MediaInfo:
+    """Parsed ffprobe output of a file, empty if the file couldn't be probed."""
+
+    def __init__(self, path: str, data: dict):
+        media_format: dict = data.get("format", {})
+
+        self.path: str = path
+        self.streams: list[StreamInfo] = [StreamInfo(stream) for stream in data.get("streams", [])]
+        self.format_name: str = media_format.get("format_name", "")
+        self.size: int = int(media_format.get("size") or 0)
+        self.bit_rate: int = int(media_format.get("bit_rate") or 0)
+        self.duration: float = float(media_format.get("duration") or 0) or max(
+            (stream.duration for stream in self.streams), default=0
+        )
+
+    @property
+    def audio_streams(self) -> list[StreamInfo]:
+        return [stream for stream in self.streams if stream.codec_type == "audio"]
+
+    @property
+    def video_streams(self) -> list[StreamInfo]:
+        return [stream for stream in self.streams if stream.codec_type == "video"]
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.audio_streams)
+
+    @property
+    def has_video(self) -> bool:
+        return bool(self.video_streams)
+
+    @property
+    def codecs(self) -> list[str]:
+        return [stream.codec_name for stream in self.streams]
+
+    @property
+    def width(self) -> int:
+        return self.video_streams[0].width if self.video_streams else 0
+
+    @property
+    def height(self) -> int:
+        return self.video_streams[0].height if self.video_streams else 0
+
+    def __repr__(self):
+        return f"MediaInfo(path={self.path!r}, duration={self.duration}, streams={self.streams})"
+
+
+PROBE_CACHE_SIZE = 128
+PROBE_CACHE: OrderedDict[tuple[str, int, int], MediaInfo] = OrderedDict()
+PROBE_TASKS: dict[tuple[str, int, int], asyncio.Task] = {}
+
+
+async def _run_probe(path: str) -> MediaInfo:
+    output = await run_shell_cmd(
+        f'''ffprobe -v quiet -print_format json -show_streams -show_format "{path}"'''
     )
-    if os.path.isfile(thumb):
-        return thumb
+    try:
+        # stderr is piped into stdout, skip anything before the json.
+        data, _ = json.JSONDecoder().raw_decode(output, max(output.find("{"), 0))
+    except json.JSONDecodeError:
+        data = {}
+
+    return MediaInfo(path=path, data=data)
+
+
+async def probe(file: str | os.PathLike) -> MediaInfo:
+    """
+    Get a file's streams, duration, codecs and dimensions with a single ffprobe.
+    Results are cached by path, size and mtime, concurrent calls for a file share one ffprobe.
+    """
+    path = os.path.abspath(str(file).strip())
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return MediaInfo(path=path, data={})
+
+    key = (path, stat.st_size, stat.st_mtime_ns)
+
+    if key in PROBE_CACHE:
+        PROBE_CACHE.move_to_end(key)
+        return PROBE_CACHE[key]
+
+    task = PROBE_TASKS.get(key)
+
+    if task is None:
+        task = PROBE_TASKS[key] = asyncio.create_task(_run_probe(path), name=f"probe-{path}")
+        task.add_done_callback(lambda _: PROBE_TASKS.pop(key, None))
+
+    media_info = await asyncio.shield(task)
+
+    if media_info.streams:
+        PROBE_CACHE[key] = media_info
+        if len(PROBE_CACHE) > PROBE_CACHE_SIZE:
+            PROBE_CACHE.popitem(last=False)
+
+    return media_info
 
 
 async def check_audio(file: str) -> int:
     """Returns True/1 if input has audio else 0/False"""
-    result = await run_shell_cmd(
-        f'''ffprobe -v error -show_entries format=nb_streams -of default=noprint_wrappers=1:nokey=1 "{file.strip()}"'''
-    )
-    return int(result or 0) - 1
+    return int((await probe(file)).has_audio)
 
 
 async def get_duration(file: str) -> int:
     """Returns Input Duration"""
-    duration = await run_shell_cmd(
-        f'''ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "{file.strip()}"'''
-    )
-    return round(float(duration.strip() or 0))
+    return round((await probe(file)).duration)
+
+
+class OutputCapture:
+    """
+    Captures a process's output without holding all of it in memory.
+
+    The last few lines are kept in a ring for live views,
+    the full transcript goes to a temporary spill file which is deleted on close.
+    Output is decoded incrementally so multibyte chars split across reads stay intact.
+    """
+
+    READ_SIZE: int = 65536
+    MAX_LINES: int = 200
+    MAX_LINE_LENGTH: int = 4096
+
+    # Live view cadence: 1s for quiet output plus 1s per 4KiB/s, capped at 5s.
+    MIN_CADENCE: float = 1
+    MAX_CADENCE: float = 5
+    CADENCE_RATE: int = 4096
+
+    def __init__(self, max_lines: int = MAX_LINES):
+        self.lines: deque[str] = deque(maxlen=max_lines)
+        self.partial: str = ""
+        self.size: int = 0
+        self.updated = asyncio.Event()
+        self.sampled_size: int = 0
+        self.sampled_at: float = time.monotonic()
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.spill = tempfile.NamedTemporaryFile(
+            mode="w+", encoding="utf-8", newline="", prefix="ub-shell-", suffix=".txt"
+        )
+
+    @property
+    def path(self) -> str:
+        return self.spill.name
+
+    @property
+    def last_line(self) -> str:
+        return self.lines[-1] if self.lines else ""
+
+    @property
+    def text(self) -> str:
+        """Full transcript read back from the spill file."""
+        self.spill.flush()
+        with open(self.path, encoding="utf-8", newline="") as spill:
+            return spill.read()
+
+    def feed(self, data: bytes, final: bool = False) -> list[str]:
+        """Decode a chunk and return the lines completed by it."""
+        *lines, self.partial = (self.partial + self.decoder.decode(data, final=final)).split("\n")
+        lines = [line + "\n" for line in lines]
+
+        # Don't let progress bars or binary output without line breaks grow forever.
+        if final or len(self.partial) > self.MAX_LINE_LENGTH:
+            if self.partial:
+                lines.append(self.partial)
+            self.partial = ""
+
+        return lines
+
+    def append(self, line: str) -> None:
+        self.spill.write(line)
+        self.size += len(line)
+        self.lines.append(line)
+
+    def write(self, data: bytes, final: bool = False) -> None:
+        for line in self.feed(data, final=final):
+            self.append(line)
+        self.notify()
+
+    def notify(self) -> None:
+        """Wake up whoever is waiting for output."""
+        self.updated.set()
+
+    async def wait(self, timeout: float | None = None) -> bool:
+        """Wait till the reader captures something new or timeout runs out."""
+        try:
+            await asyncio.wait_for(self.updated.wait(), timeout=timeout)
+        except TimeoutError:
+            return False
+
+        self.updated.clear()
+        return True
+
+    def get_cadence(self) -> float:
+        """Seconds to wait before the next live update, longer for chattier output."""
+        now = time.monotonic()
+        rate = (self.size - self.sampled_size) / max(now - self.sampled_at, 0.001)
+        self.sampled_size, self.sampled_at = self.size, now
+        return min(self.MAX_CADENCE, self.MIN_CADENCE + rate / self.CADENCE_RATE)
+
+    def tail(self, limit: int = 4000) -> str:
+        """Most recent lines (and the pending partial line) that fit in limit chars."""
+        output = [self.partial[-limit:]] if self.partial else []
+        length = len(output[0]) if output else 0
+
+        for line in reversed(self.lines):
+            length += len(line)
+            if length > limit:
+                if not output:
+                    output.append(line[-limit:])
+                break
+            output.append(line)
+
+        return "".join(reversed(output))
+
+    def flush(self) -> None:
+        self.spill.flush()
+
+    def reset(self) -> None:
+        self.lines.clear()
+        self.partial = ""
+        self.size = 0
+        self.updated.clear()
+        self.decoder.reset()
+        self.spill.seek(0)
+        self.spill.truncate()
+
+    def close(self) -> None:
+        self.spill.close()
 
 
 class AsyncShell:
-    def __init__(self, process: "Process"):
+    def __init__(self, process: PooledProcess):
         """Not to Be Invoked Directly.\n
         Use AsyncShell.run_cmd"""
-        self.process: Process = process
-        self.stdout: str = ""
-        self.last_line: str = ""
+        self.process: PooledProcess = process
+        self.output: OutputCapture = OutputCapture()
         self.is_done: bool = False
         self._task: asyncio.Task | None = None
 
+    @property
+    def stdout(self) -> str:
+        return self.output.text
+
+    @property
+    def last_line(self) -> str:
+        return self.output.last_line
+
     async def read_output(self) -> None:
-        """Read StdOut/StdErr and append to stdout and last_line"""
-        async for line in self.process.stdout:
-            decoded_line = line.decode("utf-8")
-            self.stdout += decoded_line
-            self.last_line = decoded_line
-        self.is_done = True
+        """Read StdOut/StdErr in chunks into the output capture"""
+        try:
+            while data := await self.process.stdout.read(OutputCapture.READ_SIZE):
+                self.output.write(data)
+            self.output.write(b"", final=True)
+        finally:
+            self.is_done = True
+            self.output.notify()
 
     async def send_output(self, message: "Message") -> None:
-        sleep_duration: int = 1
+        coalescer = message._client.edit_coalescer
         old_output: str = ""
 
-        while not self.is_done:
-            new_output = self.stdout if len(self.stdout) < 4000 else self.last_line
-            if not new_output.strip() or new_output == old_output:
-                await asyncio.sleep(0)
-                continue
-
-            if sleep_duration >= 10:
-                sleep_duration = 2
-            await asyncio.sleep(sleep_duration)
-            sleep_duration += 2
-
-            await message.edit(
-                text=f"<pre language=shell>{new_output}</pre>",
-                disable_preview=True,
-                parse_mode=ParseMode.HTML,
-            )
-            old_output = new_output
+        try:
+            while not self.is_done:
+                # Sleep till the reader has something new, the timeout only re-checks the loop condition.
+                if not await self.output.wait(timeout=30):
+                    continue
+
+                new_output = self.output.tail(4000)
+                if not new_output.strip() or new_output == old_output:
+                    continue
+
+                coalescer.submit(
+                    message,
+                    text=f"<pre language=shell>{new_output}</pre>",
+                    disable_preview=True,
+                    parse_mode=ParseMode.HTML,
+                )
+                old_output = new_output
+                await asyncio.sleep(self.output.get_cadence())
+        finally:
+            await coalescer.discard(message)
 
         await self.process.wait()
 
@@ -122,16 +731,12 @@ class AsyncShell:
         await asyncio.sleep(0.5)
 
     @classmethod
-    async def run_cmd(cls, cmd: str, name: str = "AsyncShell") -> "AsyncShell":
+    async def run_cmd(
+        cls, cmd: str, name: str = "AsyncShell", priority: Priority = Priority.HIGH, limits: ResourceLimits | None = None
+    ) -> "AsyncShell":
         """Setup Object, Start Fetching output and return the process Object."""
         sub_process: AsyncShell = cls(
-            process=await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.STDOUT,
-                start_new_session=True,
-                preexec_fn=set_pdeathsig,
-            )
+            process=await LIVE_SHELL_POOL.spawn(cmd, priority=priority, limits=limits)
         )
         await sub_process.create_stdout_task(name=name)
         return sub_process
@@ -142,46 +747,60 @@ class InteractiveShell:
         """Not to Be Invoked Directly.\n
         Use InteractiveShell.spawn_shell"""
         self.process: Process = process
-        self.stdout: str = ""
-        self.last_line: str = ""
+        self.output: OutputCapture = OutputCapture()
         self.is_running: bool = True
         self._task: asyncio.Task | None = None
 
+    @property
+    def stdout(self) -> str:
+        return self.output.text
+
+    @property
+    def last_line(self) -> str:
+        return self.output.last_line
+
     async def read_output(self) -> None:
-        """Read StdOut/StdErr and append to stdout and last_line"""
-        async for line in self.process.stdout:
-            decoded_line = line.decode("utf-8")
+        """Read StdOut/StdErr in chunks into the output capture"""
+        try:
+            while data := await self.process.stdout.read(OutputCapture.READ_SIZE):
+                for line in self.output.feed(data):
+                    if line.strip() == "ish cmd is done":
+                        self.is_running = False
+                        continue
 
-            if decoded_line.strip() == "ish cmd is done":
-                self.is_running = False
-                continue
+                    self.output.append(line)
 
-            self.stdout += decoded_line
-            self.last_line = decoded_line
+                self.output.notify()
 
-        self.is_running = False
+            self.output.write(b"", final=True)
+        finally:
+            self.is_running = False
+            self.output.notify()
 
     async def send_output(self, message: "Message") -> None:
-        sleep_duration: int = 1
+        coalescer = message._client.edit_coalescer
         old_output: str = ""
 
-        while self.is_running:
-            new_output = self.stdout if len(self.stdout) < 4000 else self.last_line
-            if not new_output.strip() or new_output == old_output:
-                await asyncio.sleep(0)
-                continue
-
-            if sleep_duration >= 10:
-                sleep_duration = 2
-            await asyncio.sleep(sleep_duration)
-            sleep_duration += 2
-
-            await message.edit(
-                text=f"<pre language=shell>{new_output}</pre>",
-                disable_preview=True,
-                parse_mode=ParseMode.HTML,
-            )
-            old_output = new_output
+        try:
+            while self.is_running:
+                # Sleep till the reader has something new, the timeout only re-checks the loop condition.
+                if not await self.output.wait(timeout=30):
+                    continue
+
+                new_output = self.output.tail(4000)
+                if not new_output.strip() or new_output == old_output:
+                    continue
+
+                coalescer.submit(
+                    message,
+                    text=f"<pre language=shell>{new_output}</pre>",
+                    disable_preview=True,
+                    parse_mode=ParseMode.HTML,
+                )
+                old_output = new_output
+                await asyncio.sleep(self.output.get_cadence())
+        finally:
+            await coalescer.discard(message)
 
     async def write_input(self, text: str):
         self.process.stdin.write((text + "\necho 'ish cmd is done'\n").encode())
@@ -189,7 +808,7 @@ class InteractiveShell:
         self.is_running = True
 
     def flush_stdout(self):
-        self.stdout = self.last_line = ""
+        self.output.reset()
 
     def cancel(self) -> None:
         kill_subprocess(self.process)